@@ -5,35 +5,49 @@ from collections import Counter
 # --- CẤU HÌNH ĐƯỜNG DẪN ---
 CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
 ROOT_DIR = CURRENT_SCRIPT_DIR.parent
-INPUT_FILE = ROOT_DIR / "analysis_results" / "business_group_mapping_result.json"
+# Thống kê do map_business_groups.py tính sẵn trong lúc mapping
+STATS_FILE = ROOT_DIR / "analysis_results" / "business_group_stats.json"
+# Kết quả mapping dạng JSON Lines (dùng khi chưa có file thống kê)
+INPUT_FILE = ROOT_DIR / "analysis_results" / "business_group_mapping_result.jsonl"
+
+def load_group_counts():
+    """
+    Trả về Counter: Key = Số lượng nhóm, Value = Số lượng doanh nghiệp.
+    Ưu tiên đọc file thống kê; nếu chưa có thì đọc JSONL từng dòng (không load cả file).
+    """
+    if STATS_FILE.exists():
+        print(f"Đang đọc thống kê từ {STATS_FILE.name}...")
+        with open(STATS_FILE, 'r', encoding='utf-8') as f:
+            stats_data = json.load(f)
+        return Counter({int(k): v for k, v in stats_data.get('groups_per_business', {}).items()})
+
+    if not INPUT_FILE.exists():
+        return None
+
+    print(f"Đang đọc dữ liệu từ {INPUT_FILE.name}...")
+    stats = Counter()
+    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            biz = json.loads(line)
+            stats[len(biz.get('new_groups', []))] += 1
+    return stats
 
 def analyze_detailed_groups():
     print("=" * 60)
     print("PHÂN TÍCH CHI TIẾT SỐ LƯỢNG NHÓM NGÀNH")
     print("=" * 60)
 
-    if not INPUT_FILE.exists():
-        print(f"Lỗi: Không tìm thấy file dữ liệu tại {INPUT_FILE}")
-        return
-
     try:
-        print(f"Đang đọc dữ liệu...")
-        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        # Bộ đếm: Key = Số lượng nhóm, Value = Số lượng doanh nghiệp
-        stats = Counter()
-        total_multi_group_biz = 0
-        
-        # Duyệt qua từng doanh nghiệp để đếm
-        for biz in data:
-            groups = biz.get('new_groups', [])
-            num_groups = len(groups)
-            
-            # Chỉ quan tâm các doanh nghiệp có từ 2 nhóm trở lên
-            if num_groups >= 2:
-                stats[num_groups] += 1
-                total_multi_group_biz += 1
+        group_counts = load_group_counts()
+        if group_counts is None:
+            print(f"Lỗi: Không tìm thấy file dữ liệu tại {STATS_FILE} hoặc {INPUT_FILE}")
+            return
+
+        # Chỉ quan tâm các doanh nghiệp có từ 2 nhóm trở lên
+        stats = Counter({num_groups: count for num_groups, count in group_counts.items() if num_groups >= 2})
+        total_multi_group_biz = sum(stats.values())
 
         if total_multi_group_biz == 0:
             print("Không tìm thấy doanh nghiệp nào có từ 2 nhóm ngành trở lên.")
@@ -60,4 +74,4 @@ def analyze_detailed_groups():
         print(f"Có lỗi xảy ra: {e}")
 
 if __name__ == "__main__":
-    analyze_detailed_groups()
\ No newline at end of file
+    analyze_detailed_groups()
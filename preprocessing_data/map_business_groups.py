@@ -1,8 +1,17 @@
 import json
 import logging
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from tqdm import tqdm
 
+# Parser JSON nhanh (ujson đã có trong requirements.txt), fallback về json chuẩn nếu thiếu
+try:
+    import ujson as fast_json
+except ImportError:
+    fast_json = json
+
 # --- CẤU HÌNH ĐƯỜNG DẪN ---
 CURRENT_SCRIPT_DIR = Path(__file__).resolve().parent
 ROOT_DIR = CURRENT_SCRIPT_DIR.parent
@@ -11,13 +20,23 @@ ROOT_DIR = CURRENT_SCRIPT_DIR.parent
 MAPPING_FILE = ROOT_DIR / "analysis_results" / "classified_categories_nlp_result.json"
 # File đầu vào 2: Dữ liệu doanh nghiệp gốc
 META_FILE = ROOT_DIR / "data" / "meta-Washington.json"
-# File đầu ra: Kết quả mapping cuối cùng
-OUTPUT_FILE = ROOT_DIR / "analysis_results" / "business_group_mapping_result.json"
+# File đầu ra: Kết quả mapping cuối cùng (JSON Lines - mỗi dòng 1 doanh nghiệp)
+OUTPUT_FILE = ROOT_DIR / "analysis_results" / "business_group_mapping_result.jsonl"
+# File đầu ra: Thống kê số nhóm ngành (tính dần trong lúc mapping)
+STATS_FILE = ROOT_DIR / "analysis_results" / "business_group_stats.json"
+
+# --- CẤU HÌNH XỬ LÝ SONG SONG ---
+CHUNK_SIZE = 10000                      # Số dòng meta mỗi chunk gửi cho worker
+MAX_WORKERS = os.cpu_count() or 1
+MAX_PENDING_CHUNKS = MAX_WORKERS * 2    # Giới hạn số chunk đang xử lý -> RAM không tăng theo file
 
 # --- LOGGING ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Bảng mapping của từng worker process (nạp 1 lần qua initializer)
+_worker_category_map = None
+
 def load_mapping_dict(mapping_file_path):
     """
     Đọc file kết quả NLP và chuyển thành Dictionary để tra cứu nhanh.
@@ -47,6 +66,82 @@ def load_mapping_dict(mapping_file_path):
         logger.error(f"Error loading mapping file: {e}")
         return None
 
+def map_business(biz_data, category_map):
+    """
+    Gán nhóm ngành mới cho 1 doanh nghiệp.
+    Trả về None nếu doanh nghiệp không có category.
+    """
+    biz_name = biz_data.get('name')
+    original_cats = biz_data.get('category') # Đây là một list: ['Cafe', 'Bookstore']
+
+    if not original_cats or not isinstance(original_cats, list):
+        return None
+
+    # --- LOGIC MAPPING QUAN TRỌNG ---
+    new_groups_set = set() # Dùng set để tự động loại bỏ trùng lặp
+
+    for cat in original_cats:
+        cat_clean = str(cat).strip()
+        # Tra cứu trong từ điển mapping
+        found_group = category_map.get(cat_clean)
+
+        if found_group:
+            new_groups_set.add(found_group)
+        else:
+            # Nếu category này chưa có trong file phân loại NLP (hiếm gặp nếu file NLP chạy từ list unique đủ)
+            new_groups_set.add("Uncategorized")
+
+    return {
+        "name": biz_name,
+        "original_category": original_cats,
+        "new_groups": sorted(new_groups_set)
+    }
+
+def _init_worker(category_map):
+    global _worker_category_map
+    _worker_category_map = category_map
+
+def map_chunk(lines):
+    """
+    Worker: parse + mapping 1 chunk dòng meta.
+    Trả về các dòng JSONL đã serialize, số dòng hợp lệ và thống kê của riêng chunk.
+    """
+    output_lines = []
+    processed = 0
+    groups_per_business = Counter()   # Key = số nhóm, Value = số doanh nghiệp
+    group_frequency = Counter()       # Key = tên nhóm, Value = số doanh nghiệp
+    samples = []
+
+    for line in lines:
+        try:
+            biz_data = fast_json.loads(line)
+        except ValueError:
+            continue
+        processed += 1
+
+        mapped = map_business(biz_data, _worker_category_map)
+        if mapped is None:
+            continue
+
+        output_lines.append(fast_json.dumps(mapped, ensure_ascii=False))
+        groups_per_business[len(mapped["new_groups"])] += 1
+        group_frequency.update(mapped["new_groups"])
+        if len(samples) < 3:
+            samples.append(mapped)
+
+    return output_lines, processed, groups_per_business, group_frequency, samples
+
+def iter_chunks(file_obj, chunk_size):
+    """Đọc file theo từng chunk dòng (không đọc toàn bộ file vào RAM)"""
+    chunk = []
+    for line in file_obj:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
 def process_business_mapping():
     logger.info("=" * 50)
     logger.info("STARTING BUSINESS GROUP MAPPING")
@@ -62,72 +157,68 @@ def process_business_mapping():
         logger.error(f"Meta file not found: {META_FILE}")
         return
 
-    mapped_businesses = []
+    count = 0
+    mapped_count = 0
+    groups_per_business = Counter()
+    group_frequency = Counter()
+    samples = []
     
     try:
-        logger.info(f"Reading and processing {META_FILE}...")
-        
-        # Đọc file meta (dạng JSON Lines - mỗi dòng là 1 object JSON)
-        # Dùng chunksize để đọc nếu file quá lớn, ở đây đọc từng dòng
-        count = 0
-        with open(META_FILE, 'r', encoding='utf-8') as f:
-            # Đếm tổng số dòng để hiện thanh progress bar (tùy chọn, có thể bỏ qua bước đếm này nếu file quá lớn)
-            # lines = f.readlines() 
-            # total_lines = len(lines)
-            # f.seek(0) # Reset con trỏ về đầu file
-            
-            for line in tqdm(f, desc="Mapping Businesses"):
-                try:
-                    biz_data = json.loads(line)
-                    
-                    # Lấy thông tin cần thiết
-                    biz_name = biz_data.get('name')
-                    original_cats = biz_data.get('category') # Đây là một list: ['Cafe', 'Bookstore']
-                    
-                    if original_cats and isinstance(original_cats, list):
-                        # --- LOGIC MAPPING QUAN TRỌNG ---
-                        new_groups_set = set() # Dùng set để tự động loại bỏ trùng lặp
-                        
-                        for cat in original_cats:
-                            cat_clean = str(cat).strip()
-                            # Tra cứu trong từ điển mapping
-                            found_group = category_map.get(cat_clean)
-                            
-                            if found_group:
-                                new_groups_set.add(found_group)
-                            else:
-                                # Nếu category này chưa có trong file phân loại NLP (hiếm gặp nếu file NLP chạy từ list unique đủ)
-                                new_groups_set.add("Uncategorized")
-
-                        # Chuyển set về list để lưu vào JSON
-                        new_groups_list = sorted(list(new_groups_set))
-                        
-                        # Chỉ lưu nếu có dữ liệu
-                        mapped_businesses.append({
-                            "name": biz_name,
-                            "original_category": original_cats,
-                            "new_groups": new_groups_list
-                        })
-                    
-                    count += 1
-                except json.JSONDecodeError:
-                    continue
-
-        # 3. Lưu kết quả ra file
-        logger.info(f"Processed {count} businesses. Saving result...")
-        
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(mapped_businesses, f, ensure_ascii=False, indent=4)
-            
+        logger.info(f"Reading and processing {META_FILE} ({MAX_WORKERS} workers, chunk={CHUNK_SIZE})...")
+
+        # Đọc meta theo chunk -> worker parse & mapping song song -> ghi JSONL theo đúng thứ tự chunk
+        # Thống kê được cộng dồn ngay khi mỗi chunk hoàn tất
+        with open(META_FILE, 'r', encoding='utf-8') as f_in, \
+             open(OUTPUT_FILE, 'w', encoding='utf-8') as f_out, \
+             ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=_init_worker,
+                                 initargs=(category_map,)) as executor, \
+             tqdm(desc="Mapping Businesses", unit=" biz") as progress:
+
+            pending = deque()
+
+            def drain_one():
+                nonlocal count, mapped_count
+                lines, processed, chunk_groups, chunk_freq, chunk_samples = pending.popleft().result()
+                if lines:
+                    f_out.write("\n".join(lines))
+                    f_out.write("\n")
+                count += processed
+                mapped_count += len(lines)
+                groups_per_business.update(chunk_groups)
+                group_frequency.update(chunk_freq)
+                samples.extend(chunk_samples[:3 - len(samples)])
+                progress.update(processed)
+
+            for chunk in iter_chunks(f_in, CHUNK_SIZE):
+                pending.append(executor.submit(map_chunk, chunk))
+                if len(pending) >= MAX_PENDING_CHUNKS:
+                    drain_one()
+
+            while pending:
+                drain_one()
+
+        logger.info(f"Processed {count} businesses ({mapped_count} mapped).")
         logger.info(f"Successfully saved mapping to: {OUTPUT_FILE}")
+
+        # 3. Lưu thống kê (nhỏ, dùng lại cho count_multi_groups.py)
+        stats_data = {
+            "total_businesses": count,
+            "mapped_businesses": mapped_count,
+            "groups_per_business": {str(k): v for k, v in sorted(groups_per_business.items())},
+            "group_frequency": dict(group_frequency.most_common())
+        }
+        with open(STATS_FILE, 'w', encoding='utf-8') as f:
+            json.dump(stats_data, f, ensure_ascii=False, indent=4)
+
+        logger.info(f"Successfully saved group statistics to: {STATS_FILE}")
         
         # In thử vài ví dụ
-        if len(mapped_businesses) > 0:
+        if samples:
             logger.info("--- Sample Results ---")
-            for i in range(min(3, len(mapped_businesses))):
-                logger.info(f"Biz: {mapped_businesses[i]['name']}")
-                logger.info(f" -> Old: {mapped_businesses[i]['original_category']}")
-                logger.info(f" -> New: {mapped_businesses[i]['new_groups']}")
+            for biz in samples:
+                logger.info(f"Biz: {biz['name']}")
+                logger.info(f" -> Old: {biz['original_category']}")
+                logger.info(f" -> New: {biz['new_groups']}")
 
     except Exception as e:
         logger.error(f"Error processing businesses: {e}")
@@ -135,4 +226,4 @@ def process_business_mapping():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    process_business_mapping()
\ No newline at end of file
+    process_business_mapping()
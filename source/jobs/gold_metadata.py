@@ -14,8 +14,8 @@ def run(spark):
         # Việc đọc lại đảm bảo data nhất quán và tận dụng tối ưu hóa của Parquet
         log.info(">>> STEP 1: Reading Processed Data (Silver Layer)")
         
-        df_business_gold = extractor.read_processed_parquet(spark, settings.PATH_BUSINESS)
-        df_category_gold = extractor.read_processed_parquet(spark, settings.PATH_CATEGORY)
+        df_business_gold = extractor.read_table(spark, "business", settings.PATH_BUSINESS)
+        df_category_gold = extractor.read_table(spark, "category", settings.PATH_CATEGORY)
         
         # 2. Ghi vào DB (Gold Layer - Postgres)
         log.info(">>> STEP 2: Loading to PostgreSQL (Gold Layer)")
@@ -26,6 +26,9 @@ def run(spark):
         log.info("Loading DB: CATEGORY...")
         loader.write_to_postgres(df_category_gold, settings.TABLE_CATEGORY)
         
+        # Báo cho API biết dữ liệu đã đổi (cache theo version)
+        loader.bump_data_version(spark)
+        
         log.info("=== HOÀN TẤT JOB GOLD ===")
         
     except Exception as e:
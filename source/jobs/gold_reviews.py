@@ -1,4 +1,4 @@
-from modules import extractor, loader
+from modules import extractor, loader, facts
 from configs import settings
 # Không cần import transformer hay schemas vì dùng lại data chuẩn từ Silver
 from utils.logger import get_logger
@@ -13,12 +13,15 @@ def run(spark):
     try:
         # 1. Đọc lại Parquet từ tầng Silver
         log.info(">>> STEP 1: Reading Processed Data (Silver Layer)")
-        df_reviews_gold = extractor.read_processed_parquet(spark, settings.PATH_REVIEWS)
         df_customer_gold = extractor.read_processed_parquet(spark, settings.PATH_CUSTOMER)
+        # Aggregation chỉ đọc bảng facts hẹp (không có text)
+        df_facts_gold = facts.read_review_facts(spark)
+        # Dòng REVIEW cho Postgres = facts + text (join theo bucket, không shuffle)
+        df_reviews_gold = facts.read_reviews_for_load(spark)
         
         # 2. Tao Aggregations
         log.info(">>> STEP 2: Creating Sentiment Aggregations")
-        df_monthly, df_yearly, df_total = create_sentiment_aggregations(df_reviews_gold)
+        df_monthly, df_yearly, df_total = create_sentiment_aggregations(df_facts_gold)
 
         # 3. Ghi vào DB (Gold Layer - Postgres)
         log.info(">>> STEP 3: Loading to PostgreSQL (Gold Layer)")
@@ -41,6 +44,9 @@ def run(spark):
         log.info("Loading: AGG_SENTIMENT_TOTAL...")
         loader.write_to_postgres(df_total, settings.TABLE_TOTAL)
         
+        # Báo cho API biết dữ liệu đã đổi (cache theo version)
+        loader.bump_data_version(spark)
+        
         log.info("=== HOÀN TẤT JOB GOLD REVIEWS ===")
         
     except Exception as e:
@@ -1,4 +1,4 @@
-from modules import extractor, transformer, loader
+from modules import extractor, transformer, loader, keys
 from configs import settings
 from schemas import tables
 from utils.logger import get_logger
@@ -20,17 +20,28 @@ def run(spark):
         
         # [QUAN TRỌNG] Cache lại trước khi Ghi
         # Cache để tránh Spark đọc lại file Raw JSON 3 lần cho 3 bảng output
+        # (bước gán key bên dưới cũng đọc lại df_business)
         df_business.cache()
         df_category.cache()
         
+        # 2.1 Gán surrogate key (BIGINT) cho business, giữ business_id (gmap_id) để API tra cứu
+        log.info(">>> STEP 2.1: Assigning Surrogate Keys")
+        df_business_keyed = keys.assign_surrogate_keys(
+            spark, df_business, "business_id", "business_key", keys.PATH_KEYMAP_BUSINESS
+        )
+        df_category_keyed = keys.lookup_surrogate_keys(
+            spark, df_category, "business_id", "business_key", keys.PATH_KEYMAP_BUSINESS,
+            broadcast_map=True
+        ).drop("business_id")
+        
         # 3. Lưu xuống HDFS (Silver Layer - Parquet)
         log.info(">>> STEP 3: Writing to HDFS (Silver Layer)")
         
         log.info("Writing Parquet: BUSINESS")
-        loader.write_to_parquet(df_business, settings.PATH_BUSINESS)
+        loader.write_to_bucketed_table(df_business_keyed, "business", settings.PATH_BUSINESS)
         
         log.info("Writing Parquet: CATEGORY")
-        loader.write_to_parquet(df_category, settings.PATH_CATEGORY)
+        loader.write_to_bucketed_table(df_category_keyed, "category", settings.PATH_CATEGORY)
         
         # Giải phóng RAM
         df_business.unpersist()
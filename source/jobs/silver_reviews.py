@@ -1,4 +1,4 @@
-from modules import extractor, transformer, loader
+from modules import extractor, transformer, loader, keys, facts
 from configs import settings
 from schemas import tables
 from utils.logger import get_logger
@@ -23,14 +23,43 @@ def run(spark):
         df_reviews.cache()
         df_customer.cache()
 
+        # 2.1 Gán surrogate key (BIGINT): customer cấp key mới, business tra key map của metadata
+        # Review của business chưa có trong key map bị loại (không thỏa FK tới BUSINESS), số dòng bị loại được log
+        log.info(">>> STEP 2.1: Assigning Surrogate Keys")
+        df_customer_keyed = keys.assign_surrogate_keys(
+            spark, df_customer, "customer_id", "customer_key", keys.PATH_KEYMAP_CUSTOMER
+        )
+        # review_id: key map theo natural key (gmap_id|user_id|time), ổn định giữa các lần chạy
+        df_reviews_with_id = keys.assign_surrogate_keys(
+            spark, df_reviews, "review_natural_id", "review_id", keys.PATH_KEYMAP_REVIEW
+        )
+        df_reviews_keyed = keys.lookup_surrogate_keys(
+            spark, df_reviews_with_id, "business_id", "business_key", keys.PATH_KEYMAP_BUSINESS,
+            broadcast_map=True, report_dropped=True
+        )
+        df_reviews_keyed = keys.lookup_surrogate_keys(
+            spark, df_reviews_keyed, "customer_id", "customer_key", keys.PATH_KEYMAP_CUSTOMER
+        ).drop("business_id", "customer_id", "review_natural_id")
+
         # 3. Lưu xuống HDFS (Silver Layer - Parquet)
         log.info(">>> STEP 3: Writing to HDFS (Silver Layer)")
         
-        log.info("Writing Parquet: REVIEWS")
-        loader.write_to_parquet(df_reviews, settings.PATH_REVIEWS)
+        # REVIEW_FACTS (hẹp, không có text): đầu vào cho mọi job aggregate / recommendation
+        log.info("Writing Parquet: REVIEW_FACTS")
+        loader.write_to_bucketed_table(
+            facts.build_review_facts(df_reviews_keyed), facts.TABLE_REVIEW_FACTS,
+            facts.PATH_REVIEW_FACTS, sort_cols=facts.FACT_SORT_COLUMNS
+        )
+
+        # REVIEW_TEXT (review_id, business_key, text): gold_reviews join với facts để load Postgres
+        log.info("Writing Parquet: REVIEW_TEXT")
+        loader.write_to_bucketed_table(
+            facts.build_review_text(df_reviews_keyed), facts.TABLE_REVIEW_TEXT,
+            facts.PATH_REVIEW_TEXT, sort_cols=facts.TEXT_SORT_COLUMNS
+        )
         
         log.info("Writing Parquet: CUSTOMER")
-        loader.write_to_parquet(df_customer, settings.PATH_CUSTOMER)
+        loader.write_to_parquet(df_customer_keyed, settings.PATH_CUSTOMER)
 
         # Giải phóng RAM
         df_reviews.unpersist()
@@ -0,0 +1,143 @@
+"""
+Streaming Reviews Job (Structured Streaming)
+
+File source theo dõi thư mục landing: mỗi micro-batch gồm các review part mới, được
+xử lý bằng đúng logic batch (transform_reviews + surrogate key), rồi:
+    1. Append vào Silver stream store (partition theo ingest_batch)
+    2. Upsert CUSTOMER / REVIEW vào Postgres
+    3. Tính lại và upsert STATS_* cho các business bị ảnh hưởng, tăng DATA_VERSION.stats_version
+
+Exactly-once: danh sách file đã xử lý + batch_id nằm trong checkpoint; mọi sink đều
+idempotent (ghi đè đúng partition ingest_batch, upsert theo PK) nên chạy lại 1 batch
+sau khi lỗi không sinh dữ liệu trùng.
+
+Review part mới được đặt vào thư mục landing (mặc định PATH_RAW_REVIEWS + "_landing")
+để micro-batch đầu tiên không quét lại toàn bộ lịch sử. Silver stream store là phần
+"delta" so với bảng batch; khi tính lại stats, 2 store được union và dedupe theo review_id.
+"""
+
+from pyspark.sql.functions import col, lit
+from modules import transformer, loader, keys, facts
+from modules.aggregation import create_sentiment_aggregations
+from configs import settings
+from schemas import tables
+from utils.logger import get_logger
+
+log = get_logger("Job_Stream_Reviews")
+
+PATH_STREAM_SOURCE = getattr(settings, "PATH_STREAM_REVIEWS", settings.PATH_RAW_REVIEWS.rstrip("/") + "_landing")
+PATH_STREAM_CHECKPOINT = getattr(settings, "PATH_STREAM_CHECKPOINT", settings.PATH_REVIEWS.rstrip("/") + "_checkpoint")
+PATH_STREAM_SILVER_TEXT = getattr(settings, "PATH_STREAM_SILVER_TEXT", facts.PATH_REVIEW_TEXT.rstrip("/") + "_stream")
+PATH_STREAM_SILVER_FACTS = getattr(settings, "PATH_STREAM_SILVER_FACTS", facts.PATH_REVIEW_FACTS.rstrip("/") + "_stream")
+STREAM_TRIGGER_INTERVAL = getattr(settings, "STREAM_TRIGGER_INTERVAL", "1 minute")
+STREAM_MAX_FILES_PER_TRIGGER = getattr(settings, "STREAM_MAX_FILES_PER_TRIGGER", 4)
+
+
+def _write_batch_partition(df, path, batch_id):
+    """Ghi đè đúng partition ingest_batch=batch_id (chạy lại batch -> không trùng)"""
+    df.withColumn("ingest_batch", lit(batch_id)) \
+        .write.mode("overwrite") \
+        .option("partitionOverwriteMode", "dynamic") \
+        .partitionBy("ingest_batch") \
+        .parquet(path)
+
+
+def _read_affected_facts(spark, business_keys):
+    """Facts đầy đủ (Silver batch + stream delta) của các business bị ảnh hưởng"""
+    df_batch = facts.read_review_facts(spark) \
+        .where(col("business_key").isin(business_keys))
+    df_stream = spark.read.parquet(PATH_STREAM_SILVER_FACTS) \
+        .where(col("business_key").isin(business_keys)) \
+        .drop("ingest_batch")
+
+    # Review có thể nằm ở cả 2 store nếu file landing sau đó được gộp vào raw và full rebuild
+    return df_batch.unionByName(df_stream).dropDuplicates(["review_id"])
+
+
+def process_batch(df_raw, batch_id):
+    spark = df_raw.sparkSession
+    log.info(f"=== MICRO-BATCH {batch_id} ===")
+
+    # 1. Transform + surrogate key (giống silver_reviews)
+    df_reviews, df_customer = transformer.transform_reviews(df_raw, spark)
+    df_reviews.cache()
+    df_customer.cache()
+    df_customer_keyed = df_reviews_keyed = None
+
+    try:
+        if df_reviews.isEmpty():
+            log.info(f"Batch {batch_id}: không có review hợp lệ, bỏ qua.")
+            return
+
+        df_customer_keyed = keys.assign_surrogate_keys(
+            spark, df_customer, "customer_id", "customer_key", keys.PATH_KEYMAP_CUSTOMER
+        ).cache()
+        # Cùng key map review với silver_reviews -> review_id của 2 store khớp nhau
+        df_reviews_with_id = keys.assign_surrogate_keys(
+            spark, df_reviews, "review_natural_id", "review_id", keys.PATH_KEYMAP_REVIEW
+        )
+        df_reviews_keyed = keys.lookup_surrogate_keys(
+            spark, df_reviews_with_id, "business_id", "business_key", keys.PATH_KEYMAP_BUSINESS,
+            broadcast_map=True, report_dropped=True
+        )
+        df_reviews_keyed = keys.lookup_surrogate_keys(
+            spark, df_reviews_keyed, "customer_id", "customer_key", keys.PATH_KEYMAP_CUSTOMER
+        ).drop("business_id", "customer_id", "review_natural_id").cache()
+
+        # 2. Silver (stream delta)
+        log.info(f"Batch {batch_id}: appending to Silver stream store")
+        _write_batch_partition(facts.build_review_text(df_reviews_keyed), PATH_STREAM_SILVER_TEXT, batch_id)
+        _write_batch_partition(facts.build_review_facts(df_reviews_keyed), PATH_STREAM_SILVER_FACTS, batch_id)
+
+        # 3. Postgres: Customer trước Review (FK)
+        log.info(f"Batch {batch_id}: upserting CUSTOMER / REVIEW")
+        loader.upsert_to_postgres(df_customer_keyed, settings.TABLE_CUSTOMER, ["customer_key"])
+        loader.upsert_to_postgres(df_reviews_keyed, settings.TABLE_REVIEWS, ["review_id"])
+
+        # 4. Tính lại stats cho business bị ảnh hưởng
+        business_keys = [row["business_key"] for row in
+                         df_reviews_keyed.select("business_key").distinct().collect()]
+        log.info(f"Batch {batch_id}: recomputing stats for {len(business_keys):,} businesses")
+
+        # Input nhỏ (chỉ business bị ảnh hưởng): không dò hot key, không profile task time
+        df_monthly, df_yearly, df_total = create_sentiment_aggregations(
+            _read_affected_facts(spark, business_keys), hot_keys=[], profile=False
+        )
+        loader.upsert_to_postgres(df_monthly, settings.TABLE_MONTHLY, ["business_key", "year", "month"])
+        loader.upsert_to_postgres(df_yearly, settings.TABLE_YEARLY, ["business_key", "year"])
+        loader.upsert_to_postgres(df_total, settings.TABLE_TOTAL, ["business_key"])
+        # BUSINESS không đổi: chỉ cache stats / review của API hết hiệu lực (không rebuild snapshot)
+        loader.bump_stats_version(spark)
+
+        log.info(f"=== HOÀN TẤT MICRO-BATCH {batch_id} ===")
+
+    finally:
+        # Cả khi upsert lỗi: driver stream chạy lâu, mỗi lần retry batch lại cache thêm
+        for df in (df_customer_keyed, df_reviews_keyed, df_reviews, df_customer):
+            if df is not None:
+                df.unpersist()
+
+
+def run(spark):
+    log.info("=== BẮT ĐẦU JOB: STREAM REVIEWS (Landing JSON -> Silver + Postgres) ===")
+    log.info(f"Source: {PATH_STREAM_SOURCE} | Checkpoint: {PATH_STREAM_CHECKPOINT}")
+
+    try:
+        df_stream = spark.readStream \
+            .schema(tables.SCHEMA_RAW_REVIEWS) \
+            .option("mode", "DROPMALFORMED") \
+            .option("maxFilesPerTrigger", STREAM_MAX_FILES_PER_TRIGGER) \
+            .json(PATH_STREAM_SOURCE)
+
+        query = df_stream.writeStream \
+            .queryName("stream_reviews") \
+            .foreachBatch(process_batch) \
+            .option("checkpointLocation", PATH_STREAM_CHECKPOINT) \
+            .trigger(processingTime=STREAM_TRIGGER_INTERVAL) \
+            .start()
+
+        query.awaitTermination()
+
+    except Exception as e:
+        log.critical(f"LỖI JOB STREAM REVIEWS: {e}")
+        raise e
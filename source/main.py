@@ -4,7 +4,7 @@ from configs import settings
 from utils.logger import get_logger
 
 # Import các module đã tách biệt
-from jobs import silver_metadata, gold_metadata, silver_reviews, gold_reviews
+from jobs import silver_metadata, gold_metadata, silver_reviews, gold_reviews, stream_reviews
 
 # Đặt tên logger bằng tiếng Anh
 log = get_logger("Main_Orchestrator")
@@ -14,19 +14,43 @@ def create_spark_session():
     log.info(f"Initializing Spark Session. Jar Path: {settings.JAR_PATH}")
 
     # Cấu hình tối ưu (có thể thêm partition nếu dữ liệu lớn)
-    return SparkSession.builder \
+    builder = SparkSession.builder \
         .appName(settings.APP_NAME) \
         .config("spark.jars", settings.JAR_PATH) \
         .config("spark.driver.extraClassPath", settings.JAR_PATH) \
         .config("spark.executor.extraClassPath", settings.JAR_PATH) \
         .config("spark.sql.parquet.compression.codec", "snappy") \
-        .getOrCreate()
+        .config("spark.sql.sources.bucketing.enabled", "true")
+
+    # Bảng Silver bucket được đăng ký vào catalog:
+    # - Có Hive metastore -> bảng tồn tại qua các lần chạy / job khác
+    # - Local mode (catalog built-in) -> chỉ tồn tại trong session, job Gold đọc được vì chạy cùng session
+    if getattr(settings, "USE_HIVE_METASTORE", False):
+        builder = builder.enableHiveSupport()
+    warehouse_dir = getattr(settings, "SPARK_WAREHOUSE_DIR", None)
+    if warehouse_dir:
+        builder = builder.config("spark.sql.warehouse.dir", warehouse_dir)
+
+    return builder.getOrCreate()
 
 def main():
     log.info(">>>>>>>> STARTING ETL SYSTEM (MEDALLION ARCHITECTURE) <<<<<<<<")
     
     spark = create_spark_session()
     
+    # Chế độ streaming: python main.py --stream
+    # (Metadata + key map của business phải có sẵn từ lần chạy batch trước)
+    if "--stream" in sys.argv:
+        try:
+            stream_reviews.run(spark)
+        except Exception as e:
+            log.critical(f"STREAMING STOPPED DUE TO ERROR: {e}")
+            sys.exit(1)
+        finally:
+            spark.stop()
+            log.info("Spark Session closed.")
+        return
+    
     try:
         # --- PHASE 1: METADATA PIPELINE (Business, Category) ---
         # Chạy trước để đảm bảo Business ID đã tồn tại trong DB cho Foreign Key
@@ -5,31 +5,82 @@ Output:
     - agg_business_sentiment_monthly
     - agg_business_sentiment_yearly  
     - agg_business_sentiment_total
+
+Mỗi grain gồm: phân bố sentiment, histogram rating (rating_1..rating_5),
+response_count / response_rate (%) và latency phản hồi (avg / median, giờ).
+API đọc histogram từ STATS_TOTAL thay vì GROUP BY rating trên REVIEW.
 """
 
 from pyspark.sql import DataFrame
 from pyspark.sql.functions import (
     col, count, sum, avg, min, max,
-    when, round, lit
+    when, round, lit, percentile_approx
 )
+from configs import settings
+from modules import skew
 from utils.logger import get_logger
+from utils.metrics import record_metric
 
 log = get_logger("SentimentAggregator")
 
+# Chạy thêm 1 lần aggregation TOTAL KHÔNG salt (job group agg_total_unsalted) để run metrics có
+# phân phối task time trước/sau salt (chỉ khi có hot key; tốn thêm 1 lượt aggregation trên df đã cache)
+SKEW_PROFILE_BASELINE = getattr(settings, "SKEW_PROFILE_BASELINE", True)
+
+
+RATING_LEVELS = [1, 2, 3, 4, 5]
+
+# Cột bổ sung (histogram rating + phản hồi của chủ quán) cho cả 3 grain
+STATS_EXTRA_COLUMNS = [f"rating_{r}" for r in RATING_LEVELS] + [
+    "response_count", "response_rate",
+    "avg_response_latency_hrs", "median_response_latency_hrs"
+]
+
+
+def _count_conditions() -> dict:
+    """Các cột đếm có điều kiện (cộng dồn được -> dùng chung cho cả aggregation 1 pha và 2 pha)"""
+    conditions = {
+        "positive_count": col("sentiment_label") == "positive",
+        "neutral_count": col("sentiment_label") == "neutral",
+        "negative_count": col("sentiment_label") == "negative",
+    }
+    for r in RATING_LEVELS:
+        conditions[f"rating_{r}"] = col("rating") == r
+    conditions["response_count"] = col("has_response") == True
+    return conditions
+
+
+def _response_latency():
+    """Latency chỉ tính cho review có phản hồi (null ở review khác -> avg / percentile bỏ qua)"""
+    return when(col("has_response") == True, col("response_latency_hrs"))
+
 
 class SentimentAggregator:
     
-    def __init__(self):
+    def __init__(self, hot_keys=None, profile=True):
         log.info("Initializing SentimentAggregator...")
+        # Danh sách (business_key, estimated_rows) cần salt; rỗng -> aggregation 1 pha như cũ
+        # None -> tự phát hiện trên mẫu trong create_all
+        self.hot_keys = hot_keys
+        # Ghi phân phối task time (job group + Spark REST) cho mỗi aggregation; tắt với input nhỏ
+        self.profile = profile
     
     
     def _base_aggregation(self, df: DataFrame, group_cols: list) -> DataFrame:
-        return df.groupBy(*group_cols).agg(
-            count("*").alias("total_reviews"),
-            sum(when(col("sentiment_label") == "positive", 1).otherwise(0)).alias("positive_count"),
-            sum(when(col("sentiment_label") == "neutral", 1).otherwise(0)).alias("neutral_count"),
-            sum(when(col("sentiment_label") == "negative", 1).otherwise(0)).alias("negative_count"),
-            round(avg("sentiment_score"), 4).alias("avg_sentiment")
+        if self.hot_keys:
+            df_agg = self._salted_aggregation(df, group_cols)
+        else:
+            df_agg = df.groupBy(*group_cols).agg(
+                count("*").alias("total_reviews"),
+                *[sum(when(cond, 1).otherwise(0)).alias(name) for name, cond in _count_conditions().items()],
+                round(avg("sentiment_score"), 4).alias("avg_sentiment"),
+                round(avg(_response_latency()), 2).alias("avg_response_latency_hrs"),
+                round(percentile_approx(_response_latency(), 0.5), 2).alias("median_response_latency_hrs")
+            )
+
+        return df_agg.withColumn(
+            "response_rate",
+            round(col("response_count") * 100 / col("total_reviews"), 2)
         ).withColumn(
             "positive_pct", 
             round(col("positive_count") * 100 / col("total_reviews"), 2)
@@ -42,6 +93,57 @@ class SentimentAggregator:
         )
     
     
+    def _salted_aggregation(self, df: DataFrame, group_cols: list) -> DataFrame:
+        """
+        Aggregation 2 pha cho hot key:
+            Pha 1: group theo (group_cols, _salt) -> count / sum từng phần
+            Pha 2: group theo group_cols -> cộng dồn, avg = sum / count
+        """
+        df_salted = skew.add_salt(df, "business_key", self.hot_keys, salt_source="review_id")
+        conditions = _count_conditions()
+        
+        df_partial = df_salted.groupBy(*group_cols, skew.SALT_COL).agg(
+            count("*").alias("total_reviews"),
+            *[sum(when(cond, 1).otherwise(0)).alias(name) for name, cond in conditions.items()],
+            sum("sentiment_score").alias("score_sum"),
+            # avg() bỏ qua null -> mẫu số là số score khác null
+            count("sentiment_score").alias("score_count"),
+            sum(_response_latency()).alias("latency_sum"),
+            count(_response_latency()).alias("latency_count")
+        )
+        
+        df_agg = df_partial.groupBy(*group_cols).agg(
+            sum("total_reviews").alias("total_reviews"),
+            *[sum(name).alias(name) for name in conditions],
+            round(sum("score_sum") / sum("score_count"), 4).alias("avg_sentiment"),
+            round(sum("latency_sum") / sum("latency_count"), 2).alias("avg_response_latency_hrs")
+        )
+        
+        # Median không cộng dồn qua các salt được -> tính riêng trên review có phản hồi.
+        # percentile_approx có partial aggregation (sketch) nên hot key không dồn về 1 task.
+        df_median = df.where(_response_latency().isNotNull()).groupBy(*group_cols).agg(
+            round(percentile_approx("response_latency_hrs", 0.5), 2).alias("median_response_latency_hrs")
+        )
+        return df_agg.join(df_median, on=group_cols, how="left")
+    
+    
+    def _review_dates(self, df: DataFrame) -> DataFrame:
+        if not self.hot_keys:
+            return df.groupBy("business_key").agg(
+                min("time").cast("date").alias("first_review_date"),
+                max("time").cast("date").alias("last_review_date")
+            )
+        
+        df_salted = skew.add_salt(df, "business_key", self.hot_keys, salt_source="review_id")
+        return df_salted.groupBy("business_key", skew.SALT_COL).agg(
+            min("time").alias("first_time"),
+            max("time").alias("last_time")
+        ).groupBy("business_key").agg(
+            min("first_time").cast("date").alias("first_review_date"),
+            max("last_time").cast("date").alias("last_review_date")
+        )
+    
+    
     def create_monthly(self, df: DataFrame) -> DataFrame:
         log.info("Creating MONTHLY aggregation...")
         
@@ -51,15 +153,16 @@ class SentimentAggregator:
             df_prep = df.withColumn("year", year(col("time"))) \
                         .withColumn("month", month(col("time")))
         
-        df_monthly = self._base_aggregation(df_prep, ["business_id", "year", "month"])
+        df_monthly = self._base_aggregation(df_prep, ["business_key", "year", "month"])
         
         df_monthly = df_monthly.select(
-            "business_id", "year", "month",
+            "business_key", "year", "month",
             "total_reviews",
             "positive_count", "neutral_count", "negative_count",
             "positive_pct", "neutral_pct", "negative_pct",
-            "avg_sentiment"
-        ).orderBy("business_id", "year", "month")
+            "avg_sentiment",
+            *STATS_EXTRA_COLUMNS
+        ).orderBy("business_key", "year", "month")
         
         row_count = df_monthly.count()
         log.info(f"Monthly aggregation created: {row_count:,} rows")
@@ -75,15 +178,16 @@ class SentimentAggregator:
             from pyspark.sql.functions import year
             df_prep = df.withColumn("year", year(col("time")))
         
-        df_yearly = self._base_aggregation(df_prep, ["business_id", "year"])
+        df_yearly = self._base_aggregation(df_prep, ["business_key", "year"])
         
         df_yearly = df_yearly.select(
-            "business_id", "year",
+            "business_key", "year",
             "total_reviews",
             "positive_count", "neutral_count", "negative_count",
             "positive_pct", "neutral_pct", "negative_pct",
-            "avg_sentiment"
-        ).orderBy("business_id", "year")
+            "avg_sentiment",
+            *STATS_EXTRA_COLUMNS
+        ).orderBy("business_key", "year")
         
         row_count = df_yearly.count()
         log.info(f"Yearly aggregation created: {row_count:,} rows")
@@ -94,23 +198,21 @@ class SentimentAggregator:
     def create_total(self, df: DataFrame) -> DataFrame:
         log.info("Creating TOTAL aggregation...")
         
-        df_total = self._base_aggregation(df, ["business_id"])
+        df_total = self._base_aggregation(df, ["business_key"])
         
-        df_dates = df.groupBy("business_id").agg(
-            min("time").cast("date").alias("first_review_date"),
-            max("time").cast("date").alias("last_review_date")
-        )
+        df_dates = self._review_dates(df)
         
-        df_total = df_total.join(df_dates, on="business_id", how="left")
+        df_total = df_total.join(df_dates, on="business_key", how="left")
         
         df_total = df_total.select(
-            "business_id",
+            "business_key",
             "total_reviews",
             "positive_count", "neutral_count", "negative_count",
             "positive_pct", "neutral_pct", "negative_pct",
             "avg_sentiment",
+            *STATS_EXTRA_COLUMNS,
             "first_review_date", "last_review_date"
-        ).orderBy("business_id")
+        ).orderBy("business_key")
         
         row_count = df_total.count()
         log.info(f"Total aggregation created: {row_count:,} rows")
@@ -123,7 +225,10 @@ class SentimentAggregator:
         log.info("CREATING ALL SENTIMENT AGGREGATIONS")
         log.info("=" * 50)
         
-        required_cols = ["business_id", "time", "sentiment_score", "sentiment_label"]
+        required_cols = [
+            "business_key", "time", "sentiment_score", "sentiment_label",
+            "rating", "has_response", "response_latency_hrs"
+        ]
         missing_cols = [c for c in required_cols if c not in df.columns]
         
         if missing_cols:
@@ -133,9 +238,31 @@ class SentimentAggregator:
         total_reviews = df.count()
         log.info(f"Input: {total_reviews:,} reviews")
         
-        df_monthly = self.create_monthly(df)
-        df_yearly = self.create_yearly(df)
-        df_total = self.create_total(df)
+        # Phát hiện hot key trên mẫu (nếu caller chưa truyền vào; [] = không salt, bỏ qua bước này)
+        if self.hot_keys is None:
+            self.hot_keys = skew.detect_hot_keys(df, "business_key")
+            record_metric("skew_hot_keys", {
+                "key_col": "business_key",
+                "input_rows": total_reviews,
+                "num_hot_keys": len(self.hot_keys),
+                "hot_keys": [{"key": k, "estimated_rows": n} for k, n in self.hot_keys]
+            })
+        
+        if self.profile:
+            spark = df.sparkSession
+            
+            # Baseline (không salt) để so sánh phân phối task time trước/sau
+            if SKEW_PROFILE_BASELINE and self.hot_keys:
+                baseline = SentimentAggregator(hot_keys=[])
+                self._run_profiled(spark, "agg_total_unsalted", baseline.create_total, df, salted=False)
+            
+            df_monthly = self._run_profiled(spark, "agg_monthly", self.create_monthly, df)
+            df_yearly = self._run_profiled(spark, "agg_yearly", self.create_yearly, df)
+            df_total = self._run_profiled(spark, "agg_total", self.create_total, df)
+        else:
+            df_monthly = self.create_monthly(df)
+            df_yearly = self.create_yearly(df)
+            df_total = self.create_total(df)
         
         df.unpersist()
         
@@ -144,6 +271,23 @@ class SentimentAggregator:
         return df_monthly, df_yearly, df_total
     
     
+    def _run_profiled(self, spark, job_group: str, create_fn, df: DataFrame, salted=None):
+        """Chạy create_fn trong 1 job group rồi ghi phân phối task time vào run metrics"""
+        sc = spark.sparkContext
+        sc.setJobGroup(job_group, f"SentimentAggregator: {job_group}")
+        try:
+            df_result = create_fn(df)
+        finally:
+            sc.setLocalProperty("spark.jobGroup.id", None)
+        
+        record_metric("agg_task_time", {
+            "job_group": job_group,
+            "salted": bool(self.hot_keys) if salted is None else salted,
+            "stages": skew.collect_task_time_stats(spark, job_group)
+        })
+        return df_result
+    
+    
     def print_summary(self, df_monthly: DataFrame, df_yearly: DataFrame, df_total: DataFrame):
         print("\n" + "=" * 60)
         print("SENTIMENT AGGREGATION SUMMARY")
@@ -154,6 +298,6 @@ class SentimentAggregator:
         print("=" * 60 + "\n")
 
 
-def create_sentiment_aggregations(df_reviews: DataFrame) -> tuple:
-    aggregator = SentimentAggregator()
+def create_sentiment_aggregations(df_reviews: DataFrame, hot_keys=None, profile=True) -> tuple:
+    aggregator = SentimentAggregator(hot_keys=hot_keys, profile=profile)
     return aggregator.create_all(df_reviews)
\ No newline at end of file
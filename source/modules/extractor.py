@@ -1,3 +1,4 @@
+from modules.loader import SILVER_DATABASE
 from utils.logger import get_logger
 
 log = get_logger("Extractor")
@@ -11,4 +12,17 @@ def read_raw_json(spark, path, schema):
 def read_processed_parquet(spark, path):
     """Đọc Parquet từ Data Warehouse"""
     log.info(f"Đang đọc Parquet từ: {path}")
-    return spark.read.parquet(path)
\ No newline at end of file
+    return spark.read.parquet(path)
+
+def read_table(spark, table_name, path):
+    """
+    Đọc bảng Silver đã đăng ký trong catalog (giữ thông tin bucket -> join/groupBy
+    theo bucket column không cần shuffle). Nếu catalog không có bảng (vd. session mới
+    không dùng Hive metastore) thì đọc Parquet trực tiếp từ path.
+    """
+    full_name = f"{SILVER_DATABASE}.{table_name}"
+    if spark.catalog.tableExists(full_name):
+        log.info(f"Đang đọc bảng: {full_name}")
+        return spark.table(full_name)
+    log.warning(f"Catalog không có bảng {full_name}, đọc Parquet (không bucket) từ: {path}")
+    return read_processed_parquet(spark, path)
@@ -0,0 +1,83 @@
+"""
+Review Facts Module
+
+Tách dữ liệu review thành 2 store ở tầng Silver:
+    - review_facts: bảng hẹp cho analytics (key số, time, rating, sentiment, response)
+                    bucket theo business_key, sort theo (business_key, time) -> đọc nhanh, cache nhẹ
+    - review_text:  chỉ (review_id, business_key, text), cùng bucket theo business_key
+
+Mọi job aggregate / recommendation đọc review_facts, không đụng tới cột text.
+Dòng REVIEW cho Postgres (API / search) = review_facts join review_text theo
+(business_key, review_id): 2 bảng cùng số bucket nên join không cần shuffle.
+"""
+
+from pyspark.sql import DataFrame
+from configs import settings
+from modules import extractor
+from utils.logger import get_logger
+
+log = get_logger("ReviewFacts")
+
+# Mặc định đặt cạnh bảng REVIEWS ở Silver
+PATH_REVIEW_FACTS = getattr(settings, "PATH_REVIEW_FACTS", settings.PATH_REVIEWS.rstrip("/") + "_facts")
+TABLE_REVIEW_FACTS = "review_facts"
+FACT_SORT_COLUMNS = ["business_key", "time"]
+
+PATH_REVIEW_TEXT = getattr(settings, "PATH_REVIEW_TEXT", settings.PATH_REVIEWS.rstrip("/") + "_text")
+TABLE_REVIEW_TEXT = "review_text"
+TEXT_SORT_COLUMNS = ["business_key", "review_id"]
+
+REVIEW_FACT_COLUMNS = [
+    "review_id",
+    "business_key",
+    "customer_key",
+    "time",
+    "rating",
+    "sentiment_score",
+    "sentiment_label",
+    "has_response",
+    "response_latency_hrs"
+]
+
+REVIEW_TEXT_COLUMNS = ["review_id", "business_key", "text"]
+
+# Thứ tự cột của bảng REVIEW (Postgres)
+REVIEW_LOAD_COLUMNS = [
+    "review_id", "business_key", "customer_key", "time", "rating", "text",
+    "sentiment_score", "sentiment_label", "has_response", "response_latency_hrs"
+]
+
+
+def build_review_facts(df_reviews: DataFrame) -> DataFrame:
+    """Chiếu các cột fact (bucket/sort do loader.write_to_bucketed_table đảm nhận)"""
+    missing_cols = [c for c in REVIEW_FACT_COLUMNS if c not in df_reviews.columns]
+    if missing_cols:
+        raise ValueError(f"Missing required columns: {missing_cols}")
+
+    return df_reviews.select(*REVIEW_FACT_COLUMNS)
+
+
+def read_review_facts(spark) -> DataFrame:
+    """Đọc review_facts từ Silver (bảng bucket nếu catalog có)"""
+    return extractor.read_table(spark, TABLE_REVIEW_FACTS, PATH_REVIEW_FACTS)
+
+
+def build_review_text(df_reviews: DataFrame) -> DataFrame:
+    """Chiếu phần text của review (bucket/sort do loader.write_to_bucketed_table đảm nhận)"""
+    missing_cols = [c for c in REVIEW_TEXT_COLUMNS if c not in df_reviews.columns]
+    if missing_cols:
+        raise ValueError(f"Missing required columns: {missing_cols}")
+
+    return df_reviews.select(*REVIEW_TEXT_COLUMNS)
+
+
+def read_review_text(spark) -> DataFrame:
+    """Đọc review_text từ Silver (bảng bucket nếu catalog có)"""
+    return extractor.read_table(spark, TABLE_REVIEW_TEXT, PATH_REVIEW_TEXT)
+
+
+def read_reviews_for_load(spark) -> DataFrame:
+    """Dựng lại dòng REVIEW đầy đủ cho Postgres từ facts + text"""
+    return read_review_facts(spark) \
+        .join(read_review_text(spark), on=["business_key", "review_id"], how="left") \
+        .select(*REVIEW_LOAD_COLUMNS)
@@ -0,0 +1,100 @@
+"""
+Surrogate Key Module
+
+Gán khóa BIGINT ổn định (surrogate key) cho natural key dạng text
+(gmap_id của business, user_id của customer, gmap_id|user_id|time của review).
+
+Key map được lưu ở Parquet với 2 cột (natural_id, surrogate_key):
+    - Entity đã có key -> giữ nguyên key cũ (ổn định giữa các lần chạy)
+    - Entity mới -> cấp key tiếp theo (max_key + 1, ...) và append vào key map
+"""
+
+from pyspark.sql import DataFrame
+from pyspark.sql.functions import col, broadcast, max as spark_max
+from pyspark.sql.types import StructType, StructField, StringType, LongType
+from pyspark.sql.utils import AnalysisException
+from configs import settings
+from utils.logger import get_logger
+from utils.metrics import record_metric
+
+log = get_logger("KeyAssigner")
+
+# Đường dẫn key map (mặc định đặt cạnh bảng Silver tương ứng)
+PATH_KEYMAP_BUSINESS = getattr(settings, "PATH_KEYMAP_BUSINESS", settings.PATH_BUSINESS.rstrip("/") + "_keymap")
+PATH_KEYMAP_CUSTOMER = getattr(settings, "PATH_KEYMAP_CUSTOMER", settings.PATH_CUSTOMER.rstrip("/") + "_keymap")
+PATH_KEYMAP_REVIEW = getattr(settings, "PATH_KEYMAP_REVIEW", settings.PATH_REVIEWS.rstrip("/") + "_keymap")
+
+SCHEMA_KEY_MAP = StructType([
+    StructField("natural_id", StringType(), False),
+    StructField("surrogate_key", LongType(), False)
+])
+
+
+def read_key_map(spark, map_path) -> DataFrame:
+    """Đọc key map, trả về DataFrame rỗng nếu chưa tồn tại (lần chạy đầu tiên)"""
+    try:
+        return spark.read.parquet(map_path)
+    except AnalysisException:
+        log.info(f"Key map chưa tồn tại, tạo mới: {map_path}")
+        return spark.createDataFrame([], SCHEMA_KEY_MAP)
+
+
+def assign_surrogate_keys(spark, df: DataFrame, natural_col: str, key_col: str, map_path: str) -> DataFrame:
+    """
+    Cấp key cho các natural key mới trong df (incremental), lưu vào key map
+    và trả về df kèm cột key_col.
+    """
+    log.info(f"Assigning surrogate keys: {natural_col} -> {key_col} ({map_path})")
+
+    df_map = read_key_map(spark, map_path).cache()
+    max_key = df_map.agg(spark_max("surrogate_key")).first()[0] or 0
+
+    # Natural key chưa có trong key map (sort để key cấp ra có thứ tự xác định)
+    df_new_ids = df.select(col(natural_col).alias("natural_id")) \
+        .where(col("natural_id").isNotNull()) \
+        .distinct() \
+        .join(df_map, on="natural_id", how="left_anti") \
+        .orderBy("natural_id")
+
+    # zipWithIndex: đánh số liên tục không cần dồn về 1 partition như Window.orderBy
+    df_new_keys = df_new_ids.rdd.zipWithIndex() \
+        .map(lambda pair: (pair[0]["natural_id"], pair[1] + max_key + 1)) \
+        .toDF(SCHEMA_KEY_MAP) \
+        .cache()
+
+    # [QUAN TRỌNG] Materialize trước khi append, vì df_new_keys được tính từ chính key map
+    new_count = df_new_keys.count()
+    if new_count:
+        df_new_keys.write.mode("append").parquet(map_path)
+    log.info(f"-> {new_count:,} new keys (previous max key: {max_key:,})")
+
+    df_new_keys.unpersist()
+    df_map.unpersist()
+
+    return lookup_surrogate_keys(spark, df, natural_col, key_col, map_path)
+
+
+def lookup_surrogate_keys(spark, df: DataFrame, natural_col: str, key_col: str, map_path: str,
+                          how="inner", broadcast_map=False, report_dropped=False) -> DataFrame:
+    """
+    Thêm cột key_col vào df bằng cách tra key map (không cấp key mới).
+    how="inner" sẽ loại các dòng có natural key chưa có trong key map;
+    report_dropped=True đếm số dòng bị loại (log + run metric, tốn thêm 1 job -> nên cache df trước).
+    """
+    df_map = read_key_map(spark, map_path).select(
+        col("natural_id").alias(natural_col),
+        col("surrogate_key").alias(key_col)
+    )
+    if broadcast_map:
+        df_map = broadcast(df_map)
+
+    if report_dropped and how == "inner":
+        dropped = df.join(df_map, on=natural_col, how="left_anti").count()
+        record_metric("keys_lookup_dropped", {
+            "natural_col": natural_col,
+            "key_map": map_path,
+            "dropped_rows": dropped
+        })
+        if dropped:
+            log.warning(f"{dropped:,} dòng bị loại: {natural_col} chưa có trong key map {map_path}")
+    return df.join(df_map, on=natural_col, how=how)
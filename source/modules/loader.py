@@ -3,6 +3,11 @@ from utils.logger import get_logger
 
 log = get_logger("Loader")
 
+# Bucket count dùng chung cho mọi bảng Silver bucket theo business_key.
+# Các bảng phải cùng số bucket thì join/aggregate giữa chúng mới bỏ được exchange.
+NUM_BUCKETS = getattr(settings, "NUM_BUCKETS", 64)
+SILVER_DATABASE = getattr(settings, "SILVER_DATABASE", "silver")
+
 def write_to_parquet(df, path, partition_col=None):
     """Ghi xuống HDFS"""
     log.info(f"Ghi Parquet xuống: {path}")
@@ -12,6 +17,27 @@ def write_to_parquet(df, path, partition_col=None):
     writer.parquet(path)
     log.info("-> Ghi Parquet thành công.")
 
+def write_to_bucketed_table(df, table_name, path, bucket_col="business_key", sort_cols=None):
+    """
+    Ghi bảng Parquet bucket + sort theo bucket_col, đăng ký vào catalog (Hive metastore
+    hoặc catalog built-in). Dữ liệu vẫn nằm ở path như bảng Parquet thường.
+    """
+    full_name = f"{SILVER_DATABASE}.{table_name}"
+    sort_cols = sort_cols or [bucket_col]
+    log.info(f"Ghi bảng bucket {full_name} ({NUM_BUCKETS} buckets theo {bucket_col}) xuống: {path}")
+
+    df.sparkSession.sql(f"CREATE DATABASE IF NOT EXISTS {SILVER_DATABASE}")
+
+    # Repartition cùng hash với bucketBy -> mỗi bucket đúng 1 file (không sinh file vụn)
+    df.repartition(NUM_BUCKETS, bucket_col) \
+        .write.mode("overwrite") \
+        .format("parquet") \
+        .bucketBy(NUM_BUCKETS, bucket_col) \
+        .sortBy(*sort_cols) \
+        .option("path", path) \
+        .saveAsTable(full_name)
+    log.info("-> Ghi bảng bucket thành công.")
+
 def write_to_postgres(df, table_name):
     """Ghi vào Postgres qua JDBC"""
     log.info(f"Đẩy dữ liệu vào Postgres Table: {table_name}")
@@ -31,4 +57,78 @@ def write_to_postgres(df, table_name):
         log.info(f"-> Đẩy vào Postgres bảng {table_name} thành công.")
     except Exception as e:
         log.error(f"Lỗi ghi Postgres: {e}")
-        raise e
\ No newline at end of file
+        raise e
+
+def execute_sql(spark, statements):
+    """
+    Chạy các câu SQL (DDL/DML) trên Postgres qua JDBC driver của JVM trong 1 transaction.
+    Dùng cho các thao tác DataFrameWriter không hỗ trợ (upsert, delete...).
+    """
+    if isinstance(statements, str):
+        statements = [statements]
+
+    jvm = spark.sparkContext._gateway.jvm
+    jvm.java.lang.Class.forName(settings.DB_DRIVER)
+    conn = jvm.java.sql.DriverManager.getConnection(settings.DB_URL, settings.DB_USER, settings.DB_PASS)
+    try:
+        conn.setAutoCommit(False)
+        stmt = conn.createStatement()
+        for sql in statements:
+            stmt.execute(sql)
+        conn.commit()
+        stmt.close()
+    except Exception as e:
+        conn.rollback()
+        log.error(f"Lỗi thực thi SQL: {e}")
+        raise e
+    finally:
+        conn.close()
+
+def upsert_to_postgres(df, table_name, conflict_cols, update_on_conflict=True):
+    """
+    Upsert vào Postgres: ghi df vào bảng staging (JDBC), rồi
+    INSERT ... SELECT ... ON CONFLICT (conflict_cols) DO UPDATE / DO NOTHING.
+    Chạy lại cùng dữ liệu cho kết quả như nhau (idempotent).
+    """
+    staging_table = f"{table_name}_staging"
+    cols = df.columns
+    log.info(f"Upsert vào Postgres Table: {table_name} (staging: {staging_table})")
+
+    properties = {
+        "user": settings.DB_USER,
+        "password": settings.DB_PASS,
+        "driver": settings.DB_DRIVER,
+        "batchsize": "5000",
+        # Giữ nguyên cấu trúc bảng staging giữa các lần ghi, chỉ TRUNCATE dữ liệu
+        "truncate": "true"
+    }
+    df.write.jdbc(url=settings.DB_URL, table=staging_table, mode="overwrite", properties=properties)
+
+    col_list = ", ".join(cols)
+    if update_on_conflict:
+        update_cols = [c for c in cols if c not in conflict_cols]
+        on_conflict = "DO UPDATE SET " + ", ".join(f"{c} = EXCLUDED.{c}" for c in update_cols)
+    else:
+        on_conflict = "DO NOTHING"
+
+    execute_sql(df.sparkSession, (
+        f"INSERT INTO {table_name} ({col_list}) "
+        f"SELECT {col_list} FROM {staging_table} "
+        f"ON CONFLICT ({', '.join(conflict_cols)}) {on_conflict}"
+    ))
+    log.info(f"-> Upsert vào bảng {table_name} thành công.")
+
+
+def bump_data_version(spark):
+    """Tăng DATA_VERSION sau khi load Gold xong -> API bỏ toàn bộ cache cũ"""
+    execute_sql(spark, "UPDATE DATA_VERSION SET version = version + 1, updated_at = NOW() WHERE id = 1")
+    log.info("-> Đã tăng DATA_VERSION (API cache hết hiệu lực).")
+
+
+def bump_stats_version(spark):
+    """
+    Chỉ tăng stats_version (job stream: REVIEW / STATS_* đổi, BUSINESS không đổi)
+    -> API chỉ bỏ cache stats / review, giữ cache business và snapshot in-memory
+    """
+    execute_sql(spark, "UPDATE DATA_VERSION SET stats_version = stats_version + 1, stats_updated_at = NOW() WHERE id = 1")
+    log.info("-> Đã tăng DATA_VERSION.stats_version (cache stats / review của API hết hiệu lực).")
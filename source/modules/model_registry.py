@@ -0,0 +1,203 @@
+"""
+Model Registry Module
+
+Quản lý model Spark NLP cho SentimentAnalyzer:
+    - Đường dẫn model lấy từ config (settings.SENTIMENT_MODELS / settings.MODEL_DIR),
+      không hardcode theo máy
+    - Mỗi model có ID + version -> pipeline đã fit được lưu theo pipeline ID
+    - PipelineModel được giữ trong process (dùng lại giữa các SentimentAnalyzer / micro-batch)
+      và lưu xuống đĩa để lần chạy sau load lại ngay, không phải build lại
+
+Executor: PipelineModel.load / save đọc-ghi metadata bằng Spark job, nên trên cluster mọi
+node phải đọc được model ở CÙNG một đường dẫn. prepare_model_storage() lo việc này 1 lần / app:
+    - master local[*], URI dùng chung (hdfs://, s3a://, ...) hoặc MODEL_DIR_SHARED = True
+      (thư mục mount giống nhau trên mọi node): dùng thẳng MODEL_DIR
+    - còn lại (MODEL_DIR local trên driver): sc.addFile(MODEL_DIR, recursive=True) rồi mỗi
+      executor (và driver) copy bản SparkFiles.get(...) vào cache local cố định
+      MODEL_LOCAL_CACHE/<pipeline_id> -> load từ file://<cache> trên mọi node
+Cấu hình sai (đường dẫn model local ngoài MODEL_DIR trên cluster...) raise ModelStorageError,
+không âm thầm đổi sang VADER.
+Trọng số TF được Spark NLP broadcast xuống executor 1 lần cho mỗi PipelineModel.
+"""
+
+import os
+import shutil
+import socket
+import time
+import uuid
+
+from configs import settings
+from utils.logger import get_logger
+
+log = get_logger("ModelRegistry")
+
+MODEL_DIR = getattr(settings, "MODEL_DIR", os.path.expanduser("~/bigdata/models/sparknlp"))
+# MODEL_DIR là đường dẫn local nhưng được mount giống nhau trên mọi node (NFS / shared disk)
+MODEL_DIR_SHARED = getattr(settings, "MODEL_DIR_SHARED", False)
+
+# Cache local trên mỗi node khi MODEL_DIR được ship bằng SparkFiles (cùng đường dẫn trên mọi node)
+MODEL_LOCAL_CACHE = getattr(settings, "MODEL_LOCAL_CACHE", "/tmp/sparknlp_models")
+
+SHARED_FS_SCHEMES = ("hdfs://", "viewfs://", "s3a://", "s3://", "gs://", "abfs://", "abfss://", "wasbs://", "dbfs:/")
+
+# model_name -> {id, version, path}; path mặc định = MODEL_DIR/<id>
+SENTIMENT_MODELS = getattr(settings, "SENTIMENT_MODELS", {
+    "use": {"id": "tfhub_use", "version": "2.4.0"},
+    "sentimentdl": {"id": "sentimentdl_use_twitter", "version": "2.7.1"},
+})
+
+# Pipeline model đã fit (memo trong process): pipeline_id -> PipelineModel
+_PIPELINE_CACHE = {}
+
+# Thư mục gốc của model mà mọi node đọc được (set bởi prepare_model_storage); None -> MODEL_DIR
+_model_root = None
+# MODEL_DIR đã được ship qua SparkFiles -> bản trên node là cache, không lưu pipeline vào đó
+_shipped = False
+
+
+class ModelStorageError(RuntimeError):
+    """Model không đọc được từ executor (cấu hình storage sai) -> dừng job, không fallback VADER"""
+
+
+def is_shared_path(path):
+    return path.startswith(SHARED_FS_SCHEMES)
+
+
+def ensure_cache_dir():
+    """Tạo thư mục cache và set SPARK_NLP_CACHE (gọi TRƯỚC KHI import sparknlp)"""
+    if not is_shared_path(MODEL_DIR):
+        os.makedirs(MODEL_DIR, exist_ok=True)
+    os.environ.setdefault("SPARK_NLP_CACHE", MODEL_DIR)
+    return MODEL_DIR
+
+
+def _is_local_master(spark):
+    return spark.sparkContext.master.startswith("local")
+
+
+def _copy_into_cache(source_dir, target_dir):
+    """Copy source_dir -> target_dir nếu chưa có; an toàn khi nhiều task cùng node chạy song song"""
+    if os.path.isdir(target_dir):
+        return
+    os.makedirs(os.path.dirname(target_dir), exist_ok=True)
+    tmp_dir = f"{target_dir}.tmp-{uuid.uuid4().hex}"
+    shutil.copytree(source_dir, tmp_dir)
+    try:
+        os.rename(tmp_dir, target_dir)
+    except OSError:
+        # Task khác trên cùng node đã copy xong trước
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _ship_model_dir(spark):
+    """addFile(MODEL_DIR) + copy vào MODEL_LOCAL_CACHE/<pipeline_id> trên driver và mọi executor"""
+    sc = spark.sparkContext
+    source_dir = MODEL_DIR[len("file://"):] if MODEL_DIR.startswith("file://") else MODEL_DIR
+    if not os.path.isdir(source_dir):
+        raise ModelStorageError(f"MODEL_DIR không tồn tại trên driver: {source_dir}")
+
+    target_dir = os.path.join(MODEL_LOCAL_CACHE, pipeline_id())
+    name = os.path.basename(source_dir.rstrip("/"))
+
+    start = time.perf_counter()
+    sc.addFile(source_dir, recursive=True)
+    _copy_into_cache(source_dir, target_dir)
+
+    def copy_on_executor(_):
+        from pyspark import SparkFiles
+        _copy_into_cache(SparkFiles.get(name), target_dir)
+        yield socket.gethostname()
+
+    # Nhiều task hơn số core -> mọi executor đang chạy đều nhận ít nhất 1 task
+    num_tasks = max(sc.defaultParallelism * 2, 2)
+    hosts = set(sc.parallelize(range(num_tasks), num_tasks).mapPartitions(copy_on_executor).collect())
+    log.info(f"Đã ship {source_dir} -> {target_dir} trên {len(hosts)} node "
+             f"({time.perf_counter() - start:.1f}s): {sorted(hosts)}")
+    return "file://" + target_dir
+
+
+def prepare_model_storage(spark):
+    """
+    Chọn thư mục model mà mọi node đọc được (1 lần / process), ship MODEL_DIR nếu cần.
+    Raise ModelStorageError khi cấu hình không thể chạy trên cluster.
+    """
+    global _model_root, _shipped
+    if _model_root is not None:
+        return _model_root
+
+    master = spark.sparkContext.master
+    if _is_local_master(spark) or is_shared_path(MODEL_DIR) or MODEL_DIR_SHARED:
+        _model_root = MODEL_DIR
+    else:
+        # Đường dẫn riêng ngoài MODEL_DIR không được ship -> phải nằm trên storage dùng chung
+        explicit = [spec["path"] for spec in SENTIMENT_MODELS.values() if spec.get("path")]
+        explicit += [p for p in [getattr(settings, "SENTIMENT_PIPELINE_PATH", None)] if p]
+        local_paths = [p for p in explicit if not is_shared_path(p)]
+        if local_paths:
+            raise ModelStorageError(
+                f"Master '{master}': đường dẫn model local ngoài MODEL_DIR {local_paths}. "
+                f"Bỏ path riêng (dùng MODEL_DIR/<id>) hoặc đặt lên HDFS / object store."
+            )
+        _model_root = _ship_model_dir(spark)
+        _shipped = True
+
+    log.info(f"Model root cho master '{master}': {_model_root}")
+    return _model_root
+
+
+def _can_save_pipeline():
+    """Lưu pipeline ghi metadata từ executor -> chỉ khi đích là storage mọi node thấy chung"""
+    return not _shipped or is_shared_path(pipeline_path())
+
+
+def model_path(name):
+    spec = SENTIMENT_MODELS[name]
+    return spec.get("path") or os.path.join(_model_root or MODEL_DIR, spec["id"])
+
+
+def pipeline_id():
+    """ID có version của pipeline sentiment, đổi model/version -> pipeline mới"""
+    return "sentiment__" + "__".join(
+        f"{SENTIMENT_MODELS[name]['id']}-{SENTIMENT_MODELS[name]['version']}"
+        for name in sorted(SENTIMENT_MODELS)
+    )
+
+
+def pipeline_path():
+    return getattr(settings, "SENTIMENT_PIPELINE_PATH", None) or \
+        os.path.join(_model_root or MODEL_DIR, "pipelines", pipeline_id())
+
+
+def get_pipeline_model(spark, build_pipeline):
+    """
+    Trả về (PipelineModel, source, warmup_seconds).
+    Thứ tự: memo trong process -> load từ đĩa -> build_pipeline() + fit + save.
+    """
+    from pyspark.ml import PipelineModel
+    from pyspark.sql.types import StructType, StructField, StringType
+
+    pid = pipeline_id()
+    if pid in _PIPELINE_CACHE:
+        return _PIPELINE_CACHE[pid], "memory", 0.0
+
+    start = time.perf_counter()
+    path = pipeline_path()
+    try:
+        model = PipelineModel.load(path)
+        source = "disk"
+    except Exception:
+        log.info(f"Chưa có pipeline đã lưu, build mới: {pid}")
+        # Các stage đều là model pretrained -> fit không cần dữ liệu thật
+        df_empty = spark.createDataFrame([], StructType([StructField("_text_input", StringType(), True)]))
+        model = build_pipeline().fit(df_empty)
+        if _can_save_pipeline():
+            model.write().overwrite().save(path)
+        else:
+            log.warning(f"Không lưu pipeline vào cache local đã ship ({path}); "
+                        f"chạy 1 lần ở local[*] hoặc dùng MODEL_DIR dùng chung để lưu lại")
+        source = "fit"
+    warmup_seconds = time.perf_counter() - start
+
+    _PIPELINE_CACHE[pid] = model
+    log.info(f"Pipeline {pid} sẵn sàng (source={source}, warm-up {warmup_seconds:.2f}s)")
+    return model, source, warmup_seconds
@@ -1,20 +1,34 @@
-import os
+import time
 
 from pyspark.sql import SparkSession
 from pyspark.sql.functions import (
-    col, when, udf, coalesce, lit, element_at
+    col, when, udf, coalesce, lit, element_at,
+    length, substring, floor
 )
 from pyspark.sql.types import FloatType, StringType
 
+from configs import settings
+from modules import model_registry
 from utils.logger import get_logger
-
-# Set cache directory TRUOC KHI import sparknlp
-CACHE_DIR = os.path.expanduser("~/bigdata/models/sparknlp")
-os.makedirs(CACHE_DIR, exist_ok=True)
-os.environ["SPARK_NLP_CACHE"] = CACHE_DIR
+from utils.metrics import record_metric
 
 log = get_logger("SentimentAnalyzer")
 
+# Batch size của UniversalSentenceEncoder (số câu / lần chạy TF)
+SENTIMENT_BATCH_SIZE = getattr(settings, "SENTIMENT_BATCH_SIZE", 64)
+# Cắt text dài hơn ngưỡng này (ký tự) trước khi embed; None/0 -> không cắt
+SENTIMENT_MAX_CHARS = getattr(settings, "SENTIMENT_MAX_CHARS", 2000)
+# Sắp xếp text theo độ dài trong partition trước inference để giảm padding trong batch TF:
+#   "none"   -> giữ thứ tự gốc
+#   "sort"   -> sort theo độ dài chính xác
+#   "bucket" -> sort theo bucket độ dài (floor(len / width)), rẻ hơn "sort"
+SENTIMENT_LENGTH_BUCKETING = getattr(settings, "SENTIMENT_LENGTH_BUCKETING", "bucket")
+SENTIMENT_LENGTH_BUCKET_WIDTH = getattr(settings, "SENTIMENT_LENGTH_BUCKET_WIDTH", 64)
+# Repartition trước khi sort (None -> giữ số partition hiện tại)
+SENTIMENT_NUM_PARTITIONS = getattr(settings, "SENTIMENT_NUM_PARTITIONS", None)
+# Cho phép fallback VADER khi Spark NLP lỗi trên cluster (local[*] luôn fallback)
+SENTIMENT_ALLOW_VADER_FALLBACK = getattr(settings, "SENTIMENT_ALLOW_VADER_FALLBACK", False)
+
 
 class SentimentAnalyzer:
     """
@@ -28,20 +42,34 @@ class SentimentAnalyzer:
     def __init__(self, spark, 
                  positive_threshold=0.6, 
                  negative_threshold=0.4,
-                 use_sparknlp=True):
+                 use_sparknlp=True,
+                 batch_size=SENTIMENT_BATCH_SIZE,
+                 max_chars=SENTIMENT_MAX_CHARS,
+                 length_bucketing=SENTIMENT_LENGTH_BUCKETING,
+                 bucket_width=SENTIMENT_LENGTH_BUCKET_WIDTH,
+                 num_partitions=SENTIMENT_NUM_PARTITIONS):
         self.spark = spark
         self.positive_threshold = positive_threshold
         self.negative_threshold = negative_threshold
         self.use_sparknlp = use_sparknlp
+        self.batch_size = batch_size
+        self.max_chars = max_chars
+        self.length_bucketing = length_bucketing
+        self.bucket_width = bucket_width
+        self.num_partitions = num_partitions
         self.pipeline = None
         self.model = None
         self.method = None
+        # Thời gian warm-up (load/fit model) tách riêng với thời gian inference
+        self.timings = {"warmup_sec": 0.0, "warmup_source": None, "inference_sec": None}
         
         log.info("Initializing SentimentAnalyzer...")
         log.info(f"  - positive_threshold: {positive_threshold}")
         log.info(f"  - negative_threshold: {negative_threshold}")
         log.info(f"  - use_sparknlp: {use_sparknlp}")
-        log.info(f"  - cache_dir: {CACHE_DIR}")
+        log.info(f"  - model_dir: {model_registry.MODEL_DIR}")
+        log.info(f"  - batch_size: {batch_size}, max_chars: {max_chars}, "
+                 f"length_bucketing: {length_bucketing} (width={bucket_width})")
         
         if use_sparknlp:
             self._try_load_sparknlp()
@@ -50,50 +78,77 @@ class SentimentAnalyzer:
     
     
     def _try_load_sparknlp(self):
-        """Load Spark NLP, fallback to VADER if failed"""
+        """Load Spark NLP pipeline qua model registry; fallback to VADER if failed (local[*] only by default)"""
         try:
             log.info("Loading Spark NLP pipeline...")
             
+            # Set cache directory TRUOC KHI import sparknlp
+            model_registry.ensure_cache_dir()
+            # Cluster: ship MODEL_DIR tới executor (SparkFiles) nếu nó chỉ có trên driver
+            model_registry.prepare_model_storage(self.spark)
             import sparknlp
-            from sparknlp.base import DocumentAssembler
-            from sparknlp.annotator import (
-                SentimentDLModel,
-                UniversalSentenceEncoder
-            )
-            from pyspark.ml import Pipeline
             
             log.info("  - Spark NLP started")
             
-            document = DocumentAssembler() \
-                .setInputCol("_text_input") \
-                .setOutputCol("document")
-            log.info("  - DocumentAssembler created")
-            
-            # Đường dẫn model LOCAL
-            use_path = "/home/thka02415/bigdata/models/sparknlp/tfhub_use"
-            sentiment_path = "/home/thka02415/bigdata/models/sparknlp/sentimentdl_use_twitter"
-            
-            log.info("  - Loading UniversalSentenceEncoder from LOCAL...")
-            use = UniversalSentenceEncoder.load(use_path) \
-                .setInputCols(["document"]) \
-                .setOutputCol("embeddings")
-            log.info("  - UniversalSentenceEncoder loaded!")
-            
-            log.info("  - Loading SentimentDLModel from LOCAL...")
-            sentiment = SentimentDLModel.load(sentiment_path) \
-                .setInputCols(["embeddings"]) \
-                .setOutputCol("sentiment")
-            log.info("  - SentimentDLModel loaded!")
-            
-            self.pipeline = Pipeline(stages=[document, use, sentiment])
+            shared_model, source, warmup = model_registry.get_pipeline_model(self.spark, self._build_pipeline)
+            # PipelineModel trong registry dùng chung cả process -> set param trên bản copy của analyzer này
+            # (transform là lazy: set thẳng trên bản chung thì analyzer set sau cùng thắng)
+            self.model = shared_model.copy()
+            for stage in self.model.stages:
+                if hasattr(stage, "setBatchSize"):
+                    stage.setBatchSize(self.batch_size)
+            self.timings["warmup_sec"] = round(warmup, 3)
+            self.timings["warmup_source"] = source
             self.method = "sparknlp"
             
-            log.info("Spark NLP loaded successfully from LOCAL!")
+            record_metric("sentiment_warmup", {
+                "pipeline_id": model_registry.pipeline_id(),
+                "source": source,
+                "seconds": self.timings["warmup_sec"]
+            })
+            log.info(f"Spark NLP pipeline ready ({source}, warm-up {warmup:.2f}s)")
             
+        except model_registry.ModelStorageError:
+            raise
         except Exception as e:
+            # Trên cluster không đổi model âm thầm: điểm VADER khác hẳn Spark NLP
+            if not self.spark.sparkContext.master.startswith("local") and not SENTIMENT_ALLOW_VADER_FALLBACK:
+                raise
             log.warning(f"Spark NLP failed: {e}")
             self._load_vader()
     
+    
+    def _build_pipeline(self):
+        """Dựng Pipeline từ các model trong registry (chỉ gọi khi chưa có pipeline đã lưu)"""
+        from sparknlp.base import DocumentAssembler
+        from sparknlp.annotator import (
+            SentimentDLModel,
+            UniversalSentenceEncoder
+        )
+        from pyspark.ml import Pipeline
+        
+        document = DocumentAssembler() \
+            .setInputCol("_text_input") \
+            .setOutputCol("document")
+        log.info("  - DocumentAssembler created")
+        
+        use_path = model_registry.model_path("use")
+        sentiment_path = model_registry.model_path("sentimentdl")
+        
+        log.info(f"  - Loading UniversalSentenceEncoder from: {use_path}")
+        use = UniversalSentenceEncoder.load(use_path) \
+            .setInputCols(["document"]) \
+            .setOutputCol("embeddings")
+        
+        log.info(f"  - Loading SentimentDLModel from: {sentiment_path}")
+        sentiment = SentimentDLModel.load(sentiment_path) \
+            .setInputCols(["embeddings"]) \
+            .setOutputCol("sentiment")
+        
+        self.pipeline = Pipeline(stages=[document, use, sentiment])
+        return self.pipeline
+    
+    
     def _load_vader(self):
         """Load VADER analyzer"""
         log.info("Loading VADER analyzer...")
@@ -129,15 +184,10 @@ class SentimentAnalyzer:
     def _analyze_sparknlp(self, df, text_column, score_column, label_column):
         """Analyze using Spark NLP"""
         log.info("  - Preparing input data...")
-        df_input = df.withColumn(
-            "_text_input",
-            coalesce(col(text_column), lit(""))
-        )
-        
-        if self.model is None:
-            log.info("  - Fitting Spark NLP model...")
-            self.model = self.pipeline.fit(df_input)
-            log.info("  - Model fitted!")
+        text_input = coalesce(col(text_column), lit(""))
+        if self.max_chars:
+            text_input = substring(text_input, 1, self.max_chars)
+        df_input = self._order_by_length(df.withColumn("_text_input", text_input))
         
         log.info("  - Transforming data...")
         df_result = self.model.transform(df_input)
@@ -175,7 +225,7 @@ class SentimentAnalyzer:
         # Cleanup temp columns
         log.info("  - Cleaning up temp columns...")
         columns_to_drop = [
-            "_text_input", "document", "embeddings", 
+            "_text_input", "_text_len", "document", "embeddings", 
             "sentiment", "_sent_label", "_sent_confidence"
         ]
         for c in columns_to_drop:
@@ -185,6 +235,23 @@ class SentimentAnalyzer:
         return df_result
     
     
+    def _order_by_length(self, df):
+        """
+        Gom các text có độ dài gần nhau liền kề trong partition -> mỗi batch TF
+        chứa câu dài tương đương, ít padding hơn.
+        """
+        if self.length_bucketing == "none":
+            return df
+        
+        if self.num_partitions:
+            df = df.repartition(self.num_partitions)
+        
+        df = df.withColumn("_text_len", length(col("_text_input")))
+        if self.length_bucketing == "sort":
+            return df.sortWithinPartitions("_text_len")
+        return df.sortWithinPartitions(floor(col("_text_len") / self.bucket_width))
+    
+    
     def _analyze_vader(self, df, text_column, score_column, label_column):
         """Analyze using VADER"""
         
@@ -224,7 +291,21 @@ class SentimentAnalyzer:
         """Get sentiment statistics"""
         log.info("Calculating sentiment summary...")
         
-        total = df.count()
+        if self.method == "sparknlp":
+            # transform() là lazy -> inference thực sự chạy ở action này
+            # (bao gồm cả các bước đọc/clean phía trước)
+            start = time.perf_counter()
+            total = df.count()
+            self.timings["inference_sec"] = round(time.perf_counter() - start, 3)
+            record_metric("sentiment_inference", {
+                "pipeline_id": model_registry.pipeline_id(),
+                "rows": total,
+                "seconds": self.timings["inference_sec"]
+            })
+            log.info(f"  - Inference: {total:,} rows in {self.timings['inference_sec']}s "
+                     f"(warm-up {self.timings['warmup_sec']}s, {self.timings['warmup_source']})")
+        else:
+            total = df.count()
         
         if total == 0:
             log.warning("DataFrame is empty!")
@@ -309,6 +390,87 @@ def get_sentiment_label(score, pos_thresh=0.6, neg_thresh=0.4):
     return "neutral"
 
 
+# ============================================================
+#                       BENCHMARK
+# ============================================================
+
+BENCHMARK_WORDS = [
+    "food", "service", "great", "slow", "staff", "friendly", "price", "clean",
+    "terrible", "amazing", "wait", "order", "place", "never", "again", "love",
+    "cold", "fresh", "rude", "recommend", "parking", "menu", "best", "worst"
+]
+
+# (length_bucketing, bucket_width, batch_size)
+BENCHMARK_SETTINGS = [
+    ("none", None, 64),
+    ("sort", None, 64),
+    ("bucket", 64, 64),
+    ("bucket", 256, 64),
+    ("bucket", 64, 128),
+]
+
+
+def make_synthetic_reviews(spark, num_rows=20000, seed=42):
+    """Review giả có độ dài lệch mạnh (log-normal: đa số ngắn, ít review rất dài)"""
+    import random
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(num_rows):
+        n_words = max(2, min(int(rng.lognormvariate(3.0, 1.1)), 1000))
+        rows.append((" ".join(rng.choice(BENCHMARK_WORDS) for _ in range(n_words)),))
+    return spark.createDataFrame(rows, ["review_text_clean"])
+
+
+def benchmark_sentiment(spark, num_rows=20000, settings_list=BENCHMARK_SETTINGS):
+    """Đo throughput (rows/s) của Spark NLP inference với các cấu hình bucket / batch size"""
+    df = make_synthetic_reviews(spark, num_rows).cache()
+    df.count()
+    
+    results = []
+    for bucketing, width, batch_size in settings_list:
+        analyzer = SentimentAnalyzer(
+            spark=spark,
+            use_sparknlp=True,
+            batch_size=batch_size,
+            length_bucketing=bucketing,
+            bucket_width=width or SENTIMENT_LENGTH_BUCKET_WIDTH
+        )
+        if analyzer.method != "sparknlp":
+            log.warning("Spark NLP không khả dụng, bỏ qua benchmark.")
+            break
+        
+        df_result = analyzer.analyze(df, text_column="review_text_clean")
+        start = time.perf_counter()
+        # noop sink: ép chạy toàn bộ inference mà không ghi dữ liệu ra đâu
+        df_result.write.format("noop").mode("overwrite").save()
+        seconds = time.perf_counter() - start
+        
+        result = {
+            "length_bucketing": bucketing,
+            "bucket_width": width,
+            "batch_size": batch_size,
+            "rows": num_rows,
+            "seconds": round(seconds, 3),
+            "rows_per_sec": round(num_rows / seconds, 1),
+            "warmup_sec": analyzer.timings["warmup_sec"]
+        }
+        record_metric("sentiment_benchmark", result)
+        results.append(result)
+    
+    df.unpersist()
+    
+    print("\n" + "=" * 70)
+    print(f"SENTIMENT THROUGHPUT BENCHMARK ({num_rows:,} synthetic reviews)")
+    print("=" * 70)
+    print(f"{'bucketing':10} {'width':>6} {'batch':>6} {'seconds':>9} {'rows/s':>10}")
+    for r in results:
+        print(f"{r['length_bucketing']:10} {str(r['bucket_width'] or '-'):>6} {r['batch_size']:>6} "
+              f"{r['seconds']:>9} {r['rows_per_sec']:>10}")
+    print("=" * 70 + "\n")
+    
+    return results
+
+
 # ============================================================
 #                         TEST
 # ============================================================
@@ -448,6 +610,22 @@ def test_sentiment_spark():
 
 
 if __name__ == "__main__":
+    import sys
+    
+    # python -m modules.sentiment --benchmark [num_rows]
+    if "--benchmark" in sys.argv:
+        idx = sys.argv.index("--benchmark")
+        num_rows = int(sys.argv[idx + 1]) if len(sys.argv) > idx + 1 else 20000
+        spark = SparkSession.builder \
+            .appName("Sentiment_Benchmark") \
+            .config("spark.driver.memory", "4g") \
+            .getOrCreate()
+        try:
+            benchmark_sentiment(spark, num_rows)
+        finally:
+            spark.stop()
+        sys.exit(0)
+    
     print("\n" + "=" * 70)
     print("          SENTIMENT ANALYSIS MODULE TEST")
     print("=" * 70)
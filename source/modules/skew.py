@@ -0,0 +1,109 @@
+"""
+Skew Handling Module
+
+Số review theo business lệch rất mạnh (vài địa điểm hàng chục nghìn review,
+đa số chỉ vài review) -> task chứa key "nóng" chạy lâu hơn hẳn (straggler).
+
+    - detect_hot_keys:          histogram key trên mẫu (sample) -> danh sách hot key
+    - add_salt:                 gắn cột salt cho hot key (key thường salt = 0)
+    - collect_task_time_stats:  phân phối thời gian task theo stage (Spark REST API)
+"""
+
+import json
+import urllib.request
+
+from pyspark.sql import DataFrame
+from pyspark.sql.functions import col, lit, when, pmod, xxhash64, desc
+from configs import settings
+from utils.logger import get_logger
+
+log = get_logger("SkewHandler")
+
+SKEW_SAMPLE_FRACTION = getattr(settings, "SKEW_SAMPLE_FRACTION", 0.01)
+# Key có số dòng ước lượng >= ngưỡng này được coi là hot
+SKEW_HOT_KEY_MIN_ROWS = getattr(settings, "SKEW_HOT_KEY_MIN_ROWS", 5000)
+SKEW_MAX_HOT_KEYS = getattr(settings, "SKEW_MAX_HOT_KEYS", 1000)
+SKEW_NUM_SALTS = getattr(settings, "SKEW_NUM_SALTS", 16)
+
+SALT_COL = "_salt"
+TASK_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+def detect_hot_keys(df: DataFrame, key_col: str,
+                    fraction=SKEW_SAMPLE_FRACTION, min_rows=SKEW_HOT_KEY_MIN_ROWS,
+                    max_keys=SKEW_MAX_HOT_KEYS, seed=42) -> list:
+    """Ước lượng số dòng / key trên mẫu, trả về [(key, estimated_rows), ...] giảm dần"""
+    sample_min = max(1, int(min_rows * fraction))
+
+    rows = df.select(key_col) \
+        .sample(withReplacement=False, fraction=fraction, seed=seed) \
+        .groupBy(key_col).count() \
+        .filter(col("count") >= sample_min) \
+        .orderBy(desc("count")) \
+        .limit(max_keys) \
+        .collect()
+
+    hot_keys = [(row[key_col], int(row["count"] / fraction)) for row in rows]
+    log.info(f"Hot keys trên '{key_col}': {len(hot_keys)} (sample={fraction}, ngưỡng={min_rows:,} dòng)")
+    return hot_keys
+
+
+def add_salt(df: DataFrame, key_col: str, hot_keys: list, salt_source: str,
+             num_salts=SKEW_NUM_SALTS) -> DataFrame:
+    """
+    Thêm cột _salt: hot key được chia đều ra num_salts nhánh theo hash của salt_source,
+    key thường giữ salt = 0 (không bị nhân số group).
+    Dùng hash (không dùng rand) để kết quả ổn định khi task bị chạy lại.
+    """
+    keys = [k for k, _ in hot_keys]
+    if not keys:
+        return df.withColumn(SALT_COL, lit(0))
+
+    return df.withColumn(
+        SALT_COL,
+        when(col(key_col).isin(keys), pmod(xxhash64(col(salt_source)), lit(num_salts)))
+        .otherwise(lit(0))
+    )
+
+
+def collect_task_time_stats(spark, job_group: str) -> list:
+    """
+    Lấy phân phối executorRunTime (ms) của các stage thuộc job_group qua Spark REST API.
+    Trả về list rỗng nếu Spark UI bị tắt / không truy cập được.
+    """
+    sc = spark.sparkContext
+    ui_url = sc.uiWebUrl
+    if not ui_url:
+        return []
+
+    tracker = sc.statusTracker()
+    stage_ids = []
+    for job_id in tracker.getJobIdsForGroup(job_group):
+        job = tracker.getJobInfo(job_id)
+        if job:
+            stage_ids.extend(job.stageIds)
+
+    quantiles = ",".join(str(q) for q in TASK_QUANTILES)
+    stats = []
+    for stage_id in sorted(set(stage_ids)):
+        stage = tracker.getStageInfo(stage_id)
+        # Stage bị skip (đọc lại shuffle đã có) không có task
+        if not stage or stage.numCompletedTasks == 0:
+            continue
+        url = (f"{ui_url}/api/v1/applications/{sc.applicationId}/stages/"
+               f"{stage_id}/{stage.currentAttemptId}/taskSummary?quantiles={quantiles}")
+        try:
+            with urllib.request.urlopen(url, timeout=10) as resp:
+                summary = json.load(resp)
+        except Exception as e:
+            log.warning(f"Không lấy được task summary stage {stage_id}: {e}")
+            continue
+
+        run_times = summary.get("executorRunTime", [])
+        stats.append({
+            "stage_id": stage_id,
+            "name": stage.name,
+            "num_tasks": stage.numTasks,
+            "run_time_ms": dict(zip([f"p{int(q * 100)}" for q in TASK_QUANTILES], run_times))
+        })
+    return stats
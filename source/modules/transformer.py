@@ -1,10 +1,11 @@
-from pyspark.sql.functions import collect_set, array, explode, coalesce, max, lower, concat_ws, col, udf, when, lit, to_json, from_unixtime, size, array_contains, current_timestamp, year, month, md5, concat_ws, broadcast
+from pyspark.sql.functions import collect_set, array, explode, coalesce, lower, concat_ws, col, udf, when, lit, to_json, from_unixtime, size, array_contains, current_timestamp, year, month, broadcast, bit_or, create_map
 from pyspark.sql.types import StringType, MapType, IntegerType, StructType, StructField, ArrayType, DoubleType
 from utils import parser
 from utils.logger import get_logger
 from schemas import tables
 import json
 import os
+from itertools import chain
 
 # THÊM MỚI
 from modules.sentiment import SentimentAnalyzer
@@ -28,6 +29,29 @@ PATH_MAPPING = "file://" + os.path.join(PROJECT_ROOT, "analysis_results", "class
 
 log = get_logger("Transformer")
 
+# Nhóm ngành -> cột Boolean của bảng CATEGORY.
+# Thứ tự trong list = vị trí bit trong category_mask (bit 0 = food_dining, ...).
+# [QUAN TRỌNG] API (app/models/business.py: CATEGORY_FIELDS) dùng cùng thứ tự, không đổi thứ tự khi đã có data.
+CATEGORY_GROUPS = [
+    ("Food and Dining", "food_dining"),
+    ("Health and Medical", "health_medical"),
+    ("Automotive and Transport", "automotive_transport"),
+    ("Retail and Shopping", "retail_shopping"),
+    ("Beauty and Wellness", "beauty_wellness"),
+    ("Home Services and Construction", "home_services_construction"),
+    ("Education and Community", "education_community"),
+    ("Entertainment and Travel", "entertainment_travel"),
+    ("Industry and Manufacturing", "industry_manufacturing"),
+    ("Financial and Legal Services", "financial_legal_services"),
+]
+
+def group_bit(group_col):
+    """Tên nhóm -> giá trị bit (1 << i); nhóm không có trong CATEGORY_GROUPS -> 0"""
+    bit_map = create_map(*chain.from_iterable(
+        (lit(group), lit(1 << i)) for i, (group, _) in enumerate(CATEGORY_GROUPS)
+    ))
+    return coalesce(bit_map[group_col], lit(0))
+
 # Đăng ký UDF (User Defined Functions)
 udf_parse_hours = udf(parser.parse_hours, MapType(StringType(), StringType()))
 udf_clean_text = udf(parser.clean_text, StringType())
@@ -99,6 +123,9 @@ def transform_metadata(df_raw, spark):
     # --- BƯỚC 2: XỬ LÝ CATEGORY LOGIC (JOIN VỚI MAPPING) ---
     log.info("Mapping Categories...")
     
+    # Không cần salt ở đây: mỗi business chỉ có vài category (explode không phình theo key),
+    # join với mapping là broadcast (không shuffle theo cat_raw) và groupBy theo business_id
+    # có số dòng / key nhỏ, đều -> không có hot key như business_key của REVIEW.
     df_exploded = df_base.select(
         col("business_id"),
         explode(coalesce(col("category"), array(lit("Uncategorized")))).alias("cat_raw")
@@ -111,20 +138,11 @@ def transform_metadata(df_raw, spark):
     )
 
     # [THAY ĐỔI 2]: Sửa toàn bộ logic Aggregation
-    # - Cũ: Dùng first(...) lấy TEXT.
-    # - Mới: Dùng max(...) lấy BOOLEAN và collect_set(...) lấy LIST GROUP.
+    # - Cũ: 10 cột max(when(...)) BOOLEAN.
+    # - Mới: 1 cột category_mask = bit_or(bit của nhóm) và collect_set(...) lấy LIST GROUP.
     df_grouped = df_joined.groupBy("business_id").agg(
-        # A. Tạo các cột BOOLEAN cho bảng CATEGORY (Nếu có nhóm -> True, ngược lại False)
-        max(when(col("map_group") == "Food and Dining", True).otherwise(False)).alias("food_dining"),
-        max(when(col("map_group") == "Health and Medical", True).otherwise(False)).alias("health_medical"),
-        max(when(col("map_group") == "Automotive and Transport", True).otherwise(False)).alias("automotive_transport"),
-        max(when(col("map_group") == "Retail and Shopping", True).otherwise(False)).alias("retail_shopping"),
-        max(when(col("map_group") == "Beauty and Wellness", True).otherwise(False)).alias("beauty_wellness"),
-        max(when(col("map_group") == "Home Services and Construction", True).otherwise(False)).alias("home_services_construction"),
-        max(when(col("map_group") == "Education and Community", True).otherwise(False)).alias("education_community"),
-        max(when(col("map_group") == "Entertainment and Travel", True).otherwise(False)).alias("entertainment_travel"),
-        max(when(col("map_group") == "Industry and Manufacturing", True).otherwise(False)).alias("industry_manufacturing"),
-        max(when(col("map_group") == "Financial and Legal Services", True).otherwise(False)).alias("financial_legal_services"),
+        # A. Bitmask nhóm ngành (OR bit của tất cả các nhóm mà business thuộc về)
+        bit_or(group_bit(col("map_group"))).alias("category_mask"),
         
         # B. Tạo cột new_category cho bảng BUSINESS (Gộp danh sách nhóm)
         # Ví dụ kết quả: "Food and Dining, Retail and Shopping"
@@ -136,7 +154,7 @@ def transform_metadata(df_raw, spark):
     
     df_business = df_base.join(
         # [THAY ĐỔI 3]: Join lấy cột danh sách nhóm vừa tạo
-        df_grouped.select("business_id", "new_category_list"),
+        df_grouped.select("business_id", "category_mask", "new_category_list"),
         on="business_id",
         how="left"
     ).select(
@@ -151,25 +169,20 @@ def transform_metadata(df_raw, spark):
         "url", "is_permanently_closed", "hours",
         "original_category",
         # [THAY ĐỔI 5]: Đổi tên alias từ primary_group thành new_category
-        col("new_category_list").alias("new_category")
+        col("new_category_list").alias("new_category"),
+        coalesce(col("category_mask"), lit(0)).alias("category_mask")
     )
 
     # --- BƯỚC 4: TẠO TABLE CATEGORY ---
     log.info("Building CATEGORY DataFrame...")
     
-    # [THAY ĐỔI 6]: Chỉ select các cột Boolean (và Business ID) từ bảng đã Group
+    # [THAY ĐỔI 6]: Giải mã các cột Boolean từ category_mask (giữ bảng CATEGORY để hiển thị)
     df_category = df_grouped.select(
         "business_id",
-        "food_dining",
-        "health_medical",
-        "automotive_transport",
-        "retail_shopping",
-        "beauty_wellness",
-        "home_services_construction",
-        "education_community",
-        "entertainment_travel",
-        "industry_manufacturing",
-        "financial_legal_services"
+        *[
+            (col("category_mask").bitwiseAND(1 << i) != 0).alias(column)
+            for i, (_, column) in enumerate(CATEGORY_GROUPS)
+        ]
     )
 
     log.info("Transformation Completed.")
@@ -195,8 +208,10 @@ def transform_reviews(df_raw, spark, use_sparknlp=True):
                 (col("resp.time") - col("time")) / 3600000
             ).otherwise(None)
         ) \
-        .withColumn("review_id", 
-            md5(concat_ws("_", col("gmap_id"), col("user_id"), col("time")))
+        .withColumn("review_natural_id", 
+            # Natural key của review; review_id (BIGINT) được cấp từ key map (keys.PATH_KEYMAP_REVIEW)
+            # thay vì hash 64-bit -> không có va chạm giữa 2 review khác nhau
+            concat_ws("|", col("gmap_id"), col("user_id"), col("time").cast("string"))
         ) \
         .filter(col("customer_id").isNotNull() & col("business_id").isNotNull() & col("review_timestamp").isNotNull())
     
@@ -238,8 +253,10 @@ def transform_reviews(df_raw, spark, use_sparknlp=True):
     analyzer.print_summary(df_with_sentiment)
     
     # === REVIEW TABLE ===
+    # dropDuplicates shuffle theo natural key của từng review: mỗi key chỉ có vài bản trùng,
+    # phân bố đều giữa các partition -> không lệch theo business, không cần salt.
     df_reviews = df_with_sentiment.select(
-        "review_id",
+        "review_natural_id",
         "business_id",
         "customer_id",
         col("review_timestamp").alias("time"),
@@ -249,7 +266,7 @@ def transform_reviews(df_raw, spark, use_sparknlp=True):
         "sentiment_label",
         "has_response",
         "response_latency_hrs"
-    ).dropDuplicates(["review_id"])
+    ).dropDuplicates(["review_natural_id"])
     
     # === CUSTOMER TABLE ===
     df_customer = df_with_sentiment.select(
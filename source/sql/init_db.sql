@@ -6,16 +6,26 @@ DROP TABLE IF EXISTS CUSTOMER CASCADE;
 DROP TABLE IF EXISTS STATS_MONTHLY CASCADE;
 DROP TABLE IF EXISTS STATS_YEARLY CASCADE;
 DROP TABLE IF EXISTS STATS_TOTAL CASCADE;
+DROP TABLE IF EXISTS DATA_VERSION CASCADE;
+-- Extension cho tìm kiếm fuzzy (trigram)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+-- Extension cho truy vấn "gần tôi" (fallback khi geo index in-memory của API chưa sẵn sàng)
+CREATE EXTENSION IF NOT EXISTS cube;
+CREATE EXTENSION IF NOT EXISTS earthdistance;
 -- 2. CREATE TABLES
 -- 2.1 Table: CUSTOMER
+-- Khóa chính/khóa ngoại dùng surrogate key BIGINT (cấp bởi source/modules/keys.py),
+-- natural key (gmap_id, user_id) giữ lại dạng UNIQUE để API tra cứu
 CREATE TABLE CUSTOMER (
-    customer_id TEXT PRIMARY KEY,
-    name        TEXT
+    customer_key BIGINT PRIMARY KEY,
+    customer_id  TEXT NOT NULL UNIQUE,  -- user_id gốc (21 chữ số)
+    name         TEXT
 );
 
 -- 2.2 Table: BUSINESS (Đã cập nhật thêm address và county)
 CREATE TABLE BUSINESS (
-    business_id           TEXT PRIMARY KEY,
+    business_key          BIGINT PRIMARY KEY,
+    business_id           TEXT NOT NULL UNIQUE, -- gmap_id gốc, API tra cứu theo cột này
     name                  TEXT,
     description           TEXT,
     
@@ -37,12 +47,23 @@ CREATE TABLE BUSINESS (
     
     -- Category Info (Lưu text gốc để hiển thị)
     original_category     TEXT,
-    new_category          TEXT
+    new_category          TEXT,
+    
+    -- Bitmask nhóm ngành: bit i = nhóm thứ i (food_dining = 1, health_medical = 2, ...,
+    -- financial_legal_services = 512). Dùng để lọc nhiều nhóm (AND/OR) không cần JOIN CATEGORY
+    category_mask         INT NOT NULL DEFAULT 0,
+    
+    -- Full-text search: tên (A) > category (B) > city (C), tự tính khi insert/update
+    search_vector         TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', COALESCE(name, '')), 'A') ||
+        setweight(to_tsvector('simple', COALESCE(original_category, '')), 'B') ||
+        setweight(to_tsvector('simple', COALESCE(city, '')), 'C')
+    ) STORED
 );
 
 -- 2.3 Table: CATEGORY (Extension 1:1)
 CREATE TABLE CATEGORY (
-    business_id                 TEXT PRIMARY KEY,
+    business_key                BIGINT PRIMARY KEY,
     food_dining                 BOOLEAN DEFAULT FALSE,
     health_medical              BOOLEAN DEFAULT FALSE,
     automotive_transport        BOOLEAN DEFAULT FALSE,
@@ -55,7 +76,7 @@ CREATE TABLE CATEGORY (
     financial_legal_services    BOOLEAN DEFAULT FALSE,
     
     CONSTRAINT fk_category_business 
-        FOREIGN KEY (business_id) REFERENCES BUSINESS(business_id) 
+        FOREIGN KEY (business_key) REFERENCES BUSINESS(business_key) 
         ON DELETE CASCADE
 );
 
@@ -77,9 +98,9 @@ CREATE TABLE CATEGORY (
 
 -- 2.5 Table: REVIEW
 CREATE TABLE REVIEW (
-    review_id            TEXT PRIMARY KEY,
-    business_id          TEXT NOT NULL,
-    customer_id          TEXT NOT NULL,
+    review_id            BIGINT PRIMARY KEY, -- surrogate key (key map theo gmap_id|user_id|time)
+    business_key         BIGINT NOT NULL,
+    customer_key         BIGINT NOT NULL,
     
     -- Thời gian gốc
     time                 TIMESTAMP WITHOUT TIME ZONE,
@@ -98,12 +119,12 @@ CREATE TABLE REVIEW (
     has_response         BOOLEAN DEFAULT FALSE,
     response_latency_hrs DECIMAL(10, 2),
     
-    CONSTRAINT fk_review_business FOREIGN KEY (business_id) REFERENCES BUSINESS(business_id),
-    CONSTRAINT fk_review_customer FOREIGN KEY (customer_id) REFERENCES CUSTOMER(customer_id)
+    CONSTRAINT fk_review_business FOREIGN KEY (business_key) REFERENCES BUSINESS(business_key),
+    CONSTRAINT fk_review_customer FOREIGN KEY (customer_key) REFERENCES CUSTOMER(customer_key)
 );
 -- 2.5 Table: STATS_MONTHLY (Thống kê theo Tháng)
 CREATE TABLE STATS_MONTHLY (
-    business_id     TEXT NOT NULL,
+    business_key    BIGINT NOT NULL,
     year            INT NOT NULL,
     month           INT NOT NULL,
     
@@ -118,15 +139,28 @@ CREATE TABLE STATS_MONTHLY (
     
     avg_sentiment   DECIMAL(5, 4), -- Điểm cảm xúc trung bình tháng đó
     
+    -- Histogram rating (API /reviews/summary đọc trực tiếp, không GROUP BY trên REVIEW)
+    rating_1        INT DEFAULT 0,
+    rating_2        INT DEFAULT 0,
+    rating_3        INT DEFAULT 0,
+    rating_4        INT DEFAULT 0,
+    rating_5        INT DEFAULT 0,
+    
+    -- Phản hồi của chủ quán
+    response_count  INT DEFAULT 0,
+    response_rate   DECIMAL(5, 2),  -- % review có phản hồi
+    avg_response_latency_hrs    DECIMAL(10, 2),
+    median_response_latency_hrs DECIMAL(10, 2),
+    
     -- Khóa chính phức hợp: Mỗi quán, trong 1 tháng, chỉ có 1 dòng thống kê
-    PRIMARY KEY (business_id, year, month),
+    PRIMARY KEY (business_key, year, month),
     
     CONSTRAINT fk_stats_monthly_biz 
-        FOREIGN KEY (business_id) REFERENCES BUSINESS(business_id) 
+        FOREIGN KEY (business_key) REFERENCES BUSINESS(business_key) 
         ON DELETE CASCADE
 );
 CREATE TABLE STATS_YEARLY (
-    business_id     TEXT NOT NULL,
+    business_key    BIGINT NOT NULL,
     year            INT NOT NULL,
     
     total_reviews   INT DEFAULT 0,
@@ -140,15 +174,28 @@ CREATE TABLE STATS_YEARLY (
     
     avg_sentiment   DECIMAL(5, 4),
     
-    PRIMARY KEY (business_id, year),
+    -- Histogram rating (API /reviews/summary đọc trực tiếp, không GROUP BY trên REVIEW)
+    rating_1        INT DEFAULT 0,
+    rating_2        INT DEFAULT 0,
+    rating_3        INT DEFAULT 0,
+    rating_4        INT DEFAULT 0,
+    rating_5        INT DEFAULT 0,
+    
+    -- Phản hồi của chủ quán
+    response_count  INT DEFAULT 0,
+    response_rate   DECIMAL(5, 2),  -- % review có phản hồi
+    avg_response_latency_hrs    DECIMAL(10, 2),
+    median_response_latency_hrs DECIMAL(10, 2),
+    
+    PRIMARY KEY (business_key, year),
     
     CONSTRAINT fk_stats_yearly_biz 
-        FOREIGN KEY (business_id) REFERENCES BUSINESS(business_id) 
+        FOREIGN KEY (business_key) REFERENCES BUSINESS(business_key) 
         ON DELETE CASCADE
 );
 -- 2.7 Table: STATS_TOTAL (Thống kê tổng thể từ trước đến nay)
 CREATE TABLE STATS_TOTAL (
-    business_id     TEXT PRIMARY KEY, -- Mỗi quán chỉ có 1 dòng tổng
+    business_key    BIGINT PRIMARY KEY, -- Mỗi quán chỉ có 1 dòng tổng
     
     total_reviews   INT DEFAULT 0,
     positive_count  INT DEFAULT 0,
@@ -161,45 +208,74 @@ CREATE TABLE STATS_TOTAL (
     
     avg_sentiment   DECIMAL(5, 4),
     
+    -- Histogram rating (API /reviews/summary đọc trực tiếp, không GROUP BY trên REVIEW)
+    rating_1        INT DEFAULT 0,
+    rating_2        INT DEFAULT 0,
+    rating_3        INT DEFAULT 0,
+    rating_4        INT DEFAULT 0,
+    rating_5        INT DEFAULT 0,
+    
+    -- Phản hồi của chủ quán
+    response_count  INT DEFAULT 0,
+    response_rate   DECIMAL(5, 2),  -- % review có phản hồi
+    avg_response_latency_hrs    DECIMAL(10, 2),
+    median_response_latency_hrs DECIMAL(10, 2),
+    
     first_review_date DATE, -- Ngày review đầu tiên
     last_review_date  DATE, -- Ngày review gần nhất
     
     CONSTRAINT fk_stats_total_biz 
-        FOREIGN KEY (business_id) REFERENCES BUSINESS(business_id) 
+        FOREIGN KEY (business_key) REFERENCES BUSINESS(business_key) 
         ON DELETE CASCADE
 );
 
+-- 2.8 Table: DATA_VERSION (1 dòng duy nhất)
+-- Job Gold tăng version khi load xong -> cache của API đổi namespace, dữ liệu cũ tự hết hiệu lực
+-- Job stream chỉ tăng stats_version (chỉ cache stats / review đổi namespace, BUSINESS không đổi)
+CREATE TABLE DATA_VERSION (
+    id                SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version           BIGINT NOT NULL DEFAULT 0,
+    updated_at        TIMESTAMP NOT NULL DEFAULT NOW(),
+    stats_version     BIGINT NOT NULL DEFAULT 0,
+    stats_updated_at  TIMESTAMP NOT NULL DEFAULT NOW()
+);
+INSERT INTO DATA_VERSION (id, version) VALUES (1, 0);
+
 -- 3. INDEXING STRATEGY (Tối ưu cho luồng Lọc -> Search)
--- 3.1 PARTIAL INDEXES cho bảng CATEGORY (Bước 1: Lọc Nhóm)
--- Chỉ đánh index cho giá trị TRUE (giảm dung lượng index ~80-90%)
-CREATE INDEX idx_cat_food ON CATEGORY(food_dining) WHERE food_dining = TRUE;
-CREATE INDEX idx_cat_health ON CATEGORY(health_medical) WHERE health_medical = TRUE;
-CREATE INDEX idx_cat_auto ON CATEGORY(automotive_transport) WHERE automotive_transport = TRUE;
-CREATE INDEX idx_cat_retail ON CATEGORY(retail_shopping) WHERE retail_shopping = TRUE;
-CREATE INDEX idx_cat_beauty ON CATEGORY(beauty_wellness) WHERE beauty_wellness = TRUE;
-CREATE INDEX idx_cat_home ON CATEGORY(home_services_construction) WHERE home_services_construction = TRUE;
-CREATE INDEX idx_cat_edu ON CATEGORY(education_community) WHERE education_community = TRUE;
-CREATE INDEX idx_cat_travel ON CATEGORY(entertainment_travel) WHERE entertainment_travel = TRUE;
-CREATE INDEX idx_cat_industry ON CATEGORY(industry_manufacturing) WHERE industry_manufacturing = TRUE;
-CREATE INDEX idx_cat_finance ON CATEGORY(financial_legal_services) WHERE financial_legal_services = TRUE;
+-- 3.1 INDEX cho category_mask (Bước 1: Lọc Nhóm)
+-- Thay cho 10 partial index trên CATEGORY: API lọc trực tiếp trên BUSINESS.
+-- Phép '&' không dùng được B-tree, nên API đổi điều kiện bit thành danh sách
+-- các giá trị mask thỏa mãn (tối đa 1024 giá trị): category_mask = ANY(:masks)
+-- Kèm khóa sắp xếp của danh sách -> lọc nhóm + phân trang seek dùng chung 1 index
+CREATE INDEX idx_business_category_mask ON BUSINESS(category_mask, (COALESCE(avg_rating, -1)) DESC, business_key DESC);
 
 -- 3.2 GIN INDEX cho bảng MISC (Bước 2: Search chi tiết)
 -- Giúp tìm kiếm "Có wifi không?", "Có parking không?" siêu tốc
 -- CREATE INDEX idx_misc_tags ON MISC USING GIN (search_tags);
 
 -- 3.3 INDEX cho bảng BUSINESS (Địa lý & Tìm kiếm tên)
-CREATE INDEX idx_business_county ON BUSINESS(county);  -- Lọc theo Quận/Huyện
-CREATE INDEX idx_business_city ON BUSINESS(city);      -- Lọc theo Thành phố
--- Full-Text Search cho tên quán (VD: tìm "Phở Hùng")
-CREATE INDEX idx_business_name_search ON BUSINESS USING GIN (to_tsvector('simple', name));
+-- Danh sách business sắp theo (COALESCE(avg_rating, -1) DESC, business_key DESC),
+-- phân trang seek: WHERE (COALESCE(avg_rating, -1), business_key) < (:rating, :key)
+CREATE INDEX idx_business_rating_seek ON BUSINESS((COALESCE(avg_rating, -1)) DESC, business_key DESC);
+CREATE INDEX idx_business_county ON BUSINESS(county, (COALESCE(avg_rating, -1)) DESC, business_key DESC);  -- Lọc theo Quận/Huyện
+CREATE INDEX idx_business_city ON BUSINESS(city, (COALESCE(avg_rating, -1)) DESC, business_key DESC);      -- Lọc theo Thành phố
+-- Full-Text Search có trọng số (tên, category, city) -> xếp hạng bằng ts_rank (VD: tìm "Phở Hùng")
+CREATE INDEX idx_business_search_vector ON BUSINESS USING GIN (search_vector);
+-- Fuzzy fallback khi gõ sai chính tả: name % 'pho hng' (pg_trgm)
+CREATE INDEX idx_business_name_trgm ON BUSINESS USING GIN (name gin_trgm_ops);
+-- Nearby: earth_box(...) @> ll_to_earth(...) và KNN ORDER BY ll_to_earth(...) <-> :center
+CREATE INDEX idx_business_earth ON BUSINESS USING GIST (ll_to_earth(latitude::float8, longitude::float8))
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
 
 -- 3.4 INDEX cho bảng REVIEW (Phân tích & Thống kê)
-CREATE INDEX idx_review_business_id ON REVIEW(business_id);
-CREATE INDEX idx_review_customer_id ON REVIEW(customer_id);
+CREATE INDEX idx_review_business_key ON REVIEW(business_key);
+CREATE INDEX idx_review_customer_key ON REVIEW(customer_key);
 -- Hỗ trợ thống kê theo thời gian (VD: Doanh thu tháng 10/2024)
 CREATE INDEX idx_review_year_month ON REVIEW(year, month);
--- Hỗ trợ lấy review mới nhất của 1 quán
-CREATE INDEX idx_review_biz_time ON REVIEW(business_id, time DESC);
+-- Hỗ trợ lấy review mới nhất của 1 quán + phân trang keyset theo (time, review_id)
+CREATE INDEX idx_review_biz_time ON REVIEW(business_key, time DESC, review_id DESC);
+-- Phân trang keyset khi lọc theo rating
+CREATE INDEX idx_review_biz_rating_time ON REVIEW(business_key, rating, time DESC, review_id DESC);
 -- [THÊM MỚI] INDEX CHO BẢNG THỐNG KÊ
 
 -- 1. Index cho STATS_MONTHLY
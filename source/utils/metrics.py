@@ -0,0 +1,25 @@
+import json
+import os
+import time
+import uuid
+
+# File metrics của mỗi lần chạy (1 dòng JSON / metric), đặt cạnh etl_process.log
+METRICS_FILE = os.path.join('logs', 'run_metrics.jsonl')
+
+# Định danh lần chạy: lấy từ biến môi trường nếu orchestrator truyền vào, không thì tự sinh
+RUN_ID = os.environ.get('ETL_RUN_ID') or time.strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:6]
+
+
+def record_metric(name, payload):
+    """Ghi 1 metric (dict) vào logs/run_metrics.jsonl"""
+    if not os.path.exists('logs'):
+        os.makedirs('logs')
+
+    record = {
+        "run_id": RUN_ID,
+        "ts": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "metric": name,
+        **payload
+    }
+    with open(METRICS_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
@@ -0,0 +1,77 @@
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import HTTPException, Request, Response
+
+from app.core.cache import response_cache
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison (RFC 9110): W/"x" and "x" match, "*" matches anything"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+async def _conditional_get(request: Request, response: Response, stats: bool) -> None:
+    """
+    Conditional GET for read endpoints.
+
+    ETag = data version (bumped by the gold ETL) + path + sorted query params, so it only
+    changes when the data or the request changes. A matching If-None-Match (or an
+    If-Modified-Since not older than the last load) returns 304 before any service / DB work.
+    With stats=True the version also includes stats_version (bumped by the streaming job).
+    """
+    if request.method not in ("GET", "HEAD"):
+        return
+
+    provider = response_cache.version_provider
+    version, updated_at = await (provider.get_stats_state() if stats else provider.get_state())
+
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{request.url.path}?{query}".encode()).hexdigest()[:16]
+    etag = f'W/"v{version}-{digest}"'
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    last_modified = None
+    if updated_at is not None:
+        last_modified = updated_at.replace(tzinfo=updated_at.tzinfo or timezone.utc, microsecond=0)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+    elif last_modified is not None and "if-modified-since" in request.headers:
+        # If-Modified-Since is only considered when If-None-Match is absent
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            if last_modified <= since:
+                raise HTTPException(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+
+    response.headers.update(headers)
+
+
+async def conditional_get(request: Request, response: Response) -> None:
+    """Endpoints that only read gold-load data (BUSINESS, filters)"""
+    await _conditional_get(request, response, stats=False)
+
+
+async def conditional_get_stats(request: Request, response: Response) -> None:
+    """Endpoints that read REVIEW / STATS_* (also changed by the streaming job)"""
+    await _conditional_get(request, response, stats=True)
+
+
+async def conditional_get_business_list(request: Request, response: Response) -> None:
+    """GET /businesses: include_stats embeds STATS_TOTAL rows, so the ETag follows stats_version then"""
+    include_stats = request.query_params.get("include_stats", "").lower() in ("1", "true", "on", "yes")
+    await _conditional_get(request, response, stats=include_stats)
@@ -6,6 +6,7 @@ from app.api.routers import (
     stats_router,
     filter_router
 )
+from app.api.routers.batch import router as batch_router
 
 api_router = APIRouter(prefix=settings.API_V1_STR)
 
@@ -14,3 +15,4 @@ api_router.include_router(business_router)
 api_router.include_router(review_router)
 api_router.include_router(stats_router)
 api_router.include_router(filter_router)
+api_router.include_router(batch_router)
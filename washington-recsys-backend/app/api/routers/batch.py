@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from app.db import get_local_db
+from app.services import StatsService, ReviewService
+from app.schemas.stats import StatsTotalBatchResponse
+from app.schemas.review import ReviewSummaryBatchResponse
+from app.api.deps import conditional_get_stats
+from app.core.config import settings
+
+# Max business_ids per batch request
+MAX_BATCH_IDS = getattr(settings, "MAX_BATCH_IDS", 100)
+
+router = APIRouter(
+    prefix="/batch", tags=["Batch"],
+    # ETag / Last-Modified; answers 304 before any service or DB work
+    dependencies=[Depends(conditional_get_stats)]
+)
+
+
+def _unique_ids(business_id: List[str]) -> List[str]:
+    """Dedupe (keep request order) and enforce MAX_BATCH_IDS"""
+    business_ids = list(dict.fromkeys(business_id))
+    if len(business_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_IDS} business_id per request (got {len(business_ids)})"
+        )
+    return business_ids
+
+
+@router.get("/stats/total", response_model=StatsTotalBatchResponse)
+async def get_total_stats_batch(
+    business_id: List[str] = Query(..., description="Business IDs (lặp lại: ?business_id=a&business_id=b)"),
+    db: AsyncSession = Depends(get_local_db)
+):
+    """
+    Total statistics for many businesses in one call (1 query for the uncached ones).
+    
+    Used for: list pages that show sentiment per card.
+    """
+    business_ids = _unique_ids(business_id)
+    service = StatsService(db)
+    stats = await service.get_total_stats_many(business_ids)
+    return StatsTotalBatchResponse(data=[stats[b] for b in business_ids])
+
+
+@router.get("/reviews/summary", response_model=ReviewSummaryBatchResponse)
+async def get_review_summary_batch(
+    business_id: List[str] = Query(..., description="Business IDs (lặp lại: ?business_id=a&business_id=b)"),
+    db: AsyncSession = Depends(get_local_db)
+):
+    """
+    Rating distributions for many businesses in one call (1 query for the uncached ones).
+    """
+    business_ids = _unique_ids(business_id)
+    service = ReviewService(db)
+    summaries = await service.get_review_summaries(business_ids)
+    return ReviewSummaryBatchResponse(data=[summaries[b] for b in business_ids])
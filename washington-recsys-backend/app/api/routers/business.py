@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Optional, List
 from enum import Enum
 from app.db import get_local_db
 from app.services import BusinessService
 from app.schemas import BusinessListResponse, BusinessDetailSchema
+from app.schemas.business import NearbyListResponse
+from app.schemas.responses import BusinessDetailResponse
+from app.services.dashboard_service import DashboardService
+from app.api.deps import conditional_get, conditional_get_stats, conditional_get_business_list
+from app.core.pagination import InvalidCursorError
+from app.core.serialization import fast_json
 
 
 # ============ ENUM cho Swagger Dropdown ============
@@ -21,48 +27,117 @@ class FieldEnum(str, Enum):
     financial_legal_services = "financial_legal_services"
 
 
+class FieldMatchEnum(str, Enum):
+    any = "any"
+    all = "all"
+
+
+# ETag / Last-Modified per route (answers 304 before any service or DB work):
+# routes that embed stats / reviews follow stats_version as well
 router = APIRouter(prefix="/businesses", tags=["Businesses"])
 
 
-@router.get("", response_model=BusinessListResponse)
+@router.get("", response_model=BusinessListResponse, dependencies=[Depends(conditional_get_business_list)])
 async def get_businesses(
-    field: Optional[FieldEnum] = Query(None, description="Category field filter"),
+    response: Response,
+    field: Optional[List[FieldEnum]] = Query(None, description="Category field filter (lặp lại để chọn nhiều nhóm)"),
+    field_match: FieldMatchEnum = Query(FieldMatchEnum.any, description="any = thuộc 1 trong các nhóm, all = thuộc tất cả"),
     county: Optional[str] = Query(None, description="County filter"),
     city: Optional[str] = Query(None, description="City filter"),
     min_rating: Optional[int] = Query(None, ge=1, le=5, description="Min rating (1-5)"),
     max_rating: Optional[int] = Query(None, ge=1, le=5, description="Max rating (1-5)"),
-    search: Optional[str] = Query(None, description="Search by name"),
+    search: Optional[str] = Query(None, description="Search name / category / city (ranked by relevance, typo tolerant)"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
+    include_stats: bool = Query(False, description="Embed total stats + review summary in each item"),
     db: AsyncSession = Depends(get_local_db)
 ):
     """
     Get list of businesses with filters.
     
-    - **field**: Filter by category group (dropdown)
+    - **field**: Filter by category group (dropdown, có thể chọn nhiều)
+    - **field_match**: Kết hợp nhiều field bằng OR (any) hoặc AND (all)
     - **county**: Filter by county
     - **city**: Filter by city
     - **min_rating/max_rating**: Filter by rating range (1-5)
-    - **search**: Search by business name
+    - **search**: Full-text search on name, category and city, ordered by relevance (fuzzy match on name for typos)
+    - **cursor**: Seek pagination (constant latency on deep pages), use `next_cursor` from the previous response
+    - **include_stats**: Embed `stats` and `review_summary` per item (2 batch queries instead of 2 calls per card)
     """
     service = BusinessService(db)
-    return await service.get_business_list(
-        field=field.value if field else None,
-        county=county,
-        city=city,
+    try:
+        payload = await service.get_business_list_payload(
+            field=[f.value for f in field] if field else None,
+            field_match=field_match.value,
+            county=county,
+            city=city,
+            min_rating=min_rating,
+            max_rating=max_rating,
+            search=search,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            include_stats=include_stats
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Rows are trusted DB values: serialize once with orjson, skip response_model validation
+    return fast_json(payload, response)
+
+
+# Declared before /{business_id} so "nearby" is not taken as an id
+@router.get("/nearby", response_model=NearbyListResponse, dependencies=[Depends(conditional_get)])
+async def get_nearby_businesses(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude của vị trí hiện tại"),
+    lng: float = Query(..., ge=-180, le=180, description="Longitude của vị trí hiện tại"),
+    radius_km: Optional[float] = Query(None, gt=0, le=200, description="Bán kính (km); bỏ trống = lấy `limit` business gần nhất"),
+    limit: int = Query(20, ge=1, le=100, description="Số business tối đa"),
+    field: Optional[List[FieldEnum]] = Query(None, description="Category field filter (lặp lại để chọn nhiều nhóm)"),
+    field_match: FieldMatchEnum = Query(FieldMatchEnum.any, description="any = thuộc 1 trong các nhóm, all = thuộc tất cả"),
+    min_rating: Optional[int] = Query(None, ge=1, le=5, description="Min rating (1-5)"),
+    max_rating: Optional[int] = Query(None, ge=1, le=5, description="Max rating (1-5)"),
+    db: AsyncSession = Depends(get_local_db)
+):
+    """
+    Businesses near a point, ordered by distance.
+    
+    - **radius_km**: all matches within the radius (up to `limit`); omit for k-nearest
+    - **field / field_match / min_rating / max_rating**: same filters as the list endpoint
+    """
+    service = BusinessService(db)
+    return await service.get_nearby(
+        latitude=lat,
+        longitude=lng,
+        radius_km=radius_km,
+        limit=limit,
+        field=[f.value for f in field] if field else None,
+        field_match=field_match.value,
         min_rating=min_rating,
-        max_rating=max_rating,
-        search=search,
-        page=page,
-        page_size=page_size
+        max_rating=max_rating
     )
 
 
-@router.get("/{business_id}", response_model=BusinessDetailSchema)
+@router.get("/{business_id}", response_model=BusinessDetailSchema, dependencies=[Depends(conditional_get)])
 async def get_business_detail(
     business_id: str,
     db: AsyncSession = Depends(get_local_db)
 ):
     """Get business detail by ID"""
     service = BusinessService(db)
-    return await service.get_business_detail(business_id)
\ No newline at end of file
+    return await service.get_business_detail(business_id)
+
+
+@router.get("/{business_id}/dashboard", response_model=BusinessDetailResponse, dependencies=[Depends(conditional_get_stats)])
+async def get_business_dashboard(
+    business_id: str,
+    review_page_size: int = Query(20, ge=1, le=100, description="Số review của trang đầu")
+):
+    """
+    Everything the business detail page needs in one payload:
+    detail, total / yearly / monthly stats, review summary and the first review page.
+    
+    The parts are queried concurrently, each on its own pooled session.
+    """
+    service = DashboardService()
+    return await service.get_business_dashboard(business_id, review_page_size=review_page_size)
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from enum import Enum
 from app.db import get_local_db
 from app.services import FilterService
+from app.services.filter_service import autocomplete as autocomplete_suggestions
 from app.schemas import FilterOptionsSchema
+from app.schemas.filter import AutocompleteItem
+from app.api.deps import conditional_get
 
 
 class FieldEnum(str, Enum):
@@ -20,7 +23,11 @@ class FieldEnum(str, Enum):
     financial_legal_services = "financial_legal_services"
 
 
-router = APIRouter(prefix="/filters", tags=["Filters"])
+router = APIRouter(
+    prefix="/filters", tags=["Filters"],
+    # ETag / Last-Modified; answers 304 before any service or DB work
+    dependencies=[Depends(conditional_get)]
+)
 
 
 @router.get("/options", response_model=FilterOptionsSchema)
@@ -43,8 +50,7 @@ async def get_counties(
     db: AsyncSession = Depends(get_local_db)
 ):
     service = FilterService(db)
-    counties = await service.get_filter_options()
-    counties_list = counties.counties
+    counties_list = await service.get_counties()
     
     if search:
         search_lower = search.lower()
@@ -64,8 +70,7 @@ async def get_cities(
     if county:
         cities_list = await service.get_cities_by_county(county)
     else:
-        options = await service.get_filter_options()
-        cities_list = options.cities
+        cities_list = await service.get_cities()
     
     if search:
         search_lower = search.lower()
@@ -74,6 +79,35 @@ async def get_cities(
     return cities_list
 
 
+class SuggestionKindEnum(str, Enum):
+    business = "business"
+    category = "category"
+    city = "city"
+    county = "county"
+
+
+@router.get("/autocomplete", response_model=List[AutocompleteItem])
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100, description="Text đang gõ trong search box"),
+    kind: Optional[List[SuggestionKindEnum]] = Query(None, description="Giới hạn loại gợi ý (lặp lại để chọn nhiều)"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """
+    Autocomplete for the search box (prefix match on names, categories, cities, counties).
+    
+    Served from an in-memory index rebuilt when the ETL data version changes; never queries Postgres.
+    """
+    items = await autocomplete_suggestions(q, limit=limit, kinds=[k.value for k in kind] if kind else None)
+    if items is None:
+        # Index not built for this data version: an empty / stale 200 would get an ETag and be pinned by 304s until the next load
+        raise HTTPException(
+            status_code=503,
+            detail="Autocomplete index is not ready, retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    return items
+
+
 @router.get("/ratings", response_model=List[int])
 async def get_ratings():
     return [1, 2, 3, 4, 5]
\ No newline at end of file
@@ -1,29 +1,49 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from app.db import get_local_db
 from app.services import ReviewService
 from app.schemas import ReviewListResponse, ReviewSummarySchema
+from app.api.deps import conditional_get_stats
+from app.core.pagination import InvalidCursorError
+from app.core.serialization import fast_json
 
-router = APIRouter(prefix="/businesses/{business_id}/reviews", tags=["Reviews"])
+router = APIRouter(
+    prefix="/businesses/{business_id}/reviews", tags=["Reviews"],
+    # ETag / Last-Modified; answers 304 before any service or DB work
+    dependencies=[Depends(conditional_get_stats)]
+)
 
 
 @router.get("", response_model=ReviewListResponse)
 async def get_reviews(
     business_id: str,
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     rating: Optional[int] = Query(None, ge=1, le=5),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
     db: AsyncSession = Depends(get_local_db)
 ):
-    """Get reviews for a specific business with optional rating filter"""
+    """
+    Get reviews for a specific business with optional rating filter.
+    
+    - **cursor**: keyset pagination, stable and fast on deep pages. Use `next_cursor` from the previous response.
+    - **page**: page-number mode, kept for backwards compatibility.
+    """
     service = ReviewService(db)
-    return await service.get_reviews_by_business(
-        business_id=business_id,
-        page=page,
-        page_size=page_size,
-        rating=rating
-    )
+    try:
+        payload = await service.get_reviews_payload(
+            business_id=business_id,
+            page=page,
+            page_size=page_size,
+            rating=rating,
+            cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Rows are trusted DB values: serialize once with orjson, skip response_model validation
+    return fast_json(payload, response)
 
 
 @router.get("/summary", response_model=ReviewSummarySchema)
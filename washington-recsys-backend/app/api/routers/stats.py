@@ -4,8 +4,13 @@ from typing import Optional
 from app.db import get_local_db
 from app.services import StatsService
 from app.schemas import StatsTotalSchema, StatsYearlyResponse, StatsMonthlyResponse
+from app.api.deps import conditional_get_stats
 
-router = APIRouter(prefix="/businesses/{business_id}/stats", tags=["Statistics"])
+router = APIRouter(
+    prefix="/businesses/{business_id}/stats", tags=["Statistics"],
+    # ETag / Last-Modified; answers 304 before any service or DB work
+    dependencies=[Depends(conditional_get_stats)]
+)
 
 
 @router.get("/total", response_model=StatsTotalSchema)
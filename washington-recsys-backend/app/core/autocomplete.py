@@ -0,0 +1,179 @@
+"""
+In-process prefix index for the search box autocomplete.
+
+Entries (business names, categories, cities, counties) are stored as one
+sorted list of normalized keys; the keys starting with a prefix are one
+contiguous range (two bisects). Matches are ranked by weight (num_of_reviews,
+summed for categories / places) over the whole range:
+    - range of at most MAX_SCAN keys: scanned and ranked per query
+    - wider range: precomputed top PRECOMPUTED_TOP per (prefix, kind), built
+      once for every prefix whose range is wider than MAX_SCAN
+
+Tops are kept per kind because category / place weights are sums over many
+businesses and would push businesses out of a shared top list.
+
+Names are indexed from every word start (up to NAME_MAX_WORD_STARTS), so
+"hung" finds "Pho Hung". The index is rebuilt from one narrow BUSINESS query
+whenever the ETL data version changes (see app/core/snapshot.py).
+"""
+
+import heapq
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.snapshot import VersionedSnapshot
+from app.models import Business
+
+KINDS = ("business", "category", "city", "county")
+NAME_MAX_WORD_STARTS = 4
+# Max keys scanned per query; wider prefix ranges use the precomputed top lists
+MAX_SCAN = 2000
+# Size of each precomputed (prefix, kind) top list; must be >= the API max limit (50)
+PRECOMPUTED_TOP = 50
+# Sorts after every normalized key: [prefix, prefix + _MAX_CHAR) = keys starting with prefix
+_MAX_CHAR = "\U0010ffff"
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace: 'Phở  Hùng' -> 'pho hung'"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.replace("đ", "d").split())
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    kind: str
+    label: str
+    weight: int
+    business_id: Optional[str] = None
+
+
+class PrefixIndex:
+
+    def __init__(self, suggestions: List[Suggestion], keys: Iterable[Tuple[str, int]]):
+        self.suggestions = suggestions
+        # (normalized_key, suggestion index), sorted by key
+        entries = sorted(keys)
+        self._keys = [k for k, _ in entries]
+        self._refs = [i for _, i in entries]
+        # (prefix, kind) -> suggestion indexes, best first; only prefixes wider than MAX_SCAN
+        self._top: Dict[Tuple[str, str], List[int]] = {}
+        self._build_wide_prefix_tops()
+
+        # Place lists for the filter dropdowns
+        self.counties: List[str] = []
+        self.cities: List[str] = []
+        self.cities_by_county: Dict[str, List[str]] = {}
+
+    def _range(self, prefix: str, lo: int = 0, hi: Optional[int] = None) -> Tuple[int, int]:
+        """[start, end) of the keys starting with prefix"""
+        hi = len(self._keys) if hi is None else hi
+        start = bisect_left(self._keys, prefix, lo, hi)
+        return start, bisect_left(self._keys, prefix + _MAX_CHAR, start, hi)
+
+    def _build_wide_prefix_tops(self) -> None:
+        """
+        Top lists for every prefix whose range is wider than MAX_SCAN. A wide prefix
+        only has wide parents, so ranges are split one character at a time from the root.
+        """
+        pending = [(0, 0, len(self._keys))]  # (prefix length, start, end) of a wide range
+        while pending:
+            n, lo, hi = pending.pop()
+            pos = lo
+            # The key equal to the prefix itself sorts first and has no longer prefix
+            while pos < hi and len(self._keys[pos]) <= n:
+                pos += 1
+            while pos < hi:
+                prefix = self._keys[pos][:n + 1]
+                start, end = self._range(prefix, pos, hi)
+                if end - start > MAX_SCAN:
+                    self._store_tops(prefix, start, end)
+                    pending.append((n + 1, start, end))
+                pos = end
+
+    def _store_tops(self, prefix: str, start: int, end: int) -> None:
+        by_kind: Dict[str, Set[int]] = defaultdict(set)
+        for ref in self._refs[start:end]:
+            by_kind[self.suggestions[ref].kind].add(ref)
+        for kind, refs in by_kind.items():
+            self._top[(prefix, kind)] = heapq.nlargest(
+                PRECOMPUTED_TOP, refs, key=lambda i: self.suggestions[i].weight
+            )
+
+    def search(self, query: str, limit: int = 10, kinds: Optional[Set[str]] = None) -> List[Suggestion]:
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        wanted = set(kinds) if kinds else set(KINDS)
+        start, end = self._range(prefix)
+        if end - start > MAX_SCAN:
+            # Exact: each kind's precomputed list holds its best PRECOMPUTED_TOP >= limit
+            candidates = {i for kind in wanted for i in self._top.get((prefix, kind), [])}
+        else:
+            candidates = {i for i in self._refs[start:end] if self.suggestions[i].kind in wanted}
+
+        top = heapq.nlargest(limit, candidates, key=lambda i: self.suggestions[i].weight)
+        return [self.suggestions[i] for i in top]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+async def build_prefix_index(db: AsyncSession) -> PrefixIndex:
+    """One narrow query over BUSINESS -> suggestions + sorted keys"""
+    result = await db.execute(
+        select(
+            Business.business_id,
+            Business.name,
+            Business.original_category,
+            Business.city,
+            Business.county,
+            Business.num_of_reviews
+        )
+    )
+
+    suggestions: List[Suggestion] = []
+    keys: List[Tuple[str, int]] = []
+    group_weight: Dict[Tuple[str, str], int] = defaultdict(int)
+    cities_by_county: Dict[str, Set[str]] = defaultdict(set)
+
+    for row in result:
+        weight = row.num_of_reviews or 0
+        if row.name:
+            idx = len(suggestions)
+            suggestions.append(Suggestion("business", row.name, weight, row.business_id))
+            words = normalize(row.name).split()
+            for start in range(min(len(words), NAME_MAX_WORD_STARTS)):
+                keys.append((" ".join(words[start:]), idx))
+        if row.original_category:
+            for category in row.original_category.split(", "):
+                if category:
+                    group_weight[("category", category)] += weight
+        if row.city:
+            group_weight[("city", row.city)] += weight
+        if row.county:
+            group_weight[("county", row.county)] += weight
+            if row.city:
+                cities_by_county[row.county].add(row.city)
+
+    for (kind, label), weight in group_weight.items():
+        idx = len(suggestions)
+        suggestions.append(Suggestion(kind, label, weight))
+        keys.append((normalize(label), idx))
+
+    index = PrefixIndex(suggestions, keys)
+    index.counties = sorted(label for kind, label in group_weight if kind == "county")
+    index.cities = sorted(label for kind, label in group_weight if kind == "city")
+    index.cities_by_county = {county: sorted(cities) for county, cities in cities_by_county.items()}
+    return index
+
+
+autocomplete_snapshot: VersionedSnapshot[PrefixIndex] = VersionedSnapshot("autocomplete", build_prefix_index)
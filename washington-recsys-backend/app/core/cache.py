@@ -0,0 +1,296 @@
+"""
+Versioned response cache for the service layer.
+
+Stats / review summary / business detail only change when the ETL runs, so
+service results are cached under a key namespaced by the current data version:
+
+    {prefix}:v{data_version}:{namespace}:{key}
+
+The gold jobs bump DATA_VERSION after each load; the next version poll moves
+every key into a new namespace, so stale entries are never read again (they
+age out via TTL / LRU eviction).
+
+The streaming job only bumps DATA_VERSION.stats_version (new reviews / STATS_*
+rows, BUSINESS unchanged). Namespaces in STATS_NAMESPACES are keyed by
+"{version}.{stats_version}", the rest by version alone, so a micro-batch does
+not flush business-level entries (or rebuild the snapshots, which follow version).
+
+Two tiers:
+    - LRUCache: in-process, bounded by entry count and TTL (always on)
+    - RedisCacheBackend: optional shared tier (any Redis-compatible server),
+      enabled when settings.CACHE_REDIS_URL is set and `redis` is installed
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.local_db import AsyncSessionLocal
+from app.models.data_version import DataVersion
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = getattr(settings, "CACHE_ENABLED", True)
+CACHE_MAX_ENTRIES = getattr(settings, "CACHE_MAX_ENTRIES", 10_000)
+CACHE_TTL_SECONDS = getattr(settings, "CACHE_TTL_SECONDS", 3600)
+CACHE_VERSION_POLL_SECONDS = getattr(settings, "CACHE_VERSION_POLL_SECONDS", 10)
+CACHE_REDIS_URL = getattr(settings, "CACHE_REDIS_URL", None)
+CACHE_KEY_PREFIX = getattr(settings, "CACHE_KEY_PREFIX", "wa-recsys")
+
+# Cache namespaces that read REVIEW / STATS_* (follow stats_version too)
+STATS_NAMESPACES = frozenset({"stats_total", "stats_yearly", "stats_monthly", "review_summary"})
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+class LRUCache:
+    """In-process LRU with per-entry TTL and a max entry count"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisCacheBackend:
+    """Shared tier backed by a Redis-compatible server (values are JSON strings)"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self.client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self.client.set(key, value, ex=int(ttl))
+
+
+class DataVersionProvider:
+    """Reads DATA_VERSION at most once per poll interval (own session, not the request's)"""
+
+    def __init__(self, poll_seconds: float = CACHE_VERSION_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._version: Optional[int] = None
+        self._updated_at: Optional[datetime] = None
+        self._stats_version = 0
+        self._stats_updated_at: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._version is not None and time.monotonic() - self._checked_at < self.poll_seconds
+
+    async def get(self) -> int:
+        version, _ = await self.get_state()
+        return version
+
+    async def get_state(self) -> Tuple[int, Optional[datetime]]:
+        """Return (version, updated_at) of the last gold load"""
+        await self._refresh()
+        return self._version, self._updated_at
+
+    async def get_stats_state(self) -> Tuple[str, Optional[datetime]]:
+        """
+        ("{version}.{stats_version}", last change) for data that the streaming job
+        also updates (reviews, stats)
+        """
+        await self._refresh()
+        changes = [t for t in (self._updated_at, self._stats_updated_at) if t is not None]
+        return f"{self._version}.{self._stats_version}", max(changes) if changes else None
+
+    async def _refresh(self) -> None:
+        if self._is_fresh():
+            return
+
+        async with self._lock:
+            # Another coroutine may have refreshed while we waited
+            if self._is_fresh():
+                return
+            try:
+                async with AsyncSessionLocal() as session:
+                    result = await session.execute(
+                        select(
+                            DataVersion.version, DataVersion.updated_at,
+                            DataVersion.stats_version, DataVersion.stats_updated_at
+                        ).where(DataVersion.id == 1)
+                    )
+                    row = result.one_or_none()
+                    if row:
+                        self._version, self._updated_at = row.version, row.updated_at
+                        self._stats_version, self._stats_updated_at = row.stats_version, row.stats_updated_at
+                    else:
+                        self._version, self._updated_at = 0, None
+            except Exception as e:
+                # Keep serving with the last known version rather than failing the request
+                logger.warning(f"Failed to read data version: {e}")
+                if self._version is None:
+                    self._version = 0
+            self._checked_at = time.monotonic()
+
+
+class ResponseCache:
+
+    def __init__(
+        self,
+        local: LRUCache,
+        shared: Optional[RedisCacheBackend] = None,
+        version_provider: Optional[DataVersionProvider] = None,
+        ttl: float = CACHE_TTL_SECONDS,
+        enabled: bool = CACHE_ENABLED
+    ):
+        self.local = local
+        self.shared = shared
+        self.version_provider = version_provider or DataVersionProvider()
+        self.ttl = ttl
+        self.enabled = enabled
+
+    async def _version(self, namespace: str) -> str:
+        if namespace in STATS_NAMESPACES:
+            version, _ = await self.version_provider.get_stats_state()
+            return version
+        return str(await self.version_provider.get())
+
+    async def _cache_keys(self, namespace: str, keys: List[str]) -> Dict[str, str]:
+        """key -> "{prefix}:v{version}:{namespace}:{key}" (one version read for all keys)"""
+        version = await self._version(namespace)
+        return {key: f"{CACHE_KEY_PREFIX}:v{version}:{namespace}:{key}" for key in keys}
+
+    async def _lookup(self, cache_key: str, decode: Callable[[str], Any]) -> Optional[Any]:
+        """Local LRU first, then the shared tier (a shared hit is copied into the LRU)"""
+        value = self.local.get(cache_key)
+        if value is not None or self.shared is None:
+            return value
+
+        try:
+            raw = await self.shared.get(cache_key)
+            if raw is not None:
+                value = decode(raw)
+                self.local.set(cache_key, value, self.ttl)
+        except Exception as e:
+            logger.warning(f"Shared cache read failed ({cache_key}): {e}")
+        return value
+
+    async def _store(self, cache_key: str, value: Any, encode: Callable[[Any], str]) -> None:
+        self.local.set(cache_key, value, self.ttl)
+        if self.shared is None:
+            return
+
+        try:
+            await self.shared.set(cache_key, encode(value), self.ttl)
+        except Exception as e:
+            logger.warning(f"Shared cache write failed ({cache_key}): {e}")
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        schema: Type[SchemaT],
+        loader: Callable[[], Awaitable[SchemaT]]
+    ) -> SchemaT:
+        """Return the cached schema object, or call loader() and cache its result"""
+        if not self.enabled:
+            return await loader()
+
+        cache_key = (await self._cache_keys(namespace, [key]))[key]
+        value = await self._lookup(cache_key, schema.model_validate_json)
+        if value is None:
+            # Exceptions from loader (e.g. NotFoundException) are not cached
+            value = await loader()
+            await self._store(cache_key, value, schema.model_dump_json)
+        return value
+
+    async def get_or_load_value(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Same as get_or_load for plain JSON values (counts, id lists...)"""
+        if not self.enabled:
+            return await loader()
+
+        cache_key = (await self._cache_keys(namespace, [key]))[key]
+        value = await self._lookup(cache_key, json.loads)
+        if value is None:
+            value = await loader()
+            await self._store(cache_key, value, json.dumps)
+        return value
+
+    async def get_or_load_many(
+        self,
+        namespace: str,
+        keys: List[str],
+        schema: Type[SchemaT],
+        loader: Callable[[List[str]], Awaitable[Dict[str, SchemaT]]]
+    ) -> Dict[str, SchemaT]:
+        """
+        Batch version of get_or_load: cached keys are served from the cache, the rest
+        go to ONE loader(missing_keys) call. Entries share the cache keys of get_or_load,
+        so single and batch endpoints warm each other.
+        """
+        if not self.enabled:
+            return await loader(keys)
+
+        cache_key_of = await self._cache_keys(namespace, keys)
+
+        found: Dict[str, SchemaT] = {}
+        missing: List[str] = []
+        for key, cache_key in cache_key_of.items():
+            value = await self._lookup(cache_key, schema.model_validate_json)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+
+        if missing:
+            loaded = await loader(missing)
+            for key, value in loaded.items():
+                await self._store(cache_key_of[key], value, schema.model_dump_json)
+            found.update(loaded)
+
+        return found
+
+
+def _build_shared_backend() -> Optional[RedisCacheBackend]:
+    if not CACHE_REDIS_URL:
+        return None
+    try:
+        return RedisCacheBackend(CACHE_REDIS_URL)
+    except ImportError:
+        logger.warning("CACHE_REDIS_URL is set but `redis` is not installed; using in-process cache only")
+        return None
+
+
+response_cache = ResponseCache(local=LRUCache(), shared=_build_shared_backend())
@@ -0,0 +1,156 @@
+"""
+In-memory columnar catalog of BUSINESS for the list filters.
+
+One numpy array per filter column (rating, review count, category_mask,
+dictionary-encoded county / city), all permuted once at build time into the
+list order (COALESCE(avg_rating, -1) DESC, business_key DESC). A filter is a
+vectorized boolean mask; because the columns are already in list order the
+page is just the next page_size positions of the mask, and the total is
+mask.sum(). Postgres only hydrates the page_size card rows.
+
+Full-text search is not handled here (it needs the tsvector / trigram
+indexes); those requests keep going to Postgres. The catalog is rebuilt and
+swapped atomically when the ETL data version changes (VersionedSnapshot).
+"""
+
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.snapshot import VersionedSnapshot
+from app.models import Business
+from app.models.business import category_bits
+
+
+def _encode(values: List[Optional[str]]) -> Tuple[np.ndarray, Dict[str, int]]:
+    """Dictionary encoding: codes array (-1 = NULL) + value -> code"""
+    index: Dict[str, int] = {}
+    codes = np.fromiter(
+        (-1 if v is None else index.setdefault(v, len(index)) for v in values),
+        dtype=np.int32, count=len(values)
+    )
+    return codes, index
+
+
+class BusinessCatalog:
+
+    def __init__(
+        self,
+        business_keys: np.ndarray,
+        ratings: np.ndarray,
+        num_reviews: np.ndarray,
+        masks: np.ndarray,
+        counties: List[Optional[str]],
+        cities: List[Optional[str]]
+    ):
+        county_codes, self.county_index = _encode(counties)
+        city_codes, self.city_index = _encode(cities)
+
+        # Same sort key as BusinessRepository.rating_sort_key(): NULL rating -> -1
+        rating_sort = np.where(np.isnan(ratings), -1.0, ratings)
+        # List order: rating_sort DESC, business_key DESC (lexsort: last key is the primary one)
+        order = np.lexsort((-business_keys, -rating_sort))
+
+        self.business_keys = business_keys[order]
+        self.rating_sort = rating_sort[order]
+        self.ratings = ratings[order]         # NaN = chưa có rating (không khớp min/max_rating, như SQL)
+        self.num_reviews = num_reviews[order]
+        self.masks = masks[order]
+        self.county_codes = county_codes[order]
+        self.city_codes = city_codes[order]
+
+    def __len__(self) -> int:
+        return len(self.business_keys)
+
+    def _filter_mask(
+        self,
+        field: Optional[List[str]] = None,
+        field_match: str = "any",
+        county: Optional[str] = None,
+        city: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None
+    ) -> np.ndarray:
+        """Boolean mask over the list order; same semantics as BusinessRepository._build_list_conditions"""
+        keep = np.ones(len(self), dtype=bool)
+
+        bits = category_bits(field)
+        if bits:
+            hit = self.masks & bits
+            keep &= (hit == bits) if field_match == "all" else (hit != 0)
+        if county:
+            # Unknown value -> code -2 matches nothing
+            keep &= self.county_codes == self.county_index.get(county, -2)
+        if city:
+            keep &= self.city_codes == self.city_index.get(city, -2)
+        if min_rating is not None:
+            keep &= self.ratings >= min_rating
+        if max_rating is not None:
+            keep &= self.ratings <= max_rating
+        return keep
+
+    def page(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: Optional[Tuple[Decimal, int]] = None,
+        **filters
+    ) -> Tuple[List[int], Optional[tuple], int]:
+        """
+        Business keys of one page in list order.
+        Returns (business_keys, next_key, total); next_key is (rating_sort, business_key)
+        like BusinessRepository.get_list, so cursors work across both paths.
+        """
+        keep = self._filter_mask(**filters)
+        total = int(np.count_nonzero(keep))
+
+        positions = np.flatnonzero(keep)
+        if cursor is not None:
+            rating, key = float(cursor[0]), int(cursor[1])
+            # Rows strictly after the cursor in (rating_sort DESC, business_key DESC)
+            rs, keys = self.rating_sort[positions], self.business_keys[positions]
+            positions = positions[(rs < rating) | ((rs == rating) & (keys < key))]
+        else:
+            positions = positions[(page - 1) * page_size:]
+
+        has_next = len(positions) > page_size
+        positions = positions[:page_size]
+
+        next_key = None
+        if has_next:
+            last = positions[-1]
+            next_key = (Decimal(repr(float(self.rating_sort[last]))), int(self.business_keys[last]))
+        return self.business_keys[positions].tolist(), next_key, total
+
+
+async def build_catalog(db: AsyncSession) -> BusinessCatalog:
+    """One narrow query over BUSINESS (filter columns only)"""
+    result = await db.execute(
+        select(
+            Business.business_key,
+            Business.avg_rating,
+            Business.num_of_reviews,
+            Business.category_mask,
+            Business.county,
+            Business.city
+        )
+    )
+    rows = result.all()
+
+    return BusinessCatalog(
+        business_keys=np.array([r.business_key for r in rows], dtype=np.int64),
+        ratings=np.array(
+            [float(r.avg_rating) if r.avg_rating is not None else np.nan for r in rows],
+            dtype=np.float64
+        ),
+        num_reviews=np.array([r.num_of_reviews or 0 for r in rows], dtype=np.int32),
+        masks=np.array([r.category_mask or 0 for r in rows], dtype=np.int32),
+        counties=[r.county for r in rows],
+        cities=[r.city for r in rows]
+    )
+
+
+catalog_snapshot: VersionedSnapshot[BusinessCatalog] = VersionedSnapshot("catalog", build_catalog)
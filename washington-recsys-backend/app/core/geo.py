@@ -0,0 +1,184 @@
+"""
+In-memory spatial index for "near me" queries.
+
+Businesses with coordinates are bucketed into a fixed lat/long grid
+(GEO_CELL_DEG degrees per cell) and stored as numpy columns sorted by cell,
+so a cell is one contiguous slice. A radius query gathers the cells that
+cover the bounding box, applies the category / rating filters as vector
+masks and refines the candidates with a vectorized haversine distance.
+
+k-nearest (no radius) grows the search radius until k matches are found
+inside it, which keeps the result exact: every point within the radius is
+in the scanned cells.
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.snapshot import VersionedSnapshot
+from app.models import Business
+from app.models.business import category_bits
+
+EARTH_RADIUS_KM = 6371.0088
+GEO_CELL_DEG = getattr(settings, "GEO_CELL_DEG", 0.05)  # ~5.5 km lat
+KNN_START_RADIUS_KM = 2.0
+KNN_MAX_RADIUS_KM = getattr(settings, "NEARBY_MAX_RADIUS_KM", 200.0)
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Distance (km) from one point to arrays of points, all in degrees"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GeoIndex:
+
+    def __init__(
+        self,
+        business_keys: np.ndarray,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        ratings: np.ndarray,
+        masks: np.ndarray,
+        cell_deg: float = GEO_CELL_DEG
+    ):
+        self.cell_deg = cell_deg
+        rows = np.floor(lats / cell_deg).astype(np.int64)
+        cols = np.floor(lons / cell_deg).astype(np.int64)
+
+        # Sort every column by (row, col) so one cell = one slice
+        order = np.lexsort((cols, rows))
+        self.business_keys = business_keys[order]
+        self.lats = lats[order]
+        self.lons = lons[order]
+        self.ratings = ratings[order]   # NaN = chưa có rating
+        self.masks = masks[order]
+        rows, cols = rows[order], cols[order]
+
+        self._cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        if len(order):
+            change = np.flatnonzero((np.diff(rows) != 0) | (np.diff(cols) != 0)) + 1
+            starts = np.concatenate(([0], change))
+            ends = np.concatenate((change, [len(order)]))
+            for s, e in zip(starts.tolist(), ends.tolist()):
+                self._cells[(int(rows[s]), int(cols[s]))] = (s, e)
+
+    def __len__(self) -> int:
+        return len(self.business_keys)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Row positions of every point in the cells covering the bounding box of the circle"""
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+        dlon = min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+
+        r0, r1 = math.floor((lat - dlat) / self.cell_deg), math.floor((lat + dlat) / self.cell_deg)
+        c0, c1 = math.floor((lon - dlon) / self.cell_deg), math.floor((lon + dlon) / self.cell_deg)
+
+        slices = []
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self._cells):
+            # Box bigger than the populated grid: walk the cells instead of the box
+            for (r, c), (s, e) in self._cells.items():
+                if r0 <= r <= r1 and c0 <= c <= c1:
+                    slices.append(np.arange(s, e))
+        else:
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    span = self._cells.get((r, c))
+                    if span:
+                        slices.append(np.arange(*span))
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def _within(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        bits: int,
+        match_all: bool,
+        min_rating: Optional[float],
+        max_rating: Optional[float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        idx = self._candidates(lat, lon, radius_km)
+        if bits:
+            hit = self.masks[idx] & bits
+            idx = idx[hit == bits] if match_all else idx[hit != 0]
+        if min_rating is not None:
+            idx = idx[self.ratings[idx] >= min_rating]  # NaN >= x -> False
+        if max_rating is not None:
+            idx = idx[self.ratings[idx] <= max_rating]
+
+        dist = haversine_km(lat, lon, self.lats[idx], self.lons[idx])
+        keep = dist <= radius_km
+        return idx[keep], dist[keep]
+
+    def nearby(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: Optional[float] = None,
+        limit: int = 20,
+        fields: Optional[List[str]] = None,
+        match_all: bool = False,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None
+    ) -> Tuple[List[int], List[float]]:
+        """
+        Nearest businesses (within radius_km, or the `limit` nearest if no radius).
+        Returns (business_keys, distances_km) ordered by distance.
+        """
+        bits = category_bits(fields)
+        if radius_km is not None:
+            idx, dist = self._within(lat, lon, radius_km, bits, match_all, min_rating, max_rating)
+        else:
+            radius = KNN_START_RADIUS_KM
+            while True:
+                idx, dist = self._within(lat, lon, radius, bits, match_all, min_rating, max_rating)
+                if len(idx) >= limit or radius >= KNN_MAX_RADIUS_KM:
+                    break
+                radius = min(radius * 2, KNN_MAX_RADIUS_KM)
+
+        if len(idx) > limit:
+            top = np.argpartition(dist, limit - 1)[:limit]
+            idx, dist = idx[top], dist[top]
+        order = np.argsort(dist, kind="stable")
+        return self.business_keys[idx[order]].tolist(), dist[order].tolist()
+
+
+async def build_geo_index(db: AsyncSession) -> GeoIndex:
+    """One narrow query over BUSINESS (rows with coordinates only)"""
+    result = await db.execute(
+        select(
+            Business.business_key,
+            Business.latitude,
+            Business.longitude,
+            Business.avg_rating,
+            Business.category_mask
+        )
+        .where(Business.latitude.isnot(None), Business.longitude.isnot(None))
+    )
+    rows = result.all()
+
+    return GeoIndex(
+        business_keys=np.array([r.business_key for r in rows], dtype=np.int64),
+        lats=np.array([float(r.latitude) for r in rows], dtype=np.float64),
+        lons=np.array([float(r.longitude) for r in rows], dtype=np.float64),
+        ratings=np.array(
+            [float(r.avg_rating) if r.avg_rating is not None else np.nan for r in rows],
+            dtype=np.float64
+        ),
+        masks=np.array([r.category_mask or 0 for r in rows], dtype=np.int32)
+    )
+
+
+geo_snapshot: VersionedSnapshot[GeoIndex] = VersionedSnapshot("geo", build_geo_index)
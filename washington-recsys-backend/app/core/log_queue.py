@@ -0,0 +1,242 @@
+"""
+Non-blocking log shipping for the API.
+
+LogRepository only puts rows on a bounded in-process queue (put_nowait, no
+I/O); a background task drains it and writes batches to a sink when
+LOG_BATCH_SIZE rows are waiting or LOG_FLUSH_SECONDS have passed since the
+first row of the batch. When the queue is full the row is dropped and
+counted, so logging never adds latency to a request.
+
+Sinks (settings.LOG_SINK):
+    - "supabase": bulk insert per table, sync client run in a worker thread
+    - "sqlite":   local file (LOG_SQLITE_PATH), one table per log table
+    - "jsonl":    one JSON line per row (LOG_JSONL_PATH), handy for tests
+    - "none":     discard
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LOG_SINK = getattr(settings, "LOG_SINK", "supabase")
+LOG_QUEUE_MAX_SIZE = getattr(settings, "LOG_QUEUE_MAX_SIZE", 10_000)
+LOG_BATCH_SIZE = getattr(settings, "LOG_BATCH_SIZE", 200)
+LOG_FLUSH_SECONDS = getattr(settings, "LOG_FLUSH_SECONDS", 2.0)
+LOG_SQLITE_PATH = getattr(settings, "LOG_SQLITE_PATH", "logs/api_logs.sqlite3")
+LOG_JSONL_PATH = getattr(settings, "LOG_JSONL_PATH", "logs/api_logs.jsonl")
+
+# (table, row)
+LogRecord = Tuple[str, Dict[str, Any]]
+
+
+def _group_by_table(records: List[LogRecord]) -> Dict[str, List[Dict[str, Any]]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for table, row in records:
+        grouped[table].append(row)
+    return grouped
+
+
+class LogSink:
+    """Writes one batch; may block, it always runs off the event loop or in the flusher task"""
+
+    async def write_batch(self, records: List[LogRecord]) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class NullLogSink(LogSink):
+
+    async def write_batch(self, records: List[LogRecord]) -> None:
+        pass
+
+
+class SupabaseLogSink(LogSink):
+
+    def __init__(self, client=None):
+        if client is None:
+            from app.db.supabase_db import get_supabase_client
+            client = get_supabase_client()
+        self.client = client
+
+    def _insert(self, records: List[LogRecord]) -> None:
+        # 1 HTTP request per table instead of 1 per row
+        for table, rows in _group_by_table(records).items():
+            self.client.table(table).insert(rows).execute()
+
+    async def write_batch(self, records: List[LogRecord]) -> None:
+        await asyncio.to_thread(self._insert, records)
+
+
+class SQLiteLogSink(LogSink):
+    """Local table per log table: (id, created_at, payload JSON)"""
+
+    def __init__(self, path: str = LOG_SQLITE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Only the flusher's worker thread touches the connection, one batch at a time
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._tables = set()
+
+    def _insert(self, records: List[LogRecord]) -> None:
+        with self.conn:
+            for table, rows in _group_by_table(records).items():
+                if table not in self._tables:
+                    self.conn.execute(
+                        f'CREATE TABLE IF NOT EXISTS "{table}" '
+                        "(id INTEGER PRIMARY KEY AUTOINCREMENT, created_at TEXT, payload TEXT)"
+                    )
+                    self._tables.add(table)
+                self.conn.executemany(
+                    f'INSERT INTO "{table}" (created_at, payload) VALUES (?, ?)',
+                    [(row.get("created_at"), json.dumps(row, default=str)) for row in rows]
+                )
+
+    async def write_batch(self, records: List[LogRecord]) -> None:
+        await asyncio.to_thread(self._insert, records)
+
+    async def close(self) -> None:
+        self.conn.close()
+
+
+class JsonlLogSink(LogSink):
+
+    def __init__(self, path: str = LOG_JSONL_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+
+    def _append(self, records: List[LogRecord]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for table, row in records:
+                f.write(json.dumps({"table": table, **row}, default=str, ensure_ascii=False) + "\n")
+
+    async def write_batch(self, records: List[LogRecord]) -> None:
+        await asyncio.to_thread(self._append, records)
+
+
+def build_sink(kind: str = LOG_SINK) -> LogSink:
+    if kind == "supabase":
+        return SupabaseLogSink()
+    if kind == "sqlite":
+        return SQLiteLogSink()
+    if kind == "jsonl":
+        return JsonlLogSink()
+    if kind == "none":
+        return NullLogSink()
+    raise ValueError(f"Unknown LOG_SINK: {kind}")
+
+
+class LogQueue:
+
+    def __init__(
+        self,
+        sink: Optional[LogSink] = None,
+        max_size: int = LOG_QUEUE_MAX_SIZE,
+        batch_size: int = LOG_BATCH_SIZE,
+        flush_seconds: float = LOG_FLUSH_SECONDS
+    ):
+        # Sink is built on start() so importing the app never opens a client / file
+        self.sink = sink
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: List[LogRecord] = []
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    def enqueue(self, table: str, row: Dict[str, Any]) -> bool:
+        """Never blocks: False (and dropped += 1) when the queue is full or not started"""
+        if self._queue is None:
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait((table, row))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Log queue full ({self.max_size}), {self.dropped} rows dropped so far")
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _collect_batch(self) -> None:
+        """Wait for the first row, then collect until batch_size rows or flush_seconds elapsed"""
+        # Rows go to self._batch (not a local) so stop() can still flush them after a cancel
+        self._batch.append(await self._queue.get())
+        deadline = time.monotonic() + self.flush_seconds
+        while len(self._batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _write(self, batch: List[LogRecord]) -> None:
+        try:
+            await self.sink.write_batch(batch)
+            self.written += len(batch)
+        except Exception as e:
+            # Don't break the app if logging fails; the batch is lost
+            self.failed += len(batch)
+            logger.warning(f"Failed to write {len(batch)} log rows: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await self._collect_batch()
+            batch, self._batch = self._batch, []
+            await self._write(batch)
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        if self.sink is None:
+            try:
+                self.sink = build_sink()
+            except Exception as e:
+                logger.warning(f"Log sink '{LOG_SINK}' unavailable, logs are discarded: {e}")
+                self.sink = NullLogSink()
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write what is still queued"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+        pending, self._batch = self._batch, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for i in range(0, len(pending), self.batch_size):
+            await self._write(pending[i:i + self.batch_size])
+        await self.sink.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed
+        }
+
+
+log_queue = LogQueue()
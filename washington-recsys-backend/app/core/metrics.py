@@ -0,0 +1,173 @@
+"""
+Prometheus metrics for the API (exported at /metrics).
+
+HTTP (MetricsMiddleware, pure ASGI so streaming bodies are measured too):
+    - api_http_request_duration_seconds{method, route, status}
+    - api_http_requests_in_flight{method}
+    - api_http_response_size_bytes{method, route}
+
+DB (SQLAlchemy cursor events on the async engine, see instrument_engine):
+    - api_db_query_duration_seconds{operation}
+    - api_db_queries_per_request{route}, api_db_time_per_request_seconds{route}
+
+Labels use the route template (/businesses/{business_id}), never the raw
+path, to keep cardinality bounded. Queries slower than SLOW_QUERY_MS are
+logged with their SQL; with settings.DEBUG a SELECT also gets its
+EXPLAIN ANALYZE plan (runs the query a second time, debug only).
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = getattr(settings, "SLOW_QUERY_MS", 200)
+SLOW_QUERY_EXPLAIN = getattr(settings, "SLOW_QUERY_EXPLAIN", getattr(settings, "DEBUG", False))
+
+HTTP_REQUEST_DURATION = Histogram(
+    "api_http_request_duration_seconds", "HTTP request latency",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+HTTP_IN_FLIGHT = Gauge(
+    "api_http_requests_in_flight", "HTTP requests being served", ["method"]
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "api_http_response_size_bytes", "HTTP response body size",
+    ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+DB_QUERY_DURATION = Histogram(
+    "api_db_query_duration_seconds", "Duration of one SQL statement",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "api_db_queries_per_request", "SQL statements executed per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "api_db_time_per_request_seconds", "Total SQL time per HTTP request",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+DB_SLOW_QUERIES = Counter(
+    "api_db_slow_queries_total", f"SQL statements slower than {SLOW_QUERY_MS} ms", ["operation"]
+)
+
+
+class _RequestDbStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Set per request by MetricsMiddleware. SQLAlchemy runs cursor events in a greenlet that
+# inherits the caller's context, so the object is mutated in place (never re-set)
+_request_db_stats: ContextVar[Optional[_RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def _operation(statement: str) -> str:
+    """SELECT / INSERT / ... (first keyword, bounded label set)"""
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """EXPLAIN ANALYZE on a separate DBAPI cursor (the original cursor still holds the result)"""
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN ANALYZE {statement}", parameters)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f"(EXPLAIN failed: {e})"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    operation = _operation(statement)
+    DB_QUERY_DURATION.labels(operation).observe(elapsed)
+
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        DB_SLOW_QUERIES.labels(operation).inc()
+        message = f"Slow query ({elapsed * 1000:.0f} ms): {statement} | params={parameters!r:.500}"
+        # EXPLAIN ANALYZE executes the statement again: only for reads
+        if SLOW_QUERY_EXPLAIN and operation in ("SELECT", "WITH") and not executemany:
+            message += "\n" + (_explain(conn, statement, parameters) or "")
+        logger.warning(message)
+
+
+def instrument_engine(async_engine) -> None:
+    """Attach the cursor timing events to an AsyncEngine (events live on its sync_engine)"""
+    sync_engine = async_engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: latency, in-flight, response size and per-request DB stats"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+        size = {"bytes": 0}
+        db_stats = _RequestDbStats()
+        token = _request_db_stats.set(db_stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                size["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_FLIGHT.labels(method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.labels(method).dec()
+            _request_db_stats.reset(token)
+
+            # The router stores the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(method, route_label, str(status["code"])).observe(elapsed)
+            HTTP_RESPONSE_SIZE.labels(method, route_label).observe(size["bytes"])
+            DB_QUERIES_PER_REQUEST.labels(route_label).observe(db_stats.queries)
+            DB_TIME_PER_REQUEST.labels(route_label).observe(db_stats.seconds)
+
+
+def render_metrics():
+    """(body, content type) in the Prometheus text exposition format"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,36 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Cursor token could not be decoded"""
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row into an opaque, URL-safe token"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> list:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {token}") from e
+    if not isinstance(values, list):
+        raise InvalidCursorError(f"Invalid cursor: {token}")
+    return values
+
+
+def decode_time_id_cursor(token: str) -> Tuple[datetime, int]:
+    """Decode a (time, id) cursor as produced by encode_cursor(time, id)"""
+    values = decode_cursor(token)
+    try:
+        time_str, row_id = values
+        return datetime.fromisoformat(time_str), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {token}") from e
@@ -0,0 +1,44 @@
+"""
+Fast JSON path for large list responses.
+
+List endpoints build plain dicts from Core rows (trusted DB values, already
+in the response shape) and serialize them once with orjson, instead of ORM
+entity -> model_validate per row -> FastAPI response_model validation ->
+json.dumps. The response_model stays on the route for the OpenAPI schema.
+
+Wire format matches the pydantic output: Decimal as string, naive datetime
+as ISO 8601 without offset.
+"""
+
+from decimal import Decimal
+from typing import Any, Optional
+
+import orjson
+from fastapi import Response
+
+
+def _default(obj: Any) -> Any:
+    # pydantic v2 serializes Decimal as a JSON string
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_json(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    Wrap a payload dict. FastAPI drops headers set on the injected Response
+    (ETag / Last-Modified from conditional_get) when the route returns its own
+    Response, so they are copied here.
+    """
+    return FastJSONResponse(content, headers=dict(response.headers) if response is not None else None)
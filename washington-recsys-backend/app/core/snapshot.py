@@ -0,0 +1,105 @@
+"""
+In-process read-only snapshots that follow the ETL data version.
+
+A VersionedSnapshot holds one immutable object (an index, a lookup table...)
+built from Postgres. A background task polls DATA_VERSION and rebuilds the
+object when the gold jobs bump it; the new object is swapped in atomically, so
+the request path never waits on the database.
+
+Request paths read `await snapshot.current()`, not `snapshot.value`: between a
+version bump and the swap the old object would pair version-V results with
+the V+1 ETag from conditional_get (and clients would pin that with 304s), so
+current() returns None then and the caller falls back to Postgres.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import response_cache, CACHE_VERSION_POLL_SECONDS
+from app.db.local_db import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class VersionedSnapshot(Generic[T]):
+
+    def __init__(
+        self,
+        name: str,
+        builder: Callable[[AsyncSession], Awaitable[T]],
+        poll_seconds: float = CACHE_VERSION_POLL_SECONDS
+    ):
+        self.name = name
+        self.builder = builder
+        self.poll_seconds = poll_seconds
+        self.value: Optional[T] = None
+        self.version: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._rebuild: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    async def current(self) -> Optional[T]:
+        """The object if it was built for the current data version, else None"""
+        value, version = self.value, self.version
+        if value is None:
+            return None
+        if version != await response_cache.version_provider.get():
+            # Stale: rebuild now instead of waiting for the next poll
+            if self._task is not None and (self._rebuild is None or self._rebuild.done()):
+                self._rebuild = asyncio.create_task(self._refresh_logged())
+            return None
+        return value
+
+    async def refresh(self, force: bool = False) -> None:
+        """Rebuild if the data version changed (or force)"""
+        async with self._lock:
+            version = await response_cache.version_provider.get()
+            if not force and self.ready and version == self.version:
+                return
+
+            start = time.perf_counter()
+            async with AsyncSessionLocal() as session:
+                value = await self.builder(session)
+            # Swap in one assignment: readers see either the old or the new object
+            self.value, self.version = value, version
+            logger.info(
+                f"Snapshot '{self.name}' built for data version {version} "
+                f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+            )
+
+    async def _refresh_logged(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Keep the previous snapshot; current() falls back to the DB meanwhile
+            logger.warning(f"Snapshot '{self.name}' refresh failed: {e}")
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            await self._refresh_logged()
+
+    async def start(self) -> None:
+        """Initial build + background refresher (call on app startup)"""
+        try:
+            await self.refresh(force=True)
+        except Exception as e:
+            logger.warning(f"Snapshot '{self.name}' initial build failed, will retry: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._rebuild):
+            if task is not None:
+                task.cancel()
+        self._task = self._rebuild = None
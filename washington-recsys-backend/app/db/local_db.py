@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
 # Async engine for PostgreSQL
 engine = create_async_engine(
@@ -11,6 +12,9 @@ engine = create_async_engine(
     max_overflow=20
 )
 
+# Query timing / slow query log (see app/core/metrics.py)
+instrument_engine(engine)
+
 # Session factory
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
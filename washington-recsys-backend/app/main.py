@@ -1,9 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import api_router
 from app.core.config import settings
 from app.core.middleware import LoggingMiddleware
+from app.core.autocomplete import autocomplete_snapshot
+from app.core.geo import geo_snapshot
+from app.core.catalog import catalog_snapshot
+from app.core.log_queue import log_queue
+from app.core.metrics import MetricsMiddleware, render_metrics
 
 
 app = FastAPI(
@@ -24,19 +29,56 @@ app.add_middleware(
 )
 
 app.add_middleware(LoggingMiddleware)
+# Added last = outermost: its timing covers the other middlewares too
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(api_router)
 
 
+@app.on_event("startup")
+async def start_log_queue():
+    # Request logs are batched off the request path
+    await log_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_log_queue():
+    # Flush what is still queued
+    await log_queue.stop()
+
+
+@app.on_event("startup")
+async def start_snapshots():
+    # Build in-memory indexes and keep them in sync with the ETL data version
+    await autocomplete_snapshot.start()
+    await geo_snapshot.start()
+    await catalog_snapshot.start()
+
+
+@app.on_event("shutdown")
+async def stop_snapshots():
+    await autocomplete_snapshot.stop()
+    await geo_snapshot.stop()
+    await catalog_snapshot.stop()
+
+
 @app.get("/health", tags=["Health"])
 async def health_check():
     return {
         "status": "healthy",
         "env": settings.ENV_MODE,
-        "project": settings.PROJECT_NAME
+        "project": settings.PROJECT_NAME,
+        "log_queue": log_queue.stats()
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/", tags=["Root"])
 async def root():
     return {
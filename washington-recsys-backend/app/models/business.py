@@ -1,12 +1,47 @@
-from sqlalchemy import Column, String, Text, Boolean, Integer, DECIMAL, ForeignKey
-from sqlalchemy.orm import relationship
+from typing import List, Optional
+from sqlalchemy import Column, String, Text, Boolean, Integer, BigInteger, DECIMAL, ForeignKey, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.db.local_db import Base
 
 
+# Thứ tự bit của category_mask (bit 0 = food_dining, ...).
+# Phải khớp với CATEGORY_GROUPS trong source/modules/transformer.py
+CATEGORY_FIELDS = [
+    "food_dining",
+    "health_medical",
+    "automotive_transport",
+    "retail_shopping",
+    "beauty_wellness",
+    "home_services_construction",
+    "education_community",
+    "entertainment_travel",
+    "industry_manufacturing",
+    "financial_legal_services",
+]
+
+
+def category_bits(fields: Optional[List[str]]) -> int:
+    """Field names -> OR of their category_mask bits (unknown names are ignored)"""
+    bits = 0
+    for field in fields or []:
+        if field in CATEGORY_FIELDS:
+            bits |= 1 << CATEGORY_FIELDS.index(field)
+    return bits
+
+
+def category_masks(bits: int, match_all: bool = False) -> List[int]:
+    """Every category_mask value that has all (match_all) / any of the given bits"""
+    if match_all:
+        return [m for m in range(1 << len(CATEGORY_FIELDS)) if m & bits == bits]
+    return [m for m in range(1 << len(CATEGORY_FIELDS)) if m & bits]
+
+
 class Business(Base):
     __tablename__ = "business"
 
-    business_id = Column(String, primary_key=True)
+    business_key = Column(BigInteger, primary_key=True)
+    business_id = Column(String, unique=True, nullable=False)  # gmap_id gốc (API tra cứu)
     name = Column(Text)
     description = Column(Text)
     
@@ -29,6 +64,18 @@ class Business(Base):
     # Category
     original_category = Column(Text)
     new_category = Column(Text)
+    category_mask = Column(Integer, default=0)  # Bitmask theo CATEGORY_FIELDS
+
+    # Search: weighted tsvector (name A, category B, city C), chỉ dùng trong WHERE/ORDER BY
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', COALESCE(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', COALESCE(original_category, '')), 'B') || "
+            "setweight(to_tsvector('simple', COALESCE(city, '')), 'C')",
+            persisted=True
+        )
+    ))
 
     # Relationships
     category = relationship("Category", back_populates="business", uselist=False)
@@ -41,7 +88,7 @@ class Business(Base):
 class Category(Base):
     __tablename__ = "category"
 
-    business_id = Column(String, ForeignKey("business.business_id", ondelete="CASCADE"), primary_key=True)
+    business_key = Column(BigInteger, ForeignKey("business.business_key", ondelete="CASCADE"), primary_key=True)
     
     food_dining = Column(Boolean, default=False)
     health_medical = Column(Boolean, default=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, String, Text, BigInteger
 from sqlalchemy.orm import relationship
 from app.db.local_db import Base
 
@@ -6,7 +6,8 @@ from app.db.local_db import Base
 class Customer(Base):
     __tablename__ = "customer"
 
-    customer_id = Column(String, primary_key=True)
+    customer_key = Column(BigInteger, primary_key=True)
+    customer_id = Column(String, unique=True, nullable=False)  # user_id gốc
     name = Column(Text)
 
     # Relationships
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, SmallInteger, BigInteger, DateTime
+from app.db.local_db import Base
+
+
+class DataVersion(Base):
+    __tablename__ = "data_version"
+
+    # Single row (id = 1), bumped by the gold ETL jobs after each load
+    id = Column(SmallInteger, primary_key=True, default=1)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+    # Bumped by the streaming job (REVIEW / STATS_* only, BUSINESS unchanged)
+    stats_version = Column(BigInteger, nullable=False, default=0)
+    stats_updated_at = Column(DateTime, nullable=False)
@@ -1,14 +1,30 @@
-from sqlalchemy import Column, String, Text, Integer, Boolean, DECIMAL, ForeignKey, TIMESTAMP, Date, Computed
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, Integer, BigInteger, Boolean, DECIMAL, ForeignKey, TIMESTAMP, Date, Computed, select
+from sqlalchemy.orm import relationship, column_property
 from app.db.local_db import Base
+from app.models.business import Business
+from app.models.customer import Customer
 
 
 class Review(Base):
     __tablename__ = "review"
 
-    review_id = Column(String, primary_key=True)
-    business_id = Column(String, ForeignKey("business.business_id"), nullable=False)
-    customer_id = Column(String, ForeignKey("customer.customer_id"), nullable=False)
+    review_id = Column(BigInteger, primary_key=True)
+    business_key = Column(BigInteger, ForeignKey("business.business_key"), nullable=False)
+    customer_key = Column(BigInteger, ForeignKey("customer.customer_key"), nullable=False)
+
+    # Natural ID cho API (tra qua PK của BUSINESS/CUSTOMER, load cùng câu query)
+    business_id = column_property(
+        select(Business.business_id)
+        .where(Business.business_key == business_key)
+        .correlate_except(Business)
+        .scalar_subquery()
+    )
+    customer_id = column_property(
+        select(Customer.customer_id)
+        .where(Customer.customer_key == customer_key)
+        .correlate_except(Customer)
+        .scalar_subquery()
+    )
     
     # Time
     time = Column(TIMESTAMP)
@@ -1,12 +1,13 @@
-from sqlalchemy import Column, String, Integer, DECIMAL, Date, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, DECIMAL, Date, ForeignKey, select
+from sqlalchemy.orm import relationship, column_property
 from app.db.local_db import Base
+from app.models.business import Business
 
 
 class StatsMonthly(Base):
     __tablename__ = "stats_monthly"
 
-    business_id = Column(String, ForeignKey("business.business_id", ondelete="CASCADE"), primary_key=True)
+    business_key = Column(BigInteger, ForeignKey("business.business_key", ondelete="CASCADE"), primary_key=True)
     year = Column(Integer, primary_key=True)
     month = Column(Integer, primary_key=True)
     
@@ -21,6 +22,19 @@ class StatsMonthly(Base):
     
     avg_sentiment = Column(DECIMAL(5, 4))
 
+    # Histogram rating 1-5 (precomputed bởi ETL)
+    rating_1 = Column(Integer, default=0)
+    rating_2 = Column(Integer, default=0)
+    rating_3 = Column(Integer, default=0)
+    rating_4 = Column(Integer, default=0)
+    rating_5 = Column(Integer, default=0)
+    
+    # Phản hồi của chủ quán
+    response_count = Column(Integer, default=0)
+    response_rate = Column(DECIMAL(5, 2))
+    avg_response_latency_hrs = Column(DECIMAL(10, 2))
+    median_response_latency_hrs = Column(DECIMAL(10, 2))
+
     # Relationship
     business = relationship("Business", back_populates="stats_monthly")
 
@@ -28,7 +42,7 @@ class StatsMonthly(Base):
 class StatsYearly(Base):
     __tablename__ = "stats_yearly"
 
-    business_id = Column(String, ForeignKey("business.business_id", ondelete="CASCADE"), primary_key=True)
+    business_key = Column(BigInteger, ForeignKey("business.business_key", ondelete="CASCADE"), primary_key=True)
     year = Column(Integer, primary_key=True)
     
     total_reviews = Column(Integer, default=0)
@@ -42,6 +56,19 @@ class StatsYearly(Base):
     
     avg_sentiment = Column(DECIMAL(5, 4))
 
+    # Histogram rating 1-5 (precomputed bởi ETL)
+    rating_1 = Column(Integer, default=0)
+    rating_2 = Column(Integer, default=0)
+    rating_3 = Column(Integer, default=0)
+    rating_4 = Column(Integer, default=0)
+    rating_5 = Column(Integer, default=0)
+    
+    # Phản hồi của chủ quán
+    response_count = Column(Integer, default=0)
+    response_rate = Column(DECIMAL(5, 2))
+    avg_response_latency_hrs = Column(DECIMAL(10, 2))
+    median_response_latency_hrs = Column(DECIMAL(10, 2))
+
     # Relationship
     business = relationship("Business", back_populates="stats_yearly")
 
@@ -49,7 +76,15 @@ class StatsYearly(Base):
 class StatsTotal(Base):
     __tablename__ = "stats_total"
 
-    business_id = Column(String, ForeignKey("business.business_id", ondelete="CASCADE"), primary_key=True)
+    business_key = Column(BigInteger, ForeignKey("business.business_key", ondelete="CASCADE"), primary_key=True)
+
+    # Natural business_id (gmap_id) cho StatsTotalSchema, tra qua PK của BUSINESS
+    business_id = column_property(
+        select(Business.business_id)
+        .where(Business.business_key == business_key)
+        .correlate_except(Business)
+        .scalar_subquery()
+    )
     
     total_reviews = Column(Integer, default=0)
     positive_count = Column(Integer, default=0)
@@ -61,6 +96,19 @@ class StatsTotal(Base):
     negative_pct = Column(DECIMAL(5, 2))
     
     avg_sentiment = Column(DECIMAL(5, 4))
+
+    # Histogram rating 1-5 (precomputed bởi ETL)
+    rating_1 = Column(Integer, default=0)
+    rating_2 = Column(Integer, default=0)
+    rating_3 = Column(Integer, default=0)
+    rating_4 = Column(Integer, default=0)
+    rating_5 = Column(Integer, default=0)
+    
+    # Phản hồi của chủ quán
+    response_count = Column(Integer, default=0)
+    response_rate = Column(DECIMAL(5, 2))
+    avg_response_latency_hrs = Column(DECIMAL(10, 2))
+    median_response_latency_hrs = Column(DECIMAL(10, 2))
     
     first_review_date = Column(Date)
     last_review_date = Column(Date)
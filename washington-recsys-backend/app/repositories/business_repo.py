@@ -1,8 +1,43 @@
+import re
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, any_, bindparam, tuple_, cast
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import joinedload
-from typing import Optional, List, Tuple
-from app.models import Business, Category
+from sqlalchemy.types import Integer, Float, String
+from typing import Optional, List, Tuple, Dict
+from decimal import Decimal
+from app.models import Business
+from app.models.business import category_bits, category_masks
+
+
+def business_key_of(business_id: str):
+    """Scalar subquery: business_id (gmap_id) -> business_key (dùng UNIQUE index trên business_id)"""
+    return (
+        select(Business.business_key)
+        .where(Business.business_id == business_id)
+        .scalar_subquery()
+    )
+
+
+def business_ids_param(business_ids: List[str]):
+    """business_id = ANY(:business_ids) - 1 bind param dạng mảng, cùng 1 câu SQL cho mọi số lượng id"""
+    return any_(bindparam("business_ids", list(business_ids), type_=ARRAY(String)))
+
+
+# Columns of BusinessCardSchema, in schema order, selected as Core rows (no ORM entity / identity map)
+BUSINESS_CARD_COLUMNS = [
+    Business.business_id,
+    Business.name,
+    Business.address,
+    Business.county,
+    Business.city,
+    cast(Business.latitude, Float).label("latitude"),
+    cast(Business.longitude, Float).label("longitude"),
+    cast(Business.avg_rating, Float).label("avg_rating"),
+    func.coalesce(Business.num_of_reviews, 0).label("num_of_reviews"),
+    Business.original_category,
+]
+BUSINESS_CARD_KEYS = [c.key for c in BUSINESS_CARD_COLUMNS]
 
 
 class BusinessRepository:
@@ -20,32 +55,26 @@ class BusinessRepository:
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_list(
+    def rating_sort_key(self):
+        """Sort expression of the list: avg_rating DESC, NULL ratings last (-1 < every rating)"""
+        return func.coalesce(Business.avg_rating, -1)
+
+    def _build_list_conditions(
         self,
-        field: Optional[str] = None,
+        field: Optional[List[str]] = None,
+        field_match: str = "any",
         county: Optional[str] = None,
         city: Optional[str] = None,
         min_rating: Optional[float] = None,
         max_rating: Optional[float] = None,
-        search: Optional[str] = None,
-        page: int = 1,
-        page_size: int = 20
-    ) -> Tuple[List[Business], int]:
-        """Get filtered list of businesses with pagination"""
-        
-        # Base query
-        query = select(Business).options(joinedload(Business.category))
-        count_query = select(func.count(Business.business_id))
-        
-        # Build conditions
+        search: Optional[str] = None
+    ) -> list:
         conditions = []
         
-        # Filter by field (category group)
+        # Filter by field (category group) - lọc trên BUSINESS.category_mask, không JOIN CATEGORY
         if field:
-            field_condition = self._get_field_condition(field)
+            field_condition = self._get_field_condition(field, match_all=(field_match == "all"))
             if field_condition is not None:
-                query = query.join(Category)
-                count_query = count_query.join(Category)
                 conditions.append(field_condition)
         
         # Filter by county
@@ -62,49 +91,204 @@ class BusinessRepository:
         if max_rating is not None:
             conditions.append(Business.avg_rating <= max_rating)
         
-        # Search by name
+        # Search: full-text (name/category/city) hoặc fuzzy trigram trên name (gõ sai chính tả)
         if search:
-            conditions.append(
-                Business.name.ilike(f"%{search}%")
+            conditions.append(self._search_condition(search))
+        
+        return conditions
+
+    @staticmethod
+    def _prefix_tsquery(search: str) -> Optional[str]:
+        """'pho hu' -> 'pho:* & hu:*' (prefix match, hợp với tìm kiếm khi đang gõ)"""
+        tokens = re.findall(r"\w+", search.lower())
+        return " & ".join(f"{t}:*" for t in tokens) or None
+
+    def _search_condition(self, search: str):
+        tsquery = self._prefix_tsquery(search)
+        fuzzy = Business.name.op("%")(search)
+        if tsquery is None:
+            return fuzzy
+        # OR giữa 2 điều kiện có GIN index riêng -> Postgres dùng BitmapOr, không seq scan
+        return or_(Business.search_vector.op("@@")(func.to_tsquery("simple", tsquery)), fuzzy)
+
+    def _search_order(self, search: str) -> list:
+        """Relevance: full-text match trước (theo ts_rank), sau đó kết quả fuzzy (theo similarity)"""
+        order = []
+        tsquery = self._prefix_tsquery(search)
+        if tsquery is not None:
+            query = func.to_tsquery("simple", tsquery)
+            order += [
+                Business.search_vector.op("@@")(query).desc(),
+                func.ts_rank(Business.search_vector, query).desc()
+            ]
+        order.append(func.similarity(Business.name, search).desc())
+        return order
+
+    async def get_list(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: Optional[Tuple[Decimal, int]] = None,
+        offset: Optional[int] = None,
+        **filters
+    ) -> Tuple[List[dict], Optional[tuple]]:
+        """
+        Get filtered list of businesses as card dicts (BUSINESS_CARD_COLUMNS, Core rows).
+        
+        Without search: ordered by avg_rating DESC (NULLs last), business_key DESC
+        - cursor given: seek pagination on (rating sort key, business_key), page is ignored
+        - otherwise: page-number mode (OFFSET), kept for backwards compatibility
+        
+        With search: ordered by relevance (ts_rank / trigram similarity). Rank is a float
+        so seeking on it is not exact; pagination uses an offset instead (offset overrides page).
+        
+        Two phases in one statement:
+            1. page: business_key + sort key only, filtered / ordered / limited
+               (served from the composite indexes, skipped OFFSET rows never touch the wide heap row)
+            2. hydrate: card columns for those page_size + 1 keys, in page order
+        
+        Returns (cards, next_key); next_key is (rating, business_key) or (offset,)
+        for search, None on the last page.
+        """
+        conditions = self._build_list_conditions(**filters)
+        sort_key = self.rating_sort_key()
+        search = filters.get("search")
+        
+        if search:
+            order_by = self._search_order(search) + [sort_key.desc(), Business.business_key.desc()]
+            offset = offset if offset is not None else (page - 1) * page_size
+        else:
+            order_by = [sort_key.desc(), Business.business_key.desc()]
+            if cursor is not None:
+                conditions.append(tuple_(sort_key, Business.business_key) < tuple_(*cursor))
+            else:
+                offset = (page - 1) * page_size
+        
+        # Phase 1: order BEFORE offset/limit; fetch 1 extra key to detect the next page
+        page_keys = (
+            select(
+                Business.business_key.label("page_key"),
+                sort_key.label("rating_sort"),
+                func.row_number().over(order_by=order_by).label("pos")
             )
+            .where(and_(*conditions))
+            .order_by(*order_by)
+            .limit(page_size + 1)
+        )
+        if offset:
+            page_keys = page_keys.offset(offset)
+        page_keys = page_keys.subquery("page_keys")
         
-        # Apply conditions
-        if conditions:
-            query = query.where(and_(*conditions))
-            count_query = count_query.where(and_(*conditions))
+        # Phase 2: hydrate only the page rows (PK lookups)
+        query = (
+            select(*BUSINESS_CARD_COLUMNS, page_keys.c.rating_sort, page_keys.c.page_key)
+            .join_from(page_keys, Business, Business.business_key == page_keys.c.page_key)
+            .order_by(page_keys.c.pos)
+        )
         
-        # Get total count
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        result = await self.db.execute(query)
+        rows = result.all()
         
-        # Apply pagination
-        offset = (page - 1) * page_size
-        query = query.offset(offset).limit(page_size)
+        next_key = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            if search:
+                next_key = ((offset or 0) + page_size,)
+            else:
+                next_key = (rows[-1].rating_sort, rows[-1].page_key)
         
-        # Order by rating desc
-        query = query.order_by(Business.avg_rating.desc().nullslast())
+        n = len(BUSINESS_CARD_KEYS)
+        return [dict(zip(BUSINESS_CARD_KEYS, row[:n])) for row in rows], next_key
+
+    async def get_cards_by_keys(self, business_keys: List[int]) -> Dict[int, dict]:
+        """Hydrate card dicts by key: {business_key: card} (keys missing from the table are absent)"""
+        if not business_keys:
+            return {}
+        result = await self.db.execute(
+            select(*BUSINESS_CARD_COLUMNS, Business.business_key)
+            .where(Business.business_key.in_(business_keys))
+        )
+        n = len(BUSINESS_CARD_KEYS)
+        return {row.business_key: dict(zip(BUSINESS_CARD_KEYS, row[:n])) for row in result.all()}
+
+    @staticmethod
+    def _earth_point(lat, lon):
+        """ll_to_earth(lat, lon) - phải khớp biểu thức của idx_business_earth"""
+        return func.ll_to_earth(lat, lon)
+
+    async def get_nearby(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: Optional[float] = None,
+        limit: int = 20,
+        **filters
+    ) -> List[Tuple[dict, float]]:
+        """
+        Fallback "near me" query (cube + earthdistance, GiST idx_business_earth).
+        - radius: earth_box prefilter (index) + exact earth_distance
+        - no radius: KNN ordering with the cube <-> operator
+        Returns (card dict, distance_km) ordered by distance.
+        """
+        conditions = self._build_list_conditions(**filters)
+        location = self._earth_point(
+            Business.latitude.cast(Float), Business.longitude.cast(Float)
+        )
+        center = self._earth_point(lat, lon)
+        distance_m = func.earth_distance(center, location)
         
-        # Execute
+        conditions += [Business.latitude.isnot(None), Business.longitude.isnot(None)]
+        if radius_km is not None:
+            radius_m = radius_km * 1000
+            conditions += [
+                func.earth_box(center, radius_m).op("@>")(location),
+                distance_m <= radius_m
+            ]
+            order_by = distance_m
+        else:
+            order_by = location.op("<->")(center)
+        
+        query = (
+            select(*BUSINESS_CARD_COLUMNS, distance_m.label("distance_m"))
+            .where(and_(*conditions))
+            .order_by(order_by)
+            .limit(limit)
+        )
         result = await self.db.execute(query)
-        businesses = result.scalars().unique().all()
-        
-        return list(businesses), total
-
-    def _get_field_condition(self, field: str):
-        """Map field name to category column condition"""
-        field_mapping = {
-            "food_dining": Category.food_dining == True,
-            "health_medical": Category.health_medical == True,
-            "automotive_transport": Category.automotive_transport == True,
-            "retail_shopping": Category.retail_shopping == True,
-            "beauty_wellness": Category.beauty_wellness == True,
-            "home_services_construction": Category.home_services_construction == True,
-            "education_community": Category.education_community == True,
-            "entertainment_travel": Category.entertainment_travel == True,
-            "industry_manufacturing": Category.industry_manufacturing == True,
-            "financial_legal_services": Category.financial_legal_services == True,
-        }
-        return field_mapping.get(field)
+        n = len(BUSINESS_CARD_KEYS)
+        return [(dict(zip(BUSINESS_CARD_KEYS, row[:n])), row.distance_m / 1000) for row in result.all()]
+
+    async def count_list(self, limit: Optional[int] = None, **filters) -> int:
+        """
+        Count businesses matching the filters.
+        limit: stop counting after `limit` rows (bounded cost for non-indexable filters like ILIKE search)
+        """
+        conditions = self._build_list_conditions(**filters)
+        
+        inner = select(Business.business_key).where(and_(*conditions))
+        if limit is not None:
+            inner = inner.limit(limit)
+        
+        result = await self.db.execute(select(func.count()).select_from(inner.subquery()))
+        return result.scalar() or 0
+
+    def _get_field_condition(self, fields: List[str], match_all: bool = False):
+        """
+        Map danh sách field sang điều kiện trên category_mask.
+
+        - match_all=False (OR): business thuộc ít nhất 1 nhóm
+        - match_all=True (AND): business thuộc tất cả các nhóm
+
+        Điều kiện bit được đổi thành danh sách giá trị mask thỏa mãn
+        (category_mask = ANY(:masks)) để dùng được idx_business_category_mask.
+        """
+        bits = category_bits(fields)
+        if not bits:
+            return None
+
+        return Business.category_mask == any_(
+            bindparam("category_masks", category_masks(bits, match_all), type_=ARRAY(Integer))
+        )
 
     async def get_distinct_counties(self) -> List[str]:
         """Get all distinct counties"""
@@ -1,13 +1,21 @@
 from supabase import Client
 from typing import Optional, Dict, Any
 from datetime import datetime
+from app.core.log_queue import LogQueue, log_queue
 
 
 class LogRepository:
-    """Repository for logging to Supabase"""
+    """
+    Repository for API / error / process logs.
     
-    def __init__(self, supabase: Client):
+    Methods only enqueue the row (no network I/O on the request path); the
+    background flusher in app/core/log_queue.py writes batches to the sink.
+    """
+    
+    def __init__(self, supabase: Optional[Client] = None, queue: Optional[LogQueue] = None):
+        # supabase: kept for existing callers, the Supabase sink owns its own client
         self.supabase = supabase
+        self.queue = queue or log_queue
 
     async def log_api_request(
         self,
@@ -19,21 +27,17 @@ class LogRepository:
         user_agent: Optional[str] = None,
         request_params: Optional[Dict[str, Any]] = None
     ) -> None:
-        """Log API request to Supabase"""
-        try:
-            self.supabase.table("api_request_log").insert({
-                "endpoint": endpoint,
-                "method": method,
-                "status_code": status_code,
-                "response_time_ms": response_time_ms,
-                "user_ip": user_ip,
-                "user_agent": user_agent,
-                "request_params": request_params,
-                "created_at": datetime.utcnow().isoformat()
-            }).execute()
-        except Exception as e:
-            # Don't break the app if logging fails
-            print(f"Failed to log API request: {e}")
+        """Queue an API request log row"""
+        self.queue.enqueue("api_request_log", {
+            "endpoint": endpoint,
+            "method": method,
+            "status_code": status_code,
+            "response_time_ms": response_time_ms,
+            "user_ip": user_ip,
+            "user_agent": user_agent,
+            "request_params": request_params,
+            "created_at": datetime.utcnow().isoformat()
+        })
 
     async def log_error(
         self,
@@ -42,17 +46,14 @@ class LogRepository:
         endpoint: Optional[str] = None,
         stack_trace: Optional[str] = None
     ) -> None:
-        """Log error to Supabase"""
-        try:
-            self.supabase.table("error_log").insert({
-                "error_type": error_type,
-                "error_message": error_message,
-                "endpoint": endpoint,
-                "stack_trace": stack_trace,
-                "created_at": datetime.utcnow().isoformat()
-            }).execute()
-        except Exception as e:
-            print(f"Failed to log error: {e}")
+        """Queue an error log row"""
+        self.queue.enqueue("error_log", {
+            "error_type": error_type,
+            "error_message": error_message,
+            "endpoint": endpoint,
+            "stack_trace": stack_trace,
+            "created_at": datetime.utcnow().isoformat()
+        })
 
     async def log_process(
         self,
@@ -60,13 +61,10 @@ class LogRepository:
         status: str,  # "started", "completed", "failed"
         details: Optional[Dict[str, Any]] = None
     ) -> None:
-        """Log background process to Supabase"""
-        try:
-            self.supabase.table("process_log").insert({
-                "process_name": process_name,
-                "status": status,
-                "details": details,
-                "created_at": datetime.utcnow().isoformat()
-            }).execute()
-        except Exception as e:
-            print(f"Failed to log process: {e}")
+        """Queue a background process log row"""
+        self.queue.enqueue("process_log", {
+            "process_name": process_name,
+            "status": status,
+            "details": details,
+            "created_at": datetime.utcnow().isoformat()
+        })
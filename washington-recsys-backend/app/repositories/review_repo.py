@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from typing import Optional, List, Tuple
-from app.models import Review
+from sqlalchemy import select, func, and_, tuple_, literal, cast, String
+from typing import Optional, List, Tuple, Dict
+from datetime import datetime
+from app.models import Business, Review, StatsTotal
+from app.repositories.business_repo import business_key_of, business_ids_param
 
 
 class ReviewRepository:
@@ -14,59 +16,108 @@ class ReviewRepository:
         business_id: str,
         page: int = 1,
         page_size: int = 20,
-        rating: Optional[int] = None
-    ) -> Tuple[List[Review], int]:
-        """Get reviews for a business with pagination and optional rating filter"""
+        rating: Optional[int] = None,
+        cursor: Optional[Tuple[datetime, int]] = None
+    ) -> Tuple[List[dict], Optional[Tuple[datetime, int]]]:
+        """
+        Get reviews for a business, newest first, with optional rating filter.
+        Rows are Core rows of the ReviewSchema columns (no ORM entity), returned as dicts.
+        
+        - cursor given: keyset pagination on (time, review_id), page is ignored
+        - otherwise: page-number mode (OFFSET), kept for backwards compatibility
+        
+        Returns (review dicts, next_key); next_key is the (time, review_id) of the
+        last row when more rows exist, else None.
+        """
         
         # Build conditions
-        conditions = [Review.business_id == business_id]
+        conditions = [Review.business_key == business_key_of(business_id)]
         
         if rating is not None:
             conditions.append(Review.rating == rating)
         
-        # Count query
-        count_query = (
-            select(func.count(Review.review_id))
-            .where(and_(*conditions))
-        )
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
+        if cursor is not None:
+            # Seek: rows strictly after the cursor in (time DESC, review_id DESC) order
+            conditions.append(tuple_(Review.time, Review.review_id) < tuple_(*cursor))
         
-        # Data query
-        offset = (page - 1) * page_size
+        # Fetch 1 extra row to know whether there is a next page (no COUNT needed)
         query = (
-            select(Review)
+            select(*self._list_columns(business_id))
             .where(and_(*conditions))
-            .order_by(Review.time.desc())
-            .offset(offset)
-            .limit(page_size)
+            .order_by(Review.time.desc(), Review.review_id.desc())
+            .limit(page_size + 1)
         )
+        if cursor is None:
+            query = query.offset((page - 1) * page_size)
+        
         result = await self.db.execute(query)
-        reviews = result.scalars().all()
+        rows = result.all()
+        
+        next_key = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_key = (rows[-1].time, int(rows[-1].review_id))
         
-        return list(reviews), total
+        return [dict(row._mapping) for row in rows], next_key
+
+    @staticmethod
+    def _list_columns(business_id: str) -> list:
+        """
+        ReviewSchema columns in schema order; business_id is the requested one (no per-row subquery).
+        review_id is cast to text like ReviewSchema serializes it (a BIGINT > 2^53 is not exact in JS).
+        """
+        return [
+            cast(Review.review_id, String).label("review_id"),
+            literal(business_id).label("business_id"),
+            Review.customer_id,
+            Review.time,
+            Review.rating,
+            Review.text,
+            Review.sentiment_score,
+            Review.sentiment_label,
+            func.coalesce(Review.has_response, False).label("has_response"),
+            Review.response_latency_hrs,
+        ]
+
+    async def get_total_count(self, business_id: str) -> int:
+        """Total reviews of a business from the precomputed STATS_TOTAL row"""
+        query = (
+            select(StatsTotal.total_reviews)
+            .where(StatsTotal.business_key == business_key_of(business_id))
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none() or 0
+
+    @staticmethod
+    def _histogram_columns() -> list:
+        return [StatsTotal.rating_5, StatsTotal.rating_4, StatsTotal.rating_3, StatsTotal.rating_2, StatsTotal.rating_1]
+
+    @staticmethod
+    def _to_distribution(row) -> List[dict]:
+        """Histogram của STATS_TOTAL -> đủ 5 rating levels, rating giảm dần (business chưa có stats -> toàn 0)"""
+        return [
+            {"rating": rating, "count": (getattr(row, f"rating_{rating}") or 0) if row is not None else 0}
+            for rating in (5, 4, 3, 2, 1)
+        ]
 
     async def get_rating_distribution(self, business_id: str) -> List[dict]:
-        """Get rating distribution for Review Summary bar chart"""
+        """Rating distribution for Review Summary bar chart (1 PK lookup on the precomputed STATS_TOTAL histogram)"""
         query = (
-            select(
-                Review.rating,
-                func.count(Review.review_id).label("count")
-            )
-            .where(Review.business_id == business_id)
-            .group_by(Review.rating)
-            .order_by(Review.rating.desc())
+            select(*self._histogram_columns())
+            .where(StatsTotal.business_key == business_key_of(business_id))
         )
         result = await self.db.execute(query)
-        rows = result.fetchall()
-        
-        # Đảm bảo có đủ 5 rating levels
-        distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        for row in rows:
-            if row.rating:
-                distribution[row.rating] = row.count
+        return self._to_distribution(result.one_or_none())
+
+    async def get_rating_distribution_many(self, business_ids: List[str]) -> Dict[str, List[dict]]:
+        """Rating distribution for many businesses in one query (same shape as get_rating_distribution)"""
+        query = (
+            select(Business.business_id, *self._histogram_columns())
+            .select_from(StatsTotal)
+            .join(Business, Business.business_key == StatsTotal.business_key)
+            .where(Business.business_id == business_ids_param(business_ids))
+        )
+        result = await self.db.execute(query)
+        rows = {row.business_id: row for row in result.fetchall()}
         
-        return [
-            {"rating": rating, "count": count}
-            for rating, count in sorted(distribution.items(), reverse=True)
-        ]
\ No newline at end of file
+        return {business_id: self._to_distribution(rows.get(business_id)) for business_id in business_ids}
@@ -1,7 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Optional, List
-from app.models import StatsTotal, StatsYearly, StatsMonthly
+from app.models import Business, StatsTotal, StatsYearly, StatsMonthly
+from app.repositories.business_repo import business_key_of, business_ids_param
 
 
 class StatsRepository:
@@ -12,16 +13,26 @@ class StatsRepository:
     # ============ STATS TOTAL ============
     async def get_total_stats(self, business_id: str) -> Optional[StatsTotal]:
         """Get total stats for a business"""
-        query = select(StatsTotal).where(StatsTotal.business_id == business_id)
+        query = select(StatsTotal).where(StatsTotal.business_key == business_key_of(business_id))
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_total_stats_many(self, business_ids: List[str]) -> List[StatsTotal]:
+        """Total stats for many businesses in one query (ids without stats are simply absent)"""
+        query = (
+            select(StatsTotal)
+            .join(Business, Business.business_key == StatsTotal.business_key)
+            .where(Business.business_id == business_ids_param(business_ids))
+        )
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
     # ============ STATS YEARLY ============
     async def get_yearly_stats(self, business_id: str) -> List[StatsYearly]:
         """Get yearly stats for a business (for line chart)"""
         query = (
             select(StatsYearly)
-            .where(StatsYearly.business_id == business_id)
+            .where(StatsYearly.business_key == business_key_of(business_id))
             .order_by(StatsYearly.year.asc())
         )
         result = await self.db.execute(query)
@@ -36,7 +47,7 @@ class StatsRepository:
         """Get monthly stats for a business (for line chart)"""
         query = (
             select(StatsMonthly)
-            .where(StatsMonthly.business_id == business_id)
+            .where(StatsMonthly.business_key == business_key_of(business_id))
         )
         
         if year:
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
+from app.schemas.stats import StatsTotalSchema
+from app.schemas.review import ReviewSummarySchema
 
 
 class CategorySchema(BaseModel):
@@ -29,6 +31,9 @@ class BusinessCardSchema(BaseModel):
     avg_rating: Optional[float] = None
     num_of_reviews: int = 0
     original_category: Optional[str] = None
+    # Only filled with ?include_stats=true (saves 2 calls per card)
+    stats: Optional[StatsTotalSchema] = None
+    review_summary: Optional[ReviewSummarySchema] = None
 
     class Config:
         from_attributes = True
@@ -36,11 +41,24 @@ class BusinessCardSchema(BaseModel):
 
 class BusinessListResponse(BaseModel):
     total: int
-    page: int
+    total_is_estimate: bool = False  # True when total was capped (name search over many rows)
+    page: Optional[int] = None  # None in cursor mode
     page_size: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to get the next page; None on the last page
     data: List[BusinessCardSchema]
 
 
+class NearbyBusinessSchema(BusinessCardSchema):
+    distance_km: float
+
+
+class NearbyListResponse(BaseModel):
+    latitude: float
+    longitude: float
+    radius_km: Optional[float] = None  # None = k-nearest mode
+    data: List[NearbyBusinessSchema]   # Ordered by distance
+
+
 class BusinessDetailSchema(BaseModel):
     business_id: str
     name: Optional[str] = None
@@ -26,6 +26,15 @@ class FilterOptionsSchema(BaseModel):
     ratings: List[int]     # [1, 2, 3, 4, 5]
 
 
+# ============ AUTOCOMPLETE ============
+class AutocompleteItem(BaseModel):
+    """1 gợi ý cho search box"""
+    kind: str                           # business | category | city | county
+    label: str
+    weight: int                         # num_of_reviews (tổng cho category / city / county)
+    business_id: Optional[str] = None   # Chỉ có với kind = business
+
+
 # ============ FILTER REQUEST ============
 class BusinessFilterParams(BaseModel):
     """Query params cho filter businesses"""
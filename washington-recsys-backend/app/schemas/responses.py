@@ -1,6 +1,9 @@
 from pydantic import BaseModel
 from typing import List, Optional, Any
 from datetime import date
+from app.schemas.business import BusinessDetailSchema
+from app.schemas.stats import StatsTotalSchema, StatsYearlyResponse, StatsMonthlyResponse
+from app.schemas.review import ReviewSummarySchema, ReviewListResponse
 
 # --- Shared Schemas ---
 class BusinessSummary(BaseModel):
@@ -35,7 +38,10 @@ class ReviewSchema(BaseModel):
     sentiment_label: str | None
 
 class BusinessDetailResponse(BaseModel):
-    info: BusinessSummary
-    stats_total: dict | None # Chứa positive_pct, avg_sentiment, etc.
-    monthly_trends: List[StatsMonthlySchema]
-    recent_reviews: List[ReviewSchema]
\ No newline at end of file
+    """Dashboard của trang chi tiết business (GET /businesses/{id}/dashboard) - 1 payload thay cho 6 request"""
+    info: BusinessDetailSchema
+    stats_total: StatsTotalSchema            # Chứa positive_pct, avg_sentiment, etc.
+    yearly_trends: StatsYearlyResponse
+    monthly_trends: StatsMonthlyResponse
+    review_summary: ReviewSummarySchema      # Rating distribution 1-5
+    recent_reviews: ReviewListResponse       # Trang review đầu tiên (next_cursor để xem tiếp)
\ No newline at end of file
@@ -1,11 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_serializer
 from typing import Optional, List
 from decimal import Decimal
 from datetime import datetime, date
 
 
 class ReviewSchema(BaseModel):
-    review_id: str
+    review_id: int  # BIGINT in the DB; sent as a string so JS clients never round it (> 2^53)
     business_id: str
     customer_id: str
     time: Optional[datetime] = None
@@ -19,6 +19,10 @@ class ReviewSchema(BaseModel):
     class Config:
         from_attributes = True
 
+    @field_serializer("review_id")
+    def serialize_review_id(self, review_id: int) -> str:
+        return str(review_id)
+
 
 # ============ REVIEW SUMMARY (Bar Chart) ============
 class RatingSummaryItem(BaseModel):
@@ -34,9 +38,14 @@ class ReviewSummarySchema(BaseModel):
     rating_distribution: List[RatingSummaryItem]  # 5 items cho rating 1-5
 
 
+class ReviewSummaryBatchResponse(BaseModel):
+    data: List[ReviewSummarySchema]  # Same order as the requested business_ids
+
+
 # ============ REVIEW LIST ============
 class ReviewListResponse(BaseModel):
     total: int
-    page: int
+    page: Optional[int] = None  # None in cursor mode
     page_size: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to get the next page; None on the last page
     data: List[ReviewSchema]
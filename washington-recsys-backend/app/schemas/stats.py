@@ -15,6 +15,15 @@ class StatsTotalSchema(BaseModel):
     neutral_pct: Optional[Decimal] = None
     negative_pct: Optional[Decimal] = None
     avg_sentiment: Optional[Decimal] = None
+    rating_1: int = 0
+    rating_2: int = 0
+    rating_3: int = 0
+    rating_4: int = 0
+    rating_5: int = 0
+    response_count: int = 0
+    response_rate: Optional[Decimal] = None
+    avg_response_latency_hrs: Optional[Decimal] = None
+    median_response_latency_hrs: Optional[Decimal] = None
     first_review_date: Optional[date] = None
     last_review_date: Optional[date] = None
 
@@ -22,6 +31,10 @@ class StatsTotalSchema(BaseModel):
         from_attributes = True
 
 
+class StatsTotalBatchResponse(BaseModel):
+    data: List[StatsTotalSchema]  # Same order as the requested business_ids
+
+
 # ============ STATS YEARLY (Yearly Analysis Line Chart) ============
 class StatsYearlyItem(BaseModel):
     year: int
@@ -30,6 +43,15 @@ class StatsYearlyItem(BaseModel):
     neutral_count: int = 0
     negative_count: int = 0
     avg_sentiment: Optional[Decimal] = None
+    rating_1: int = 0
+    rating_2: int = 0
+    rating_3: int = 0
+    rating_4: int = 0
+    rating_5: int = 0
+    response_count: int = 0
+    response_rate: Optional[Decimal] = None
+    avg_response_latency_hrs: Optional[Decimal] = None
+    median_response_latency_hrs: Optional[Decimal] = None
 
     class Config:
         from_attributes = True
@@ -49,6 +71,15 @@ class StatsMonthlyItem(BaseModel):
     neutral_count: int = 0
     negative_count: int = 0
     avg_sentiment: Optional[Decimal] = None
+    rating_1: int = 0
+    rating_2: int = 0
+    rating_3: int = 0
+    rating_4: int = 0
+    rating_5: int = 0
+    response_count: int = 0
+    response_rate: Optional[Decimal] = None
+    avg_response_latency_hrs: Optional[Decimal] = None
+    median_response_latency_hrs: Optional[Decimal] = None
 
     class Config:
         from_attributes = True
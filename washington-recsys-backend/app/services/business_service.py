@@ -1,68 +1,205 @@
+import json
+from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Optional, List, Tuple
 from app.repositories import BusinessRepository
 from app.schemas import (
-    BusinessCardSchema,
     BusinessListResponse,
     BusinessDetailSchema
 )
+from app.schemas.business import NearbyBusinessSchema, NearbyListResponse
+from app.services.stats_service import StatsService
+from app.services.review_service import ReviewService
 from app.core.exceptions import NotFoundException
+from app.core.geo import geo_snapshot
+from app.core.catalog import catalog_snapshot
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor, InvalidCursorError
+
+# Max rows counted for search totals (beyond that the total is reported as an estimate)
+BUSINESS_COUNT_CAP = getattr(settings, "BUSINESS_COUNT_CAP", 1000)
 
 
 class BusinessService:
     
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repo = BusinessRepository(db)
 
-    async def get_business_list(
+    async def get_business_list(self, **kwargs) -> BusinessListResponse:
+        """Validated model of get_business_list_payload (for Python callers)"""
+        return BusinessListResponse.model_validate(await self.get_business_list_payload(**kwargs))
+
+    async def get_business_list_payload(
         self,
-        field: Optional[str] = None,
+        field: Optional[List[str]] = None,
+        field_match: str = "any",
         county: Optional[str] = None,
         city: Optional[str] = None,
         min_rating: Optional[float] = None,
         max_rating: Optional[float] = None,
         search: Optional[str] = None,
         page: int = 1,
-        page_size: int = 20
-    ) -> BusinessListResponse:
-        """Get filtered list of businesses"""
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        include_stats: bool = False
+    ) -> dict:
+        """
+        Get filtered list of businesses (page or cursor mode) as a plain dict in the
+        BusinessListResponse shape; rows come straight from the DB, no per-row validation.
+        """
         
-        businesses, total = await self.repo.get_list(
-            field=field,
+        filters = dict(
+            field=sorted(field) if field else None,
+            field_match=field_match,
             county=county,
             city=city,
             min_rating=min_rating,
             max_rating=max_rating,
-            search=search,
-            page=page,
-            page_size=page_size
+            search=search
         )
         
-        # Convert to schema
-        cards = [
-            BusinessCardSchema(
-                business_id=b.business_id,
-                name=b.name,
-                address=b.address,
-                county=b.county,
-                city=b.city,
-                avg_rating=b.avg_rating,
-                num_of_reviews=b.num_of_reviews or 0,
-                original_category=b.original_category
+        seek_key, offset = self._decode_cursor(cursor) if cursor else (None, None)
+        # Only a catalog of the current data version (the one in the ETag); else Postgres
+        catalog = await catalog_snapshot.current()
+        
+        if catalog is not None and not search:
+            # Filter + order + total in memory; Postgres only hydrates the page rows
+            keys, next_key, total = catalog.page(
+                page=page,
+                page_size=page_size,
+                cursor=seek_key,
+                **{k: v for k, v in filters.items() if k != "search"}
+            )
+            by_key = await self.repo.get_cards_by_keys(keys)
+            cards = [by_key[k] for k in keys if k in by_key]
+            total_is_estimate = False
+        else:
+            cards, next_key = await self.repo.get_list(
+                page=page,
+                page_size=page_size,
+                cursor=seek_key,
+                offset=offset,
+                **filters
+            )
+            total, total_is_estimate = await self._count(filters)
+        
+        for card in cards:
+            card["stats"] = None
+            card["review_summary"] = None
+        if include_stats and cards:
+            await self._attach_stats(cards)
+        
+        return {
+            "total": total,
+            "total_is_estimate": total_is_estimate,
+            "page": None if cursor else page,
+            "page_size": page_size,
+            "next_cursor": self._encode_cursor(next_key) if next_key else None,
+            "data": cards
+        }
+
+    async def _attach_stats(self, cards: List[dict]) -> None:
+        """Embed total stats + review summary: 2 batch queries for the page (cached per business)"""
+        business_ids = [card["business_id"] for card in cards]
+        stats = await StatsService(self.db).get_total_stats_many(business_ids)
+        summaries = await ReviewService(self.db).get_review_summaries(business_ids)
+        for card in cards:
+            card["stats"] = stats[card["business_id"]].model_dump(mode="json")
+            card["review_summary"] = summaries[card["business_id"]].model_dump(mode="json")
+
+    async def _count(self, filters: dict) -> Tuple[int, bool]:
+        """
+        Total for a filter combination, cached per data version.
+        Search totals (full-text + fuzzy) are counted only up to BUSINESS_COUNT_CAP rows.
+        """
+        limit = BUSINESS_COUNT_CAP if filters.get("search") else None
+        key = json.dumps(filters, sort_keys=True, default=str)
+        
+        total = await response_cache.get_or_load_value(
+            "business_count", key,
+            lambda: self.repo.count_list(limit=limit, **filters)
+        )
+        return total, limit is not None and total >= limit
+
+    @staticmethod
+    def _encode_cursor(next_key: tuple) -> str:
+        if len(next_key) == 1:
+            # Search (relevance order): offset cursor
+            return encode_cursor("offset", next_key[0])
+        return encode_cursor(str(next_key[0]), next_key[1])
+
+    @staticmethod
+    def _decode_cursor(token: str) -> Tuple[Optional[Tuple[Decimal, int]], Optional[int]]:
+        """Return (seek_key, offset): one of them is set depending on the cursor kind"""
+        values = decode_cursor(token)
+        try:
+            first, second = values
+            if first == "offset":
+                return None, max(int(second), 0)
+            return (Decimal(first), int(second)), None
+        except (ValueError, TypeError, ArithmeticError) as e:
+            raise InvalidCursorError(f"Invalid cursor: {token}") from e
+
+    async def get_nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: Optional[float] = None,
+        limit: int = 20,
+        field: Optional[List[str]] = None,
+        field_match: str = "any",
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None
+    ) -> NearbyListResponse:
+        """
+        Businesses near a point (within radius_km, or the `limit` nearest).
+        Uses the in-memory geo index; Postgres (earthdistance) while it is not built for the current data version.
+        Either way Postgres is hit once for the page of `limit` rows.
+        """
+        index = await geo_snapshot.current()
+        if index is not None:
+            keys, distances = index.nearby(
+                latitude, longitude,
+                radius_km=radius_km,
+                limit=limit,
+                fields=field,
+                match_all=(field_match == "all"),
+                min_rating=min_rating,
+                max_rating=max_rating
+            )
+            cards = await self.repo.get_cards_by_keys(keys)
+            rows = [(cards[k], d) for k, d in zip(keys, distances) if k in cards]
+        else:
+            rows = await self.repo.get_nearby(
+                latitude, longitude,
+                radius_km=radius_km,
+                limit=limit,
+                field=field,
+                field_match=field_match,
+                min_rating=min_rating,
+                max_rating=max_rating
             )
-            for b in businesses
-        ]
         
-        return BusinessListResponse(
-            total=total,
-            page=page,
-            page_size=page_size,
-            data=cards
+        return NearbyListResponse(
+            latitude=latitude,
+            longitude=longitude,
+            radius_km=radius_km,
+            data=[
+                NearbyBusinessSchema(**card, distance_km=round(distance, 3))
+                for card, distance in rows
+            ]
         )
 
     async def get_business_detail(self, business_id: str) -> BusinessDetailSchema:
         """Get business detail by ID"""
-        
+        return await response_cache.get_or_load(
+            "business_detail", business_id, BusinessDetailSchema,
+            lambda: self._load_business_detail(business_id)
+        )
+
+    async def _load_business_detail(self, business_id: str) -> BusinessDetailSchema:
         business = await self.repo.get_by_id(business_id)
         
         if not business:
@@ -0,0 +1,79 @@
+import asyncio
+from typing import Awaitable, Callable, List, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.local_db import AsyncSessionLocal
+from app.schemas.responses import BusinessDetailResponse
+from app.services.business_service import BusinessService
+from app.services.stats_service import StatsService
+from app.services.review_service import ReviewService
+
+T = TypeVar("T")
+
+# Max parts of one dashboard request holding a pooled connection at the same time
+# (pool_size=10 + max_overflow=20 is shared by all requests)
+DASHBOARD_MAX_CONCURRENCY = getattr(settings, "DASHBOARD_MAX_CONCURRENCY", 3)
+
+
+async def _in_own_session(
+    work: Callable[[AsyncSession], Awaitable[T]],
+    limit: asyncio.Semaphore
+) -> T:
+    """
+    Run one part of the dashboard on its own pooled session.
+    An AsyncSession cannot run 2 queries at once, so concurrent parts must not share one.
+    A connection is only checked out on the first query, cache hits never take one.
+    """
+    async with limit:
+        async with AsyncSessionLocal() as session:
+            return await work(session)
+
+
+async def _gather_or_cancel(*parts: Awaitable) -> List:
+    """
+    asyncio.gather, but the first failure cancels the other parts (and waits for them,
+    so their sessions go back to the pool) before re-raising the original exception.
+    """
+    tasks = [asyncio.ensure_future(part) for part in parts]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class DashboardService:
+    """Business detail page in one call: detail first, then the other 5 parts concurrently"""
+
+    async def get_business_dashboard(
+        self,
+        business_id: str,
+        review_page_size: int = 20
+    ) -> BusinessDetailResponse:
+        limit = asyncio.Semaphore(DASHBOARD_MAX_CONCURRENCY)
+
+        # Cached detail lookup first: an unknown id raises NotFoundException (-> 404)
+        # before the other parts take any connection
+        info = await _in_own_session(lambda db: BusinessService(db).get_business_detail(business_id), limit)
+
+        stats_total, yearly, monthly, summary, reviews = await _gather_or_cancel(
+            _in_own_session(lambda db: StatsService(db).get_total_stats(business_id), limit),
+            _in_own_session(lambda db: StatsService(db).get_yearly_stats(business_id), limit),
+            _in_own_session(lambda db: StatsService(db).get_monthly_stats(business_id), limit),
+            _in_own_session(lambda db: ReviewService(db).get_review_summary(business_id), limit),
+            _in_own_session(
+                lambda db: ReviewService(db).get_reviews_by_business(business_id, page_size=review_page_size),
+                limit
+            )
+        )
+
+        return BusinessDetailResponse(
+            info=info,
+            stats_total=stats_total,
+            yearly_trends=yearly,
+            monthly_trends=monthly,
+            review_summary=summary,
+            recent_reviews=reviews
+        )
@@ -2,6 +2,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from app.repositories import BusinessRepository
 from app.schemas import FilterOptionsSchema, FieldOption
+from app.schemas.filter import AutocompleteItem
+from app.core.autocomplete import autocomplete_snapshot
 
 
 class FilterService:
@@ -19,10 +21,10 @@ class FilterService:
         fields = [field.value for field in FieldOption]
         
         # Get counties
-        counties = await self.repo.get_distinct_counties()
+        counties = await self.get_counties()
         
         # Get cities (filtered by county if provided)
-        cities = await self.repo.get_distinct_cities(county)
+        cities = await self.get_cities_by_county(county) if county else await self.get_cities()
         
         # Rating options (static)
         ratings = [1, 2, 3, 4, 5]
@@ -34,6 +36,42 @@ class FilterService:
             ratings=ratings
         )
 
+    # Counties / cities come from the in-memory autocomplete snapshot; DB while it is not current
+
+    async def get_counties(self) -> List[str]:
+        index = await autocomplete_snapshot.current()
+        if index is not None:
+            return index.counties
+        return await self.repo.get_distinct_counties()
+
+    async def get_cities(self) -> List[str]:
+        index = await autocomplete_snapshot.current()
+        if index is not None:
+            return index.cities
+        return await self.repo.get_distinct_cities()
+
     async def get_cities_by_county(self, county: str) -> List[str]:
         """Get cities for a specific county (for cascading dropdown)"""
+        index = await autocomplete_snapshot.current()
+        if index is not None:
+            return index.cities_by_county.get(county, [])
         return await self.repo.get_distinct_cities(county)
+
+
+async def autocomplete(
+    q: str,
+    limit: int = 10,
+    kinds: Optional[List[str]] = None
+) -> Optional[List[AutocompleteItem]]:
+    """
+    Prefix suggestions ranked by num_of_reviews (in-memory, no DB).
+    None while the autocomplete snapshot is not built for the current data version
+    (startup, failed build, or a rebuild in progress after a load).
+    """
+    index = await autocomplete_snapshot.current()
+    if index is None:
+        return None
+    return [
+        AutocompleteItem(kind=s.kind, label=s.label, weight=s.weight, business_id=s.business_id)
+        for s in index.search(q, limit=limit, kinds=set(kinds) if kinds else None)
+    ]
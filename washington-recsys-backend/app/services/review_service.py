@@ -1,12 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Optional, List, Dict
 from app.repositories import ReviewRepository
 from app.schemas import (
-    ReviewSchema,
     ReviewListResponse,
     ReviewSummarySchema,
     RatingSummaryItem
 )
+from app.core.cache import response_cache
+from app.core.pagination import encode_cursor, decode_time_id_cursor
 
 
 class ReviewService:
@@ -14,34 +15,75 @@ class ReviewService:
     def __init__(self, db: AsyncSession):
         self.repo = ReviewRepository(db)
 
-    async def get_reviews_by_business(
+    async def get_reviews_by_business(self, business_id: str, **kwargs) -> ReviewListResponse:
+        """Validated model of get_reviews_payload (for Python callers, e.g. the dashboard)"""
+        return ReviewListResponse.model_validate(await self.get_reviews_payload(business_id, **kwargs))
+
+    async def get_reviews_payload(
         self,
         business_id: str,
         page: int = 1,
         page_size: int = 20,
-        rating: Optional[int] = None
-    ) -> ReviewListResponse:
-        """Get reviews for a business with optional rating filter"""
+        rating: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Get reviews for a business with optional rating filter (page or cursor mode) as a
+        plain dict in the ReviewListResponse shape; rows come straight from the DB.
+        """
         
-        reviews, total = await self.repo.get_by_business_id(
+        reviews, next_key = await self.repo.get_by_business_id(
             business_id=business_id,
             page=page,
             page_size=page_size,
-            rating=rating
+            rating=rating,
+            cursor=decode_time_id_cursor(cursor) if cursor else None
         )
         
-        return ReviewListResponse(
-            total=total,
-            page=page,
-            page_size=page_size,
-            data=[ReviewSchema.model_validate(r) for r in reviews]
+        return {
+            "total": await self._get_total(business_id, rating),
+            "page": None if cursor else page,
+            "page_size": page_size,
+            "next_cursor": encode_cursor(*next_key) if next_key else None,
+            "data": reviews
+        }
+
+    async def _get_total(self, business_id: str, rating: Optional[int]) -> int:
+        """Totals come from precomputed / cached counts, not a COUNT(*) per page"""
+        if rating is None:
+            return await self.repo.get_total_count(business_id)
+        
+        summary = await self.get_review_summary(business_id)
+        return next(
+            (item.count for item in summary.rating_distribution if item.rating == rating), 0
         )
 
     async def get_review_summary(self, business_id: str) -> ReviewSummarySchema:
         """Get review summary (rating distribution) for bar chart"""
-        
+        return await response_cache.get_or_load(
+            "review_summary", business_id, ReviewSummarySchema,
+            lambda: self._load_review_summary(business_id)
+        )
+
+    async def _load_review_summary(self, business_id: str) -> ReviewSummarySchema:
         distribution = await self.repo.get_rating_distribution(business_id)
-        
+        return self._to_summary(business_id, distribution)
+
+    async def get_review_summaries(self, business_ids: List[str]) -> Dict[str, ReviewSummarySchema]:
+        """Review summaries for many businesses: cached ones from the cache, the rest in 1 query"""
+        return await response_cache.get_or_load_many(
+            "review_summary", business_ids, ReviewSummarySchema, self._load_review_summaries
+        )
+
+    async def _load_review_summaries(self, business_ids: List[str]) -> Dict[str, ReviewSummarySchema]:
+        distributions = await self.repo.get_rating_distribution_many(business_ids)
+        return {
+            business_id: self._to_summary(business_id, distribution)
+            for business_id, distribution in distributions.items()
+        }
+
+    @staticmethod
+    def _to_summary(business_id: str, distribution: List[dict]) -> ReviewSummarySchema:
         total = sum(item["count"] for item in distribution)
         
         return ReviewSummarySchema(
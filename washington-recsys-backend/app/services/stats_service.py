@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Optional, List, Dict
 from app.repositories import StatsRepository
 from app.schemas import (
     StatsTotalSchema,
@@ -9,6 +9,7 @@ from app.schemas import (
     StatsMonthlyItem
 )
 from app.core.exceptions import NotFoundException
+from app.core.cache import response_cache
 
 
 class StatsService:
@@ -18,7 +19,12 @@ class StatsService:
 
     async def get_total_stats(self, business_id: str) -> StatsTotalSchema:
         """Get total stats for Total Analysis chart"""
-        
+        return await response_cache.get_or_load(
+            "stats_total", business_id, StatsTotalSchema,
+            lambda: self._load_total_stats(business_id)
+        )
+
+    async def _load_total_stats(self, business_id: str) -> StatsTotalSchema:
         stats = await self.repo.get_total_stats(business_id)
         
         if not stats:
@@ -27,9 +33,31 @@ class StatsService:
         
         return StatsTotalSchema.model_validate(stats)
 
+    async def get_total_stats_many(self, business_ids: List[str]) -> Dict[str, StatsTotalSchema]:
+        """Total stats for many businesses: cached ones from the cache, the rest in 1 query"""
+        return await response_cache.get_or_load_many(
+            "stats_total", business_ids, StatsTotalSchema, self._load_total_stats_many
+        )
+
+    async def _load_total_stats_many(self, business_ids: List[str]) -> Dict[str, StatsTotalSchema]:
+        found = {
+            s.business_id: StatsTotalSchema.model_validate(s)
+            for s in await self.repo.get_total_stats_many(business_ids)
+        }
+        # Empty stats for businesses without a STATS_TOTAL row (same as the single endpoint)
+        return {
+            business_id: found.get(business_id) or StatsTotalSchema(business_id=business_id)
+            for business_id in business_ids
+        }
+
     async def get_yearly_stats(self, business_id: str) -> StatsYearlyResponse:
         """Get yearly stats for Yearly Analysis line chart"""
-        
+        return await response_cache.get_or_load(
+            "stats_yearly", business_id, StatsYearlyResponse,
+            lambda: self._load_yearly_stats(business_id)
+        )
+
+    async def _load_yearly_stats(self, business_id: str) -> StatsYearlyResponse:
         stats_list = await self.repo.get_yearly_stats(business_id)
         
         return StatsYearlyResponse(
@@ -43,7 +71,16 @@ class StatsService:
         year: Optional[int] = None
     ) -> StatsMonthlyResponse:
         """Get monthly stats for Monthly Analysis line chart"""
-        
+        return await response_cache.get_or_load(
+            "stats_monthly", f"{business_id}:{year or 'all'}", StatsMonthlyResponse,
+            lambda: self._load_monthly_stats(business_id, year)
+        )
+
+    async def _load_monthly_stats(
+        self, 
+        business_id: str,
+        year: Optional[int] = None
+    ) -> StatsMonthlyResponse:
         stats_list = await self.repo.get_monthly_stats(business_id, year)
         
         return StatsMonthlyResponse(
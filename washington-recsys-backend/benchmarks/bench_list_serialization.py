@@ -0,0 +1,139 @@
+"""
+CPU per request of the list serialization, before / after the fast path.
+
+    before: entity per row -> Schema.model_validate (from_attributes) -> response model
+            -> FastAPI response_model handling (dump, re-validate, dump json) -> json.dumps
+    after:  dict per Core row -> orjson.dumps (app/core/serialization.py)
+
+No database: rows are synthetic, so only the Python side of the request is measured.
+
+    cd washington-recsys-backend
+    python benchmarks/bench_list_serialization.py --rows 100 --iterations 500
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core.serialization import dumps  # noqa: E402
+from app.schemas.business import BusinessCardSchema, BusinessListResponse  # noqa: E402
+from app.schemas.review import ReviewSchema, ReviewListResponse  # noqa: E402
+
+
+def make_review_rows(n: int) -> list:
+    start = datetime(2021, 6, 1, 12, 0, 0)
+    return [
+        {
+            "review_id": str(1_234_567_890_123_456_789 + i),  # cast(review_id, String) in the Core query
+            "business_id": "0x54906ab1b9d4e5b9:0x6e4b1ce0f94aa7ee",
+            "customer_id": f"1{random.randrange(10**20):020d}",
+            "time": start - timedelta(hours=7 * i),
+            "rating": random.randint(1, 5),
+            "text": " ".join(random.choice(["great", "food", "slow", "service", "nice", "staff"]) for _ in range(60)),
+            "sentiment_score": Decimal(f"{random.uniform(-1, 1):.4f}"),
+            "sentiment_label": random.choice(["positive", "neutral", "negative"]),
+            "has_response": random.random() < 0.3,
+            "response_latency_hrs": Decimal(f"{random.uniform(0, 200):.2f}"),
+        }
+        for i in range(n)
+    ]
+
+
+def make_business_rows(n: int) -> list:
+    return [
+        {
+            "business_id": f"0x{random.getrandbits(64):016x}:0x{random.getrandbits(64):016x}",
+            "name": f"Business {i}",
+            "address": f"{i} Pine St, Seattle, WA 98101",
+            "county": "King",
+            "city": "Seattle",
+            "latitude": 47.6 + random.random() / 10,
+            "longitude": -122.3 - random.random() / 10,
+            "avg_rating": round(random.uniform(1, 5), 1),
+            "num_of_reviews": random.randint(0, 5000),
+            "original_category": "Restaurant, Vietnamese restaurant",
+        }
+        for i in range(n)
+    ]
+
+
+def fastapi_response_model(model, response_model) -> bytes:
+    """What FastAPI does with a returned model and response_model=... (pydantic v2)"""
+    adapter = TypeAdapter(response_model)
+    content = model.model_dump(by_alias=True)
+    validated = adapter.validate_python(content)
+    jsonable = adapter.dump_python(validated, mode="json", by_alias=True)
+    return json.dumps(jsonable, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def reviews_before(rows: list) -> bytes:
+    entities = [SimpleNamespace(**row) for row in rows]  # stands in for ORM entities
+    model = ReviewListResponse(
+        total=12345, page=None, page_size=len(rows), next_cursor="abc",
+        data=[ReviewSchema.model_validate(e) for e in entities]
+    )
+    return fastapi_response_model(model, ReviewListResponse)
+
+
+def reviews_after(rows: list) -> bytes:
+    data = [dict(row) for row in rows]  # Core rows -> dict(row._mapping)
+    return dumps({"total": 12345, "page": None, "page_size": len(rows), "next_cursor": "abc", "data": data})
+
+
+def businesses_before(rows: list) -> bytes:
+    entities = [SimpleNamespace(**row) for row in rows]
+    model = BusinessListResponse(
+        total=54321, total_is_estimate=False, page=None, page_size=len(rows), next_cursor="abc",
+        data=[BusinessCardSchema(**vars(e)) for e in entities]
+    )
+    return fastapi_response_model(model, BusinessListResponse)
+
+
+def businesses_after(rows: list) -> bytes:
+    data = [dict(row, stats=None, review_summary=None) for row in rows]
+    return dumps({
+        "total": 54321, "total_is_estimate": False, "page": None,
+        "page_size": len(rows), "next_cursor": "abc", "data": data
+    })
+
+
+def cpu_per_call_ms(fn, rows, iterations: int) -> float:
+    fn(rows)  # warm-up
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(rows)
+    return (time.process_time() - start) * 1000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    random.seed(42)
+
+    cases = [
+        ("reviews", make_review_rows(args.rows), reviews_before, reviews_after),
+        ("businesses", make_business_rows(args.rows), businesses_before, businesses_after),
+    ]
+    print(f"{args.rows} rows/page, {args.iterations} iterations, CPU ms per request")
+    for name, rows, before, after in cases:
+        # Same JSON document either way
+        assert json.loads(before(rows)) == json.loads(after(rows)), name
+        t_before = cpu_per_call_ms(before, rows, args.iterations)
+        t_after = cpu_per_call_ms(after, rows, args.iterations)
+        print(f"  {name:<11} before {t_before:7.3f} ms   after {t_after:7.3f} ms   x{t_before / t_after:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from app.core import autocomplete
+from app.core.autocomplete import PrefixIndex, Suggestion, normalize
+
+
+def make_index(entries):
+    """entries: (kind, label, weight); names get every word start as a key, like build_prefix_index"""
+    suggestions, keys = [], []
+    for kind, label, weight in entries:
+        idx = len(suggestions)
+        suggestions.append(Suggestion(kind, label, weight))
+        words = normalize(label).split()
+        starts = range(min(len(words), autocomplete.NAME_MAX_WORD_STARTS)) if kind == "business" else [0]
+        for start in starts:
+            keys.append((" ".join(words[start:]), idx))
+    return PrefixIndex(suggestions, keys)
+
+
+def brute_force(entries, query, limit, kinds=None):
+    prefix = normalize(query)
+    matches = []
+    for kind, label, weight in entries:
+        if kinds and kind not in kinds:
+            continue
+        words = normalize(label).split()
+        starts = range(min(len(words), autocomplete.NAME_MAX_WORD_STARTS)) if kind == "business" else [0]
+        if any(" ".join(words[i:]).startswith(prefix) for i in starts):
+            matches.append((weight, label))
+    return [label for _, label in sorted(matches, reverse=True)[:limit]]
+
+
+@pytest.fixture
+def small_scan(monkeypatch):
+    # Force the precomputed-top path on small data
+    monkeypatch.setattr(autocomplete, "MAX_SCAN", 5)
+
+
+def test_normalize_strips_accents_and_spaces():
+    assert normalize("  Phở   Hùng ") == "pho hung"
+    assert normalize("Đà Nẵng") == "da nang"
+
+
+def test_word_start_match():
+    index = make_index([("business", "Pho Hung", 10)])
+    assert [s.label for s in index.search("hung")] == ["Pho Hung"]
+
+
+def test_kind_filter_not_crowded_out_on_wide_prefix(small_scan):
+    # Category / place weights are sums and outrank every business
+    entries = [("category", f"Store {i}", 100_000 + i) for i in range(60)]
+    entries += [("city", f"Seattle {i}", 50_000 + i) for i in range(60)]
+    entries += [("business", f"Sbux {i}", i + 1) for i in range(20)]
+    index = make_index(entries)
+
+    result = index.search("s", limit=10, kinds={"business"})
+    assert [s.label for s in result] == brute_force(entries, "s", 10, {"business"})
+    assert len(result) == 10
+
+
+def test_heavy_name_late_in_wide_range_is_ranked(small_scan):
+    entries = [("business", f"Cafe A{i:03d}", i + 1) for i in range(100)]
+    entries.append(("business", "Cafe Zzz", 1_000_000))  # sorts last in the "cafe" range
+    index = make_index(entries)
+
+    assert index.search("cafe", limit=1)[0].label == "Cafe Zzz"
+
+
+@pytest.mark.parametrize("max_scan", [1, 7, 10_000])
+def test_matches_brute_force(monkeypatch, max_scan):
+    monkeypatch.setattr(autocomplete, "MAX_SCAN", max_scan)
+    rng = random.Random(7)
+    words = ["pho", "phở", "bakery", "bar", "ba", "seattle", "sea", "salon", "auto", "a"]
+    weights = rng.sample(range(1, 1_000_000), 400)  # distinct -> unique order
+    entries = []
+    for i, weight in enumerate(weights):
+        kind = rng.choice(autocomplete.KINDS)
+        label = " ".join(rng.choice(words) for _ in range(rng.randint(1, 3))) + f" {i}"
+        entries.append((kind, label, weight))
+    index = make_index(entries)
+
+    for query in ["p", "ph", "pho", "b", "ba", "bar", "s", "sea", "a", "auto", "x"]:
+        for kinds in [None, {"business"}, {"city", "county"}]:
+            got = [s.label for s in index.search(query, limit=10, kinds=kinds)]
+            assert got == brute_force(entries, query, 10, kinds), (query, kinds)
+
+
+def test_empty_query():
+    index = make_index([("business", "Pho Hung", 10)])
+    assert index.search("   ") == []
@@ -0,0 +1,39 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+from app.models.business import CATEGORY_FIELDS, category_bits, category_masks
+
+TRANSFORMER = Path(__file__).resolve().parents[2] / "source" / "modules" / "transformer.py"
+
+
+def etl_category_groups():
+    """CATEGORY_GROUPS of the ETL transformer, read without importing pyspark"""
+    tree = ast.parse(TRANSFORMER.read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "CATEGORY_GROUPS" for t in node.targets
+        ):
+            return ast.literal_eval(node.value)
+    raise AssertionError("CATEGORY_GROUPS not found in transformer.py")
+
+
+@pytest.mark.skipif(not TRANSFORMER.exists(), reason="ETL source not checked out")
+def test_bit_order_matches_etl():
+    # category_mask is written by the ETL and decoded here: the bit order must be the same
+    assert [field for _, field in etl_category_groups()] == CATEGORY_FIELDS
+
+
+def test_category_bits():
+    assert category_bits(None) == 0
+    assert category_bits(["food_dining"]) == 1
+    assert category_bits(["health_medical", "financial_legal_services", "unknown"]) == (1 << 1) | (1 << 9)
+
+
+def test_category_masks():
+    bits = category_bits(["food_dining", "health_medical"])
+    assert all(m & bits == bits for m in category_masks(bits, match_all=True))
+    assert all(m & bits for m in category_masks(bits))
+    assert len(category_masks(bits, match_all=True)) == 1 << (len(CATEGORY_FIELDS) - 2)
+    assert len(category_masks(bits)) == (1 << len(CATEGORY_FIELDS)) - (1 << (len(CATEGORY_FIELDS) - 2))